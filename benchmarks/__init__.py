@@ -0,0 +1 @@
+"""Benchmarks for the webhook conversation integration."""
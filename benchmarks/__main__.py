@@ -0,0 +1,144 @@
+"""Run the webhook conversation benchmarks.
+
+Usage: python -m benchmarks [options]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import replace
+import itertools
+import json
+from pathlib import Path
+from typing import Any
+
+from .harness import async_start_instance
+from .scenarios import SCENARIOS, ScenarioOptions
+from .server import ServerSettings, StandInWebhookServer
+
+
+def _parse_args() -> argparse.Namespace:
+    """Parse the command line arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Benchmark the integration against a local webhook server.",
+    )
+    parser.add_argument(
+        "--scenario",
+        nargs="+",
+        choices=sorted(SCENARIOS),
+        default=sorted(SCENARIOS),
+        help="scenarios to run",
+    )
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--entities", type=int, nargs="+", default=[10, 500])
+    parser.add_argument("--history", type=int, nargs="+", default=[0, 20])
+    parser.add_argument(
+        "--attachment-size", type=int, nargs="+", default=[0, 1024 * 1024]
+    )
+    parser.add_argument("--audio-seconds", type=float, nargs="+", default=[3.0])
+    parser.add_argument(
+        "--streaming",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="stream conversation and AI task replies",
+    )
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--chunks", type=int, default=20)
+    parser.add_argument("--chunk-interval", type=float, default=0.01)
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="measure peak Python memory with tracemalloc (slower)",
+    )
+    parser.add_argument("--output", type=Path, help="write the results as JSON")
+    return parser.parse_args()
+
+
+def _print_result(result: dict[str, Any]) -> None:
+    """Print a single result line."""
+    latency = result["latency_ms"]
+    parameters = " ".join(
+        f"{key}={value}" for key, value in result["parameters"].items()
+    )
+    print(
+        f"{result['name']:<13} {parameters:<55} "
+        f"req={result['requests']:<4} err={result['errors']:<3} "
+        f"tput={result['throughput_per_s']}/s "
+        f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms "
+        f"blocked={result['loop_blocked_ms']}ms max_block={result['loop_max_block_ms']}ms "
+        f"peak={result['peak_memory_kib']}KiB rss={result['max_rss_kib']}KiB"
+    )
+
+
+def _scenario_options(
+    name: str, args: argparse.Namespace, concurrency: int
+) -> list[ScenarioOptions]:
+    """Return the parameter combinations relevant to a scenario."""
+    base = ScenarioOptions(
+        requests=args.requests,
+        concurrency=concurrency,
+        entities=args.entities[0],
+        history=args.history[0],
+        attachment_size=args.attachment_size[0],
+        audio_seconds=args.audio_seconds[0],
+        trace_memory=args.trace_memory,
+    )
+    if name == "conversation":
+        return [
+            replace(base, entities=entities, history=history)
+            for entities, history in itertools.product(args.entities, args.history)
+        ]
+    if name == "ai_task":
+        return [replace(base, attachment_size=size) for size in args.attachment_size]
+    if name == "stt":
+        return [replace(base, audio_seconds=seconds) for seconds in args.audio_seconds]
+    return [base]
+
+
+async def _async_main(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Run all requested scenario combinations."""
+    server = StandInWebhookServer(
+        ServerSettings(
+            latency=args.latency,
+            chunks=args.chunks,
+            chunk_interval=args.chunk_interval,
+        )
+    )
+    await server.async_start()
+    results: list[dict[str, Any]] = []
+
+    try:
+        for concurrency in args.concurrency:
+            async with async_start_instance(
+                server.url,
+                streaming=args.streaming,
+                max_concurrent_requests=concurrency,
+            ) as instance:
+                for name in args.scenario:
+                    for options in _scenario_options(name, args, concurrency):
+                        result = (await SCENARIOS[name](instance, options)).as_dict()
+                        result["parameters"] |= {
+                            "concurrency": concurrency,
+                            "streaming": args.streaming,
+                        }
+                        _print_result(result)
+                        results.append(result)
+    finally:
+        await server.async_stop()
+
+    return results
+
+
+def main() -> None:
+    """Run the benchmarks."""
+    args = _parse_args()
+    results = asyncio.run(_async_main(args))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
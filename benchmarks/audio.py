@@ -0,0 +1,174 @@
+"""Compare the memory used to build the body of an STT request.
+
+Usage: python -m benchmarks.audio [--seconds S ...] [--chunk-size N]
+
+An utterance of 16 kHz 16-bit mono PCM audio arrives in chunks and is turned
+into the JSON body of an STT request, once the way it was done before the
+audio buffer existed and once with the audio buffer and a streamed body. The
+peak memory is traced with tracemalloc. The copied bytes add up the sizes of
+all the buffers each step writes the audio into, relative to the size of the
+utterance.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from collections.abc import Callable, Iterator
+import io
+import json
+from pathlib import Path
+import time
+import tracemalloc
+from typing import Any, cast
+import wave
+
+from aiohttp.abc import AbstractStreamWriter
+
+from custom_components.webhook_conversation.audio import (
+    AudioBuffer,
+    Base64Audio,
+    JSONAudioPayload,
+    PCMFormat,
+)
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class _DiscardingWriter:
+    """Stream writer which only counts the written bytes."""
+
+    def __init__(self) -> None:
+        """Initialize the writer."""
+        self.written = 0
+
+    async def write(self, chunk: bytes | bytearray | memoryview) -> None:
+        """Count a written chunk."""
+        self.written += len(chunk)
+
+
+def _chunks(seconds: float, chunk_size: int) -> Iterator[bytes]:
+    """Return the chunks of a silent utterance."""
+    remaining = int(SAMPLE_RATE * SAMPLE_WIDTH * seconds)
+    while remaining > 0:
+        size = min(chunk_size, remaining)
+        yield bytes(size)
+        remaining -= size
+
+
+async def _async_legacy(chunks: Iterator[bytes]) -> int:
+    """Build the body with concatenation, wave, base64 and json."""
+    copied = 0
+    audio_data = b""
+    for chunk in chunks:
+        audio_data += chunk
+        copied += len(audio_data)
+
+    wav_buffer = io.BytesIO()
+    with wave.open(wav_buffer, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(SAMPLE_WIDTH)
+        wf.setframerate(SAMPLE_RATE)
+        wf.writeframes(audio_data)
+    wav_data = wav_buffer.getvalue()
+    audio_bytes = base64.b64encode(wav_data)
+    audio_base64 = audio_bytes.decode("utf-8")
+    payload = {
+        "audio": {
+            "name": "audio.wav",
+            "path": "audio.wav",
+            "mime_type": "audio/wav",
+            "data": audio_base64,
+        },
+        "language": "en-US",
+    }
+    text = json.dumps(payload)
+    body = text.encode()
+    copied += (
+        wav_buffer.tell()
+        + len(wav_data)
+        + len(audio_bytes)
+        + len(audio_base64)
+        + len(text)
+        + len(body)
+    )
+    return copied
+
+
+async def _async_buffered(chunks: Iterator[bytes]) -> int:
+    """Build the body with an audio buffer and write it as a stream."""
+    copied = 0
+    buffer = AudioBuffer(wav_header=True)
+    for chunk in chunks:
+        buffer.append(chunk)
+        copied += len(chunk)
+    buffer.write_wav_header(PCMFormat(SAMPLE_RATE, SAMPLE_WIDTH * 8, 1))
+
+    payload = {
+        "audio": {
+            "name": "audio.wav",
+            "path": Path("audio.wav"),
+            "mime_type": "audio/wav",
+            "data": Base64Audio(buffer.view()),
+        },
+        "language": "en-US",
+    }
+    writer = _DiscardingWriter()
+    await JSONAudioPayload(payload).write(cast(AbstractStreamWriter, writer))
+    # The encoded chunks are written to the socket one at a time
+    return copied + writer.written
+
+
+async def _async_measure(
+    build: Callable[[Iterator[bytes]], Any], seconds: float, chunk_size: int
+) -> dict[str, Any]:
+    """Measure building a body from an utterance."""
+    size = int(SAMPLE_RATE * SAMPLE_WIDTH * seconds)
+    tracemalloc.start()
+    start = time.perf_counter()
+    copied = await build(_chunks(seconds, chunk_size))
+    duration = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        "duration_ms": round(duration * 1000, 2),
+        "peak_memory_kib": peak // 1024,
+        "peak_memory_ratio": round(peak / size, 2),
+        "copied_bytes_ratio": round(copied / size, 2),
+    }
+
+
+async def _async_run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    """Measure both ways of building a body for every utterance length."""
+    return [
+        {
+            "audio_seconds": seconds,
+            "chunk_size": args.chunk_size,
+            "legacy": await _async_measure(_async_legacy, seconds, args.chunk_size),
+            "buffered": await _async_measure(_async_buffered, seconds, args.chunk_size),
+        }
+        for seconds in args.seconds
+    ]
+
+
+def main() -> None:
+    """Compare building STT request bodies."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.audio",
+        description="Compare the memory used to build STT request bodies.",
+    )
+    parser.add_argument("--seconds", type=float, nargs="+", default=[3.0, 10.0])
+    parser.add_argument("--chunk-size", type=int, default=1024)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(_async_run(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
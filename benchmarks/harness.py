@@ -0,0 +1,164 @@
+"""Minimal Home Assistant instance running the integration for benchmarks."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import os
+from pathlib import Path
+import socket
+import tempfile
+from types import MappingProxyType
+from typing import Any
+
+from homeassistant import bootstrap, loader
+from homeassistant.config_entries import SOURCE_USER, ConfigEntry, ConfigSubentryData
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_platform
+from homeassistant.helpers.entity import Entity
+
+from custom_components.webhook_conversation.const import (
+    CONF_AUTH_TYPE,
+    CONF_ENABLE_STREAMING,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_OUTPUT_FIELD,
+    CONF_PROMPT,
+    CONF_SUPPORTED_LANGUAGES,
+    CONF_TIMEOUT,
+    CONF_WEBHOOK_URL,
+    DEFAULT_OUTPUT_FIELD,
+    DOMAIN,
+    AuthType,
+)
+
+REPO_ROOT = Path(__file__).parent.parent
+
+SUBENTRY_TYPES = ("conversation", "ai_task", "stt", "tts")
+
+
+def _free_port() -> int:
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+    return port
+
+
+def _subentry(
+    subentry_type: str, server_url: str, streaming: bool, timeout: int
+) -> ConfigSubentryData:
+    """Return the subentry of a platform pointing to the stand-in server."""
+    data: dict[str, Any] = {
+        CONF_WEBHOOK_URL: f"{server_url}/{subentry_type}",
+        CONF_TIMEOUT: timeout,
+        CONF_AUTH_TYPE: AuthType.NONE,
+        CONF_OUTPUT_FIELD: DEFAULT_OUTPUT_FIELD,
+    }
+    if subentry_type in ("conversation", "ai_task"):
+        data |= {
+            CONF_PROMPT: "You are a benchmark.",
+            CONF_ENABLE_STREAMING: streaming,
+        }
+    else:
+        data[CONF_SUPPORTED_LANGUAGES] = ["en-US"]
+    return ConfigSubentryData(
+        data=MappingProxyType(data),
+        subentry_type=subentry_type,
+        title=f"Benchmark {subentry_type}",
+        unique_id=None,
+    )
+
+
+class BenchmarkInstance:
+    """Home Assistant instance with the integration set up."""
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
+        """Initialize the instance."""
+        self.hass = hass
+        self.entry = entry
+
+    def entity(self, platform_domain: str) -> Any:
+        """Return the integration entity of a platform."""
+        for platform in entity_platform.async_get_platforms(self.hass, DOMAIN):
+            if platform.domain != platform_domain:
+                continue
+            entities: list[Entity] = list(platform.entities.values())
+            if entities:
+                return entities[0]
+        raise LookupError(f"No {platform_domain} entity set up")
+
+
+def create_entry(
+    server_url: str,
+    *,
+    streaming: bool,
+    max_concurrent_requests: int,
+    timeout: int = 60,
+    subentry_types: tuple[str, ...] = SUBENTRY_TYPES,
+    title: str = "Benchmark",
+) -> ConfigEntry:
+    """Return a config entry with subentries pointing to the stand-in server."""
+    return ConfigEntry(
+        data={},
+        discovery_keys=MappingProxyType({}),
+        domain=DOMAIN,
+        minor_version=1,
+        options={CONF_MAX_CONCURRENT_REQUESTS: max_concurrent_requests},
+        source=SOURCE_USER,
+        subentries_data=[
+            _subentry(subentry_type, server_url, streaming, timeout)
+            for subentry_type in subentry_types
+        ],
+        title=title,
+        unique_id=None,
+        version=2,
+    )
+
+
+@asynccontextmanager
+async def async_start_hass() -> AsyncIterator[HomeAssistant]:
+    """Start Home Assistant in a temporary configuration directory."""
+    with tempfile.TemporaryDirectory() as config_dir:
+        os.symlink(
+            REPO_ROOT / "custom_components", Path(config_dir, "custom_components")
+        )
+        hass = HomeAssistant(config_dir)
+        loader.async_setup(hass)
+
+        config: dict[str, Any] = {
+            "homeassistant": {"name": "Benchmark", "time_zone": "UTC"},
+            "http": {"server_host": ["127.0.0.1"], "server_port": _free_port()},
+            "conversation": {},
+            "ai_task": {},
+            "stt": {},
+            "tts": {},
+        }
+        if await bootstrap.async_from_config_dict(config, hass) is None:
+            raise RuntimeError("Home Assistant failed to start")
+        await hass.async_start()
+
+        try:
+            yield hass
+        finally:
+            await hass.async_stop(force=True)
+
+
+@asynccontextmanager
+async def async_start_instance(
+    server_url: str,
+    *,
+    streaming: bool,
+    max_concurrent_requests: int,
+    timeout: int = 60,
+) -> AsyncIterator[BenchmarkInstance]:
+    """Start Home Assistant with a config entry of all subentry types."""
+    async with async_start_hass() as hass:
+        entry = create_entry(
+            server_url,
+            streaming=streaming,
+            max_concurrent_requests=max_concurrent_requests,
+            timeout=timeout,
+        )
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        yield BenchmarkInstance(hass, entry)
@@ -0,0 +1,137 @@
+"""Measurement helpers for the benchmarks."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+import math
+import resource
+import time
+import tracemalloc
+from typing import Any
+
+LOOP_MONITOR_INTERVAL = 0.005
+LOOP_BLOCK_THRESHOLD = 0.01
+
+
+def percentile(samples: list[float], value: float) -> float:
+    """Return the nearest-rank percentile of samples."""
+    if not samples:
+        return math.nan
+    ordered = sorted(samples)
+    rank = math.ceil(value / 100 * len(ordered))
+    return ordered[max(rank - 1, 0)]
+
+
+class LoopMonitor:
+    """Measure how long the event loop was blocked.
+
+    A task sleeps in short intervals and records by how much each wake up was
+    late. Delays above the threshold count as blocking.
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        threshold: float = LOOP_BLOCK_THRESHOLD,
+    ) -> None:
+        """Initialize the monitor."""
+        self._interval = interval
+        self._threshold = threshold
+        self._task: asyncio.Task[None] | None = None
+        self.blocked = 0.0
+        self.max_block = 0.0
+        self.blocks = 0
+
+    async def _async_run(self) -> None:
+        """Sleep in intervals and record late wake ups."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self._interval)
+            if (delay := time.perf_counter() - start - self._interval) > (
+                self._threshold
+            ):
+                self.blocks += 1
+                self.blocked += delay
+                self.max_block = max(self.max_block, delay)
+
+    def start(self) -> None:
+        """Start monitoring."""
+        self._task = asyncio.create_task(self._async_run())
+
+    async def async_stop(self) -> None:
+        """Stop monitoring."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+
+@dataclass(slots=True)
+class ScenarioResult:
+    """Outcome of a single benchmark scenario."""
+
+    name: str
+    parameters: dict[str, Any]
+    latencies: list[float] = field(default_factory=list)
+    errors: int = 0
+    duration: float = 0.0
+    loop_blocked: float = 0.0
+    loop_max_block: float = 0.0
+    peak_memory: int | None = None
+    max_rss: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the result with latencies in milliseconds."""
+        return {
+            "name": self.name,
+            "parameters": self.parameters,
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "throughput_per_s": round(len(self.latencies) / self.duration, 2)
+            if self.duration
+            else None,
+            "latency_ms": {
+                f"p{value}": round(percentile(self.latencies, value) * 1000, 2)
+                for value in (50, 95, 99)
+            },
+            "loop_blocked_ms": round(self.loop_blocked * 1000, 2),
+            "loop_max_block_ms": round(self.loop_max_block * 1000, 2),
+            "peak_memory_kib": None
+            if self.peak_memory is None
+            else self.peak_memory // 1024,
+            "max_rss_kib": self.max_rss,
+        }
+
+
+class Measurement:
+    """Collect latency, loop blocking and memory of a scenario run."""
+
+    def __init__(self, result: ScenarioResult, trace_memory: bool) -> None:
+        """Initialize the measurement."""
+        self._result = result
+        self._trace_memory = trace_memory
+        self._monitor = LoopMonitor()
+        self._start = 0.0
+
+    async def __aenter__(self) -> Measurement:
+        """Start measuring."""
+        if self._trace_memory:
+            tracemalloc.start()
+        self._monitor.start()
+        self._start = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *args: object) -> None:
+        """Stop measuring and store the results."""
+        self._result.duration = time.perf_counter() - self._start
+        await self._monitor.async_stop()
+        self._result.loop_blocked = self._monitor.blocked
+        self._result.loop_max_block = self._monitor.max_block
+        if self._trace_memory:
+            self._result.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self._result.max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
@@ -0,0 +1,186 @@
+"""Replay recorded webhook traffic against a target backend.
+
+Usage: python -m benchmarks.replay RECORDING [RECORDING ...] --url URL [options]
+
+Recordings are written by the integration when "Record webhook traffic" is
+enabled in the entry options. Requests are sent with their original spacing,
+divided by the speed factor, and with at most the given number in flight.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterator
+import gzip
+import json
+from pathlib import Path
+import time
+from typing import Any
+
+import aiohttp
+
+from .measure import percentile
+
+
+def _load_records(paths: list[Path]) -> list[dict[str, Any]]:
+    """Load the records of all recordings ordered by time."""
+    records: list[dict[str, Any]] = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            records.extend(json.loads(line) for line in file if line.strip())
+    return sorted(records, key=lambda record: record["timestamp"])
+
+
+def _restore_binary_object(binary_object: dict[str, Any]) -> dict[str, Any]:
+    """Replace a redacted binary object with placeholder data of equal size."""
+    return {
+        "name": binary_object["name"],
+        "path": binary_object["name"],
+        "mime_type": binary_object["mime_type"],
+        "data": "A" * binary_object["data_length"],
+    }
+
+
+def restore_payload(payload: dict[str, Any]) -> dict[str, Any]:
+    """Return a sendable payload from a redacted recorded payload."""
+    restored = dict(payload)
+    if binary_objects := payload.get("binary_objects"):
+        restored["binary_objects"] = [
+            _restore_binary_object(item) for item in binary_objects
+        ]
+    if audio := payload.get("audio"):
+        restored["audio"] = _restore_binary_object(audio)
+    return restored
+
+
+def _target_url(args: argparse.Namespace, subentry_type: str) -> str | None:
+    """Return the target URL of a subentry type."""
+    url_map: list[str] = args.url_map
+    for mapping in url_map:
+        mapped_type, _, mapped_url = mapping.partition("=")
+        if mapped_type == subentry_type:
+            return mapped_url
+    default_url: str | None = args.url
+    return default_url
+
+
+def _schedule(
+    records: list[dict[str, Any]], speed: float
+) -> Iterator[tuple[float, dict[str, Any]]]:
+    """Yield the replay offset in seconds and each record."""
+    first = records[0]["timestamp"]
+    for record in records:
+        yield (record["timestamp"] - first) / speed, record
+
+
+async def _async_replay(args: argparse.Namespace) -> dict[str, Any]:
+    """Replay the recordings and return the latency distributions."""
+    records = [
+        record
+        for record in _load_records(args.recordings)
+        if not args.type or record["subentry_type"] in args.type
+    ]
+    if not records:
+        raise SystemExit("No records to replay")
+
+    latencies: dict[str, list[float]] = defaultdict(list)
+    recorded: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    timeout = aiohttp.ClientTimeout(total=args.timeout)
+
+    async with aiohttp.ClientSession(timeout=timeout) as session:
+
+        async def send(record: dict[str, Any]) -> None:
+            subentry_type: str = record["subentry_type"]
+            if (url := _target_url(args, subentry_type)) is None:
+                return
+            if record.get("duration") is not None:
+                recorded[subentry_type].append(record["duration"])
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    async with session.post(
+                        url, json=restore_payload(record["payload"])
+                    ) as response:
+                        await response.read()
+                        if response.status != 200:
+                            errors[subentry_type] += 1
+                            return
+                except (aiohttp.ClientError, TimeoutError):
+                    errors[subentry_type] += 1
+                    return
+                latencies[subentry_type].append(time.perf_counter() - start)
+
+        tasks: list[asyncio.Task[None]] = []
+        start = time.perf_counter()
+        for offset, record in _schedule(records, args.speed):
+            if (delay := offset - (time.perf_counter() - start)) > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(send(record)))
+        await asyncio.gather(*tasks)
+        duration = time.perf_counter() - start
+
+    def distribution(samples: list[float]) -> dict[str, float]:
+        return {
+            f"p{value}": round(percentile(samples, value) * 1000, 2)
+            for value in (50, 95, 99)
+        }
+
+    return {
+        "duration_s": round(duration, 2),
+        "speed": args.speed,
+        "concurrency": args.concurrency,
+        "types": {
+            subentry_type: {
+                "requests": len(latencies[subentry_type]) + errors[subentry_type],
+                "errors": errors[subentry_type],
+                "latency_ms": distribution(latencies[subentry_type]),
+                "recorded_latency_ms": distribution(recorded[subentry_type]),
+            }
+            for subentry_type in sorted(set(latencies) | set(errors))
+        },
+    }
+
+
+def main() -> None:
+    """Replay recorded traffic."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.replay",
+        description="Replay recorded webhook traffic against a target backend.",
+    )
+    parser.add_argument("recordings", type=Path, nargs="+")
+    parser.add_argument("--url", help="target URL for all requests")
+    parser.add_argument(
+        "--url-map",
+        action="append",
+        default=[],
+        metavar="TYPE=URL",
+        help="target URL per subentry type, e.g. stt=http://localhost:5678/stt",
+    )
+    parser.add_argument(
+        "--type",
+        action="append",
+        choices=["ai_task", "conversation", "stt", "tts"],
+        help="only replay requests of these subentry types",
+    )
+    parser.add_argument(
+        "--speed", type=float, default=1.0, help="replay speed factor, e.g. 10"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+    if not args.url and not args.url_map:
+        parser.error("--url or --url-map is required")
+
+    report = asyncio.run(_async_replay(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
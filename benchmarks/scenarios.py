@@ -0,0 +1,222 @@
+"""Benchmark scenarios driving the integration entities."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncGenerator, AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from homeassistant.components import ai_task, conversation, stt
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_expose_entity,
+)
+from homeassistant.components.tts.const import DOMAIN as TTS_DOMAIN
+from homeassistant.components.tts.entity import TTSAudioRequest
+from homeassistant.core import Context
+from homeassistant.helpers import chat_session
+
+from .harness import BenchmarkInstance
+from .measure import Measurement, ScenarioResult
+
+PCM_CHUNK_SIZE = 1024
+
+
+@dataclass(slots=True, frozen=True)
+class ScenarioOptions:
+    """Parameters shared by all scenarios of a run."""
+
+    requests: int
+    concurrency: int
+    entities: int
+    history: int
+    attachment_size: int
+    audio_seconds: float
+    trace_memory: bool
+
+
+async def _async_run_requests(
+    result: ScenarioResult,
+    options: ScenarioOptions,
+    request: Callable[[int], Awaitable[object]],
+) -> ScenarioResult:
+    """Run the requests of a scenario with bounded concurrency."""
+    semaphore = asyncio.Semaphore(options.concurrency)
+
+    async def run(index: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await request(index)
+            except Exception:
+                result.errors += 1
+            else:
+                result.latencies.append(time.perf_counter() - start)
+
+    async with Measurement(result, options.trace_memory):
+        await asyncio.gather(*(run(index) for index in range(options.requests)))
+    return result
+
+
+def _async_expose_states(instance: BenchmarkInstance, count: int) -> None:
+    """Create and expose states until the given number of entities exists."""
+    for index in range(count):
+        entity_id = f"sensor.benchmark_{index}"
+        if instance.hass.states.get(entity_id) is not None:
+            continue
+        instance.hass.states.async_set(
+            entity_id,
+            str(index),
+            {"friendly_name": f"Benchmark sensor {index}", "unit_of_measurement": "W"},
+        )
+        async_expose_entity(instance.hass, conversation.DOMAIN, entity_id, True)
+
+
+def _async_create_history(
+    instance: BenchmarkInstance, agent_id: str, turns: int
+) -> str:
+    """Create a conversation with previous turns and return its ID."""
+    hass = instance.hass
+    with (
+        chat_session.async_get_chat_session(hass) as session,
+        conversation.async_get_chat_log(hass, session) as chat_log,
+    ):
+        for turn in range(turns):
+            chat_log.async_add_user_content(
+                conversation.UserContent(f"What is the value of sensor {turn}?")
+            )
+            chat_log.async_add_assistant_content_without_tools(
+                conversation.AssistantContent(agent_id, f"Sensor {turn} reads {turn}.")
+            )
+        return session.conversation_id
+
+
+async def async_conversation(
+    instance: BenchmarkInstance, options: ScenarioOptions
+) -> ScenarioResult:
+    """Send conversation turns with exposed entities and history."""
+    entity = instance.entity(conversation.DOMAIN)
+    _async_expose_states(instance, options.entities)
+    conversation_ids = [
+        _async_create_history(instance, entity.entity_id, options.history)
+        for _ in range(options.requests)
+    ]
+
+    async def request(index: int) -> None:
+        await conversation.async_converse(
+            instance.hass,
+            "What is the value of sensor 1?",
+            conversation_ids[index],
+            Context(),
+            agent_id=entity.entity_id,
+        )
+
+    return await _async_run_requests(
+        ScenarioResult(
+            "conversation",
+            {"entities": options.entities, "history": options.history},
+        ),
+        options,
+        request,
+    )
+
+
+async def async_ai_task(
+    instance: BenchmarkInstance, options: ScenarioOptions
+) -> ScenarioResult:
+    """Run AI tasks with an attachment of the configured size."""
+    entity = instance.entity(ai_task.DOMAIN)
+
+    with tempfile.TemporaryDirectory() as directory:
+        attachments: list[conversation.Attachment] | None = None
+        if options.attachment_size:
+            path = Path(directory, "attachment.bin")
+            await instance.hass.async_add_executor_job(
+                path.write_bytes, os.urandom(options.attachment_size)
+            )
+            attachments = [
+                conversation.Attachment(
+                    media_content_id="media-source://benchmark/attachment.bin",
+                    mime_type="application/octet-stream",
+                    path=path,
+                )
+            ]
+
+        async def request(index: int) -> None:
+            # Distinct instructions so identical tasks are not coalesced
+            task = ai_task.GenDataTask(
+                name="benchmark",
+                instructions=f"Summarize item {index}",
+                attachments=attachments,
+            )
+            with chat_session.async_get_chat_session(instance.hass) as session:
+                await entity.internal_async_generate_data(session, task)
+
+        return await _async_run_requests(
+            ScenarioResult("ai_task", {"attachment_size": options.attachment_size}),
+            options,
+            request,
+        )
+
+
+async def async_stt(
+    instance: BenchmarkInstance, options: ScenarioOptions
+) -> ScenarioResult:
+    """Transcribe silent audio of the configured length."""
+    entity = instance.entity(stt.DOMAIN)
+    audio = bytes(int(16000 * 2 * options.audio_seconds))
+    metadata = stt.SpeechMetadata(
+        language="en-US",
+        format=stt.AudioFormats.WAV,
+        codec=stt.AudioCodecs.PCM,
+        bit_rate=stt.AudioBitRates.BITRATE_16,
+        sample_rate=stt.AudioSampleRates.SAMPLERATE_16000,
+        channel=stt.AudioChannels.CHANNEL_MONO,
+    )
+
+    async def audio_stream() -> AsyncIterator[bytes]:
+        for start in range(0, len(audio), PCM_CHUNK_SIZE):
+            yield audio[start : start + PCM_CHUNK_SIZE]
+
+    async def request(index: int) -> None:
+        result = await entity.async_process_audio_stream(metadata, audio_stream())
+        if result.result != stt.SpeechResultState.SUCCESS:
+            raise RuntimeError("Transcription failed")
+
+    return await _async_run_requests(
+        ScenarioResult("stt", {"audio_seconds": options.audio_seconds}),
+        options,
+        request,
+    )
+
+
+async def async_tts(
+    instance: BenchmarkInstance, options: ScenarioOptions
+) -> ScenarioResult:
+    """Synthesize short messages and read the streamed audio."""
+    entity = instance.entity(TTS_DOMAIN)
+
+    async def request(index: int) -> None:
+        async def message_gen() -> AsyncGenerator[str]:
+            yield f"The value of sensor {index} is {index} watts."
+
+        response = await entity.async_stream_tts_audio(
+            TTSAudioRequest("en-US", {}, message_gen())
+        )
+        async for _chunk in response.data_gen:
+            pass
+
+    return await _async_run_requests(ScenarioResult("tts", {}), options, request)
+
+
+SCENARIOS: dict[
+    str, Callable[[BenchmarkInstance, ScenarioOptions], Awaitable[ScenarioResult]]
+] = {
+    "conversation": async_conversation,
+    "ai_task": async_ai_task,
+    "stt": async_stt,
+    "tts": async_tts,
+}
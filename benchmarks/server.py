@@ -0,0 +1,112 @@
+"""Local stand-in for an n8n webhook backend."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass
+import io
+import json
+from typing import Any
+import wave
+
+from aiohttp import web
+
+SILENT_WAV_SECONDS = 1
+
+
+@dataclass(slots=True)
+class ServerSettings:
+    """Behaviour of the stand-in webhook server."""
+
+    latency: float = 0.05
+    """Seconds before the first byte of a reply is sent."""
+
+    chunks: int = 20
+    """Number of items of a streamed reply."""
+
+    chunk_interval: float = 0.01
+    """Seconds between two items of a streamed reply."""
+
+
+def _silent_wav(seconds: int) -> bytes:
+    """Return a silent 16 kHz mono WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(16000)
+        wav_file.writeframes(bytes(16000 * 2 * seconds))
+    return buffer.getvalue()
+
+
+class StandInWebhookServer:
+    """In-process aiohttp server that implements the n8n webhook contract.
+
+    The server answers LLM requests with a JSON reply or, if the payload asks
+    for streaming, with NDJSON ``item`` lines followed by an ``end`` line. STT
+    requests get a transcript and TTS requests a silent WAV file.
+    """
+
+    def __init__(self, settings: ServerSettings) -> None:
+        """Initialize the server."""
+        self.settings = settings
+        self.requests = 0
+        self.request_bytes = 0
+        self._app = web.Application(client_max_size=256 * 1024 * 1024)
+        self._app.router.add_post("/conversation", self._handle_llm)
+        self._app.router.add_post("/ai_task", self._handle_llm)
+        self._app.router.add_post("/stt", self._handle_stt)
+        self._app.router.add_post("/tts", self._handle_tts)
+        self._runner = web.AppRunner(self._app, access_log=None)
+        self._audio = _silent_wav(SILENT_WAV_SECONDS)
+        self.url = ""
+
+    async def async_start(self) -> None:
+        """Start listening on a free local port."""
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+
+    async def async_stop(self) -> None:
+        """Stop the server."""
+        await self._runner.cleanup()
+
+    async def _async_read(self, request: web.Request) -> dict[str, Any]:
+        """Read and count a request payload, then wait for the reply latency."""
+        body = await request.read()
+        self.requests += 1
+        self.request_bytes += len(body)
+        payload: dict[str, Any] = json.loads(body)
+        await asyncio.sleep(self.settings.latency)
+        return payload
+
+    async def _handle_llm(self, request: web.Request) -> web.StreamResponse:
+        """Reply to a conversation or AI task request."""
+        payload = await self._async_read(request)
+        words = [f"word{index} " for index in range(self.settings.chunks)]
+
+        if not payload.get("stream"):
+            return web.json_response({"output": "".join(words)})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for word in words:
+            await response.write(
+                json.dumps({"type": "item", "content": word}).encode() + b"\n"
+            )
+            await asyncio.sleep(self.settings.chunk_interval)
+        await response.write(b'{"type": "end"}\n')
+        await response.write_eof()
+        return response
+
+    async def _handle_stt(self, request: web.Request) -> web.Response:
+        """Reply to a speech-to-text request."""
+        await self._async_read(request)
+        return web.json_response({"output": "turn on the kitchen lights"})
+
+    async def _handle_tts(self, request: web.Request) -> web.Response:
+        """Reply to a text-to-speech request."""
+        await self._async_read(request)
+        return web.Response(body=self._audio, content_type="audio/wav")
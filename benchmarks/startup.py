@@ -0,0 +1,109 @@
+"""Measure how long config entries of the integration take to set up.
+
+Usage: python -m benchmarks.startup [--entries N] [--type TYPE ...] [options]
+
+Config entries with one subentry of each given type are set up one after
+another. The first setup includes setting up the integration and importing
+its platforms, so it is reported separately. Afterwards, a subentry of the
+last entry is changed to measure applying the change.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+from custom_components.webhook_conversation.const import CONF_TIMEOUT
+
+from .harness import SUBENTRY_TYPES, async_start_hass, create_entry
+from .measure import percentile
+
+# Requests are never sent, so the webhooks do not need to exist
+UNUSED_URL = "http://127.0.0.1:9"
+
+LAZY_MODULES = ("anyio", "cProfile", "pstats", "voluptuous_openapi")
+
+
+def _milliseconds(seconds: float) -> float:
+    """Return seconds as rounded milliseconds."""
+    return round(seconds * 1000, 2)
+
+
+async def _async_measure(args: argparse.Namespace) -> dict[str, Any]:
+    """Set up the config entries and return the setup times."""
+    subentry_types = tuple(args.type or ("conversation",))
+    durations: list[float] = []
+
+    async with async_start_hass() as hass:
+        for index in range(args.entries):
+            entry = create_entry(
+                UNUSED_URL,
+                streaming=True,
+                max_concurrent_requests=4,
+                subentry_types=subentry_types,
+                title=f"Benchmark {index}",
+            )
+            start = time.perf_counter()
+            await hass.config_entries.async_add(entry)
+            await hass.async_block_till_done()
+            durations.append(time.perf_counter() - start)
+
+        subentry = next(iter(entry.subentries.values()))
+        start = time.perf_counter()
+        hass.config_entries.async_update_subentry(
+            entry, subentry, data={**subentry.data, CONF_TIMEOUT: 45}
+        )
+        await hass.async_block_till_done()
+        update = time.perf_counter() - start
+
+        platforms = sorted(entry.runtime_data.platforms)
+
+    later = durations[1:]
+    return {
+        "entries": args.entries,
+        "subentry_types": list(subentry_types),
+        "platforms": platforms,
+        "first_setup_ms": _milliseconds(durations[0]),
+        "setup_ms": {
+            f"p{value}": _milliseconds(percentile(later, value))
+            for value in (50, 95, 99)
+        }
+        if later
+        else None,
+        "total_setup_ms": _milliseconds(sum(durations)),
+        "subentry_update_ms": _milliseconds(update),
+        "loaded_modules": [module for module in LAZY_MODULES if module in sys.modules],
+    }
+
+
+def main() -> None:
+    """Measure the setup of config entries."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.startup",
+        description="Measure the setup time of config entries.",
+    )
+    parser.add_argument("--entries", type=int, default=20)
+    parser.add_argument(
+        "--type",
+        action="append",
+        choices=SUBENTRY_TYPES,
+        help="subentry types of each entry, defaults to conversation",
+    )
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+    if args.entries < 1:
+        parser.error("--entries must be at least 1")
+
+    report = asyncio.run(_async_measure(args))
+    print(json.dumps(report, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,32 @@
 """Webhook conversation integration for Home Assistant."""
 
+from collections.abc import Mapping
 import logging
 from types import MappingProxyType
+from typing import Any
 
 from homeassistant.config_entries import ConfigEntry, ConfigSubentry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_platform,
+    entity_registry as er,
+)
+from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.typing import ConfigType
 
 from .const import (
     CONF_AI_TASK_WEBHOOK_URL,
     CONF_AUTH_TYPE,
     CONF_ENABLE_STREAMING,
+    CONF_MAX_CONCURRENT_REQUESTS,
     CONF_OUTPUT_FIELD,
     CONF_PASSWORD,
     CONF_PROMPT,
+    CONF_QUEUE_TIMEOUT,
+    CONF_RECORD_TRAFFIC,
     CONF_TIMEOUT,
     CONF_USERNAME,
     CONF_WEBHOOK_URL,
@@ -22,17 +34,42 @@ from .const import (
     DEFAULT_AUTH_TYPE,
     DEFAULT_CONVERSATION_NAME,
     DEFAULT_ENABLE_STREAMING,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
     DEFAULT_OUTPUT_FIELD,
     DEFAULT_PROMPT,
+    DEFAULT_QUEUE_TIMEOUT,
+    DEFAULT_RECORD_TRAFFIC,
     DEFAULT_TIMEOUT,
     DOMAIN,
 )
+from .models import WebhookConversationConfigEntry, WebhookConversationRuntimeData
+from .scheduler import WebhookRequestScheduler
+from .services import async_setup_services
+from .telemetry import WebhookTelemetry
+from .traffic import TrafficRecorder
+from .views import ExposedEntitiesView
 
-PLATFORMS = [Platform.AI_TASK, Platform.CONVERSATION, Platform.STT, Platform.TTS]
+SUBENTRY_PLATFORMS = {
+    "ai_task": Platform.AI_TASK,
+    "conversation": Platform.CONVERSATION,
+    "stt": Platform.STT,
+    "tts": Platform.TTS,
+}
 _LOGGER = logging.getLogger(__name__)
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the webhook conversation integration."""
+    async_setup_services(hass)
+    hass.http.register_view(ExposedEntitiesView())
+    return True
+
 
-async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
+async def async_setup_entry(
+    hass: HomeAssistant, config_entry: WebhookConversationConfigEntry
+) -> bool:
     """Set up the integration from a config entry."""
     _LOGGER.debug(
         "Setting up webhook conversation integration from config entry: %s",
@@ -40,29 +77,148 @@ async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> b
     )
     _LOGGER.debug("Config entry data: %s", config_entry.data)
 
-    await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    telemetry = WebhookTelemetry()
+    config_entry.runtime_data = WebhookConversationRuntimeData(
+        scheduler=WebhookRequestScheduler(
+            config_entry.options.get(
+                CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+            ),
+            config_entry.options.get(CONF_QUEUE_TIMEOUT, DEFAULT_QUEUE_TIMEOUT),
+        ),
+        session=async_create_clientsession(
+            hass, trace_configs=[telemetry.trace_config]
+        ),
+        telemetry=telemetry,
+        recorder=TrafficRecorder(hass, config_entry.entry_id)
+        if config_entry.options.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC)
+        else None,
+        subentries=_subentry_snapshot(config_entry),
+    )
+
+    # Only the platforms of the configured subentry types are set up, so
+    # entries without e.g. STT subentries never import the STT platform
+    platforms = _entry_platforms(config_entry)
+    config_entry.runtime_data.platforms = platforms
+    await hass.config_entries.async_forward_entry_setups(
+        config_entry, sorted(platforms)
+    )
 
     config_entry.async_on_unload(config_entry.add_update_listener(update_listener))
 
     return True
 
 
-async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
+async def async_unload_entry(
+    hass: HomeAssistant, config_entry: WebhookConversationConfigEntry
+) -> bool:
     """Handle config entry unload."""
     _LOGGER.debug(
         "Unloading webhook conversation config entry %s", config_entry.entry_id
     )
 
-    return await hass.config_entries.async_unload_platforms(config_entry, PLATFORMS)
+    if not await hass.config_entries.async_unload_platforms(
+        config_entry, config_entry.runtime_data.platforms
+    ):
+        return False
+
+    if (recorder := config_entry.runtime_data.recorder) is not None:
+        await recorder.async_flush()
+
+    return True
+
 
+def _entry_platforms(config_entry: WebhookConversationConfigEntry) -> set[Platform]:
+    """Return the platforms needed by the subentries of a config entry."""
+    return {Platform.SENSOR} | {
+        SUBENTRY_PLATFORMS[subentry.subentry_type]
+        for subentry in config_entry.subentries.values()
+    }
+
+
+def _subentry_snapshot(
+    config_entry: WebhookConversationConfigEntry,
+) -> dict[str, tuple[str, Mapping[str, Any]]]:
+    """Return the title and data of each subentry."""
+    return {
+        subentry_id: (subentry.title, subentry.data)
+        for subentry_id, subentry in config_entry.subentries.items()
+    }
+
+
+async def _async_rebuild_subentry(
+    hass: HomeAssistant,
+    config_entry: WebhookConversationConfigEntry,
+    subentry: ConfigSubentry,
+    platform_domain: Platform,
+) -> None:
+    """Replace the entity of a changed subentry, keeping its registry entry."""
+    for platform in entity_platform.async_get_platforms(hass, DOMAIN):
+        if (
+            platform.config_entry is not config_entry
+            or platform.domain != platform_domain
+        ):
+            continue
+        for entity_id, entity in list(platform.entities.items()):
+            if (
+                entity.registry_entry is not None
+                and entity.registry_entry.config_subentry_id == subentry.subentry_id
+            ):
+                await platform.async_remove_entity(entity_id)
+
+    config_entry.runtime_data.subentry_adders[platform_domain](subentry)
 
-async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
-    """Handle options update."""
+
+async def update_listener(
+    hass: HomeAssistant, config_entry: WebhookConversationConfigEntry
+) -> None:
+    """Apply changed options and subentries without reloading the entry.
+
+    Only the entities of added or changed subentries are set up again, so
+    the other entities keep their connections and caches. Entities of
+    removed subentries are removed together with their registry entries.
+    """
     _LOGGER.debug(
         "Updating webhook conversation config entry %s", config_entry.entry_id
     )
+    runtime_data = config_entry.runtime_data
+
+    runtime_data.scheduler.async_update_limits(
+        config_entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        ),
+        config_entry.options.get(CONF_QUEUE_TIMEOUT, DEFAULT_QUEUE_TIMEOUT),
+    )
+    record_traffic = config_entry.options.get(
+        CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC
+    )
+    if record_traffic and runtime_data.recorder is None:
+        runtime_data.recorder = TrafficRecorder(hass, config_entry.entry_id)
+    elif not record_traffic and (recorder := runtime_data.recorder) is not None:
+        runtime_data.recorder = None
+        await recorder.async_flush()
+
+    # Platforms of new subentry types set up all of their subentries
+    new_platforms = _entry_platforms(config_entry) - runtime_data.platforms
+    if new_platforms:
+        _LOGGER.debug("Setting up platforms %s", new_platforms)
+        runtime_data.platforms |= new_platforms
+        await hass.config_entries.async_forward_entry_setups(
+            config_entry, sorted(new_platforms)
+        )
 
-    await hass.config_entries.async_reload(config_entry.entry_id)
+    previous = runtime_data.subentries
+    runtime_data.subentries = _subentry_snapshot(config_entry)
+    for subentry_id, subentry in config_entry.subentries.items():
+        platform_domain = SUBENTRY_PLATFORMS[subentry.subentry_type]
+        if subentry_id not in previous:
+            _LOGGER.debug("Adding entities of subentry %s", subentry_id)
+            # The new platforms already added the entities of all subentries
+            for platform, async_add_subentry in runtime_data.subentry_adders.items():
+                if platform not in new_platforms:
+                    async_add_subentry(subentry)
+        elif previous[subentry_id] != runtime_data.subentries[subentry_id]:
+            _LOGGER.debug("Rebuilding entities of subentry %s", subentry_id)
+            await _async_rebuild_subentry(hass, config_entry, subentry, platform_domain)
 
 
 async def async_migrate_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
@@ -2,39 +2,172 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
+from contextlib import aclosing
+import hashlib
+from http import HTTPStatus
+import json
 import logging
+from typing import Any, cast
 
-import anyio
-from voluptuous_openapi import convert
+import voluptuous as vol
 
 from homeassistant.components import ai_task, conversation
-from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers import llm
+from homeassistant.components.ai_task.const import (
+    ATTR_INSTRUCTIONS,
+    ATTR_REQUIRED,
+    ATTR_STRUCTURE,
+    ATTR_TASK_NAME,
+    DEFAULT_SYSTEM_PROMPT,
+)
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.const import CONF_DESCRIPTION, CONF_SELECTOR, Platform
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_platform, selector
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.typing import VolDictType
+from homeassistant.util.ulid import ulid_now
 
-from .entity import WebhookConversationLLMBaseEntity
-from .models import WebhookConversationBinaryObject
+from .cache import SingleFlight, TTLCache
+from .const import (
+    ATTR_ITEMS,
+    ATTR_MAX_CONCURRENCY,
+    ATTR_MODE,
+    CONF_RESULT_CACHE_SIZE,
+    CONF_RESULT_CACHE_TTL,
+    CONF_SEND_STRUCTURE_ID,
+    DEFAULT_BATCH_MAX_CONCURRENCY,
+    DEFAULT_RESULT_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_TTL,
+    DEFAULT_SEND_STRUCTURE_ID,
+    SERVICE_GENERATE_BATCH,
+    BatchMode,
+)
+from .entity import WebhookConversationLLMBaseEntity, WebhookResponseError
+from .models import (
+    WebhookConversationBatchItem,
+    WebhookConversationBinaryObject,
+    WebhookConversationConfigEntry,
+    WebhookConversationPayload,
+)
+from .scheduler import RequestPriority
+from .structured_output import StructuredOutputParser, convert_structure
 
 _LOGGER = logging.getLogger(__name__)
 
+STRUCTURE_FIELD_SCHEMA = vol.Schema(
+    {
+        vol.Optional(CONF_DESCRIPTION): str,
+        vol.Optional(ATTR_REQUIRED): bool,
+        vol.Required(CONF_SELECTOR): selector.validate_selector,
+    }
+)
+
+
+def _validate_structure(value: dict[str, Any]) -> vol.Schema:
+    """Validate the structure fields as a voluptuous Schema."""
+    fields = {}
+    for key, field in vol.Schema({str: STRUCTURE_FIELD_SCHEMA})(value).items():
+        field_class = vol.Required if field.get(ATTR_REQUIRED, False) else vol.Optional
+        fields[field_class(key, description=field.get(CONF_DESCRIPTION))] = (
+            selector.selector(field[CONF_SELECTOR])
+        )
+    return vol.Schema(fields, extra=vol.PREVENT_EXTRA)
+
+
+BATCH_ITEM_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_INSTRUCTIONS): cv.string,
+        vol.Optional(ATTR_TASK_NAME): cv.string,
+    }
+)
+
+
+def _coerce_batch_item(value: Any) -> dict[str, str]:
+    """Accept plain instructions as a shorthand for a batch item."""
+    if isinstance(value, str):
+        return {ATTR_INSTRUCTIONS: value}
+    return cast(dict[str, str], BATCH_ITEM_SCHEMA(value))
+
+
+GENERATE_BATCH_SCHEMA: VolDictType = {
+    vol.Required(ATTR_TASK_NAME): cv.string,
+    vol.Required(ATTR_ITEMS): vol.All(
+        cv.ensure_list, vol.Length(min=1), [_coerce_batch_item]
+    ),
+    vol.Optional(ATTR_STRUCTURE): vol.All(dict, _validate_structure),
+    vol.Optional(ATTR_MODE, default=BatchMode.PARALLEL): vol.Coerce(BatchMode),
+    vol.Optional(ATTR_MAX_CONCURRENCY, default=DEFAULT_BATCH_MAX_CONCURRENCY): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=32)
+    ),
+}
+
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry,
+    config_entry: WebhookConversationConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up AI Task entity for webhook conversation."""
-    for subentry in config_entry.subentries.values():
+
+    @callback
+    def async_add_subentry(subentry: ConfigSubentry) -> None:
+        """Add the entity of a subentry."""
         if subentry.subentry_type != "ai_task":
-            continue
+            return
 
         async_add_entities(
             [WebhookAITaskEntity(config_entry, subentry)],
             config_subentry_id=subentry.subentry_id,
         )
 
+    for subentry in config_entry.subentries.values():
+        async_add_subentry(subentry)
+    config_entry.runtime_data.subentry_adders[Platform.AI_TASK] = async_add_subentry
+
+    platform = entity_platform.async_get_current_platform()
+    platform.async_register_entity_service(
+        SERVICE_GENERATE_BATCH,
+        GENERATE_BATCH_SCHEMA,
+        "async_generate_batch",
+        supports_response=SupportsResponse.ONLY,
+    )
+
+
+def _payload_fingerprint(payload: WebhookConversationPayload) -> str:
+    """Return a canonical hash of a task payload, ignoring the conversation ID."""
+    # The structure ID already identifies the structure, skip hashing it again
+    excluded = (
+        {"conversation_id", "structure"}
+        if "structure_id" in payload
+        else {"conversation_id"}
+    )
+    canonical: dict[str, Any] = {
+        key: value for key, value in payload.items() if key not in excluded
+    }
+    if binary_objects := payload.get("binary_objects"):
+        canonical["binary_objects"] = [
+            {
+                "name": binary_object["name"],
+                "mime_type": binary_object["mime_type"],
+                "sha256": hashlib.sha256(binary_object["data"].encode()).hexdigest(),
+            }
+            for binary_object in binary_objects
+        ]
+
+    return hashlib.sha256(
+        json.dumps(
+            canonical, sort_keys=True, separators=(",", ":"), default=str
+        ).encode()
+    ).hexdigest()
+
 
 class WebhookAITaskEntity(WebhookConversationLLMBaseEntity, ai_task.AITaskEntity):
     """Webhook AI Task entity."""
@@ -43,6 +176,22 @@ class WebhookAITaskEntity(WebhookConversationLLMBaseEntity, ai_task.AITaskEntity
         ai_task.AITaskEntityFeature.GENERATE_DATA
         | ai_task.AITaskEntityFeature.SUPPORT_ATTACHMENTS
     )
+    _request_priority = RequestPriority.BACKGROUND
+
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
+        """Initialize the AI task entity."""
+        super().__init__(config_entry, subentry)
+        self._result_cache: TTLCache[str, Any] = TTLCache(
+            subentry.data.get(CONF_RESULT_CACHE_SIZE, DEFAULT_RESULT_CACHE_SIZE),
+            subentry.data.get(CONF_RESULT_CACHE_TTL, DEFAULT_RESULT_CACHE_TTL),
+        )
+        self._in_flight: SingleFlight[str, Any] = SingleFlight()
+        self._send_structure_id: bool = subentry.data.get(
+            CONF_SEND_STRUCTURE_ID, DEFAULT_SEND_STRUCTURE_ID
+        )
+        self._known_structures: set[str] = set()
 
     async def _async_generate_data(
         self,
@@ -56,6 +205,8 @@ class WebhookAITaskEntity(WebhookConversationLLMBaseEntity, ai_task.AITaskEntity
 
         binary_objects: list[WebhookConversationBinaryObject] = []
         if task.attachments:
+            import anyio
+
             for attachment in task.attachments:
                 async with await anyio.open_file(attachment.path, "rb") as f:
                     attachment_bytes = await f.read()
@@ -71,27 +222,202 @@ class WebhookAITaskEntity(WebhookConversationLLMBaseEntity, ai_task.AITaskEntity
             payload["binary_objects"] = binary_objects
 
         if task.structure and task.structure.schema:
-            payload["structure"] = convert(
-                task.structure.schema, custom_serializer=llm.selector_serializer
+            payload["structure_id"], payload["structure"] = convert_structure(
+                task.structure.schema
+            )
+
+        fingerprint = _payload_fingerprint(payload)
+        if (data := self._result_cache.get(fingerprint)) is None:
+            data = await self._in_flight.async_run(
+                fingerprint,
+                lambda: self._async_request_data(fingerprint, task, payload),
+            )
+        else:
+            _LOGGER.debug("Using cached result for AI task %s", task.name)
+
+        return ai_task.GenDataTaskResult(
+            conversation_id=chat_log.conversation_id,
+            data=data,
+        )
+
+    async def _async_request_data(
+        self,
+        fingerprint: str,
+        task: ai_task.GenDataTask,
+        payload: WebhookConversationPayload,
+    ) -> Any:
+        """Request the task result from the webhook and cache it."""
+        request_payload = payload
+        structure_id = payload.get("structure_id")
+        if self._send_structure_id and structure_id in self._known_structures:
+            request_payload = payload.copy()
+            del request_payload["structure"]
+
+        try:
+            reply = await self._async_send_task_payload(
+                request_payload, payload.get("structure")
+            )
+        except WebhookResponseError as err:
+            if (
+                request_payload is payload
+                or err.status != HTTPStatus.PRECONDITION_FAILED
+            ):
+                raise
+            _LOGGER.debug(
+                "Webhook does not know structure %s, sending it again", structure_id
             )
+            if structure_id is not None:
+                self._known_structures.discard(structure_id)
+            reply = await self._async_send_task_payload(
+                payload, payload.get("structure")
+            )
+
+        if structure_id:
+            self._known_structures.add(structure_id)
+
+        data = reply
+        if not task.structure:
+            data = reply if isinstance(reply, str) else str(reply)
+
+        self._result_cache.set(fingerprint, data)
+        return data
+
+    async def _async_send_task_payload(
+        self,
+        payload: WebhookConversationPayload,
+        structure: dict[str, Any] | None,
+    ) -> Any:
+        """Send a task payload and return the reply."""
+        if self._streaming_enabled and structure:
+            return await self._async_stream_structured_output(payload, structure)
 
         if self._streaming_enabled:
             reply_parts = [
                 content_chunk
                 async for content_chunk in self._send_payload_streaming(payload)
             ]
-            reply = "".join(reply_parts)
-        else:
-            reply = await self._send_payload(payload)
+            return "".join(reply_parts)
 
-        if not task.structure:
-            text = reply if isinstance(reply, str) else str(reply)
-            return ai_task.GenDataTaskResult(
-                conversation_id=chat_log.conversation_id,
-                data=text,
+        return await self._send_payload(payload)
+
+    async def _async_stream_structured_output(
+        self, payload: WebhookConversationPayload, structure: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Parse and validate streamed structured output while it arrives."""
+        parser = StructuredOutputParser(structure)
+        async with aclosing(self._send_payload_streaming(payload)) as stream:
+            async for content_chunk in stream:
+                if parser.feed(content_chunk):
+                    break
+
+        if not parser.complete:
+            raise HomeAssistantError("Webhook stream ended before structured output")
+
+        return parser.result
+
+    async def async_generate_batch(
+        self,
+        task_name: str,
+        items: list[dict[str, str]],
+        mode: BatchMode,
+        max_concurrency: int,
+        structure: vol.Schema | None = None,
+    ) -> ServiceResponse:
+        """Generate data for a list of tasks and return the results in order."""
+        if mode == BatchMode.BATCH:
+            results = await self._async_generate_batch_request(
+                task_name, items, structure
+            )
+        else:
+            results = await self._async_generate_batch_parallel(
+                task_name, items, structure, max_concurrency
             )
 
-        return ai_task.GenDataTaskResult(
-            conversation_id=chat_log.conversation_id,
-            data=reply,
+        response: dict[str, Any] = {"results": results}
+        return cast(ServiceResponse, response)
+
+    async def _async_generate_batch_parallel(
+        self,
+        task_name: str,
+        items: list[dict[str, str]],
+        structure: vol.Schema | None,
+        max_concurrency: int,
+    ) -> list[dict[str, Any]]:
+        """Run each task as its own AI task with bounded concurrency."""
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def generate(item: dict[str, str]) -> dict[str, Any]:
+            async with semaphore:
+                result = await ai_task.async_generate_data(
+                    self.hass,
+                    task_name=item.get(ATTR_TASK_NAME, task_name),
+                    entity_id=self.entity_id,
+                    instructions=item[ATTR_INSTRUCTIONS],
+                    structure=structure,
+                )
+            return result.as_dict()
+
+        results = await asyncio.gather(
+            *(generate(item) for item in items), return_exceptions=True
         )
+
+        responses: list[dict[str, Any]] = []
+        for result in results:
+            if isinstance(result, Exception):
+                responses.append({"error": str(result) or type(result).__name__})
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                responses.append(result)
+        return responses
+
+    async def _async_generate_batch_request(
+        self,
+        task_name: str,
+        items: list[dict[str, str]],
+        structure: vol.Schema | None,
+    ) -> list[dict[str, Any]]:
+        """Send all tasks to the webhook in a single request."""
+        payload = WebhookConversationPayload(
+            {
+                "conversation_id": ulid_now(),
+                "messages": [],
+                "system_prompt": DEFAULT_SYSTEM_PROMPT,
+                "stream": False,
+                "query": "",
+                "task_name": task_name,
+                "batch": [
+                    WebhookConversationBatchItem(
+                        task_name=item.get(ATTR_TASK_NAME, task_name),
+                        query=item[ATTR_INSTRUCTIONS],
+                    )
+                    for item in items
+                ],
+            }
+        )
+        if structure is not None:
+            payload["structure_id"], payload["structure"] = convert_structure(
+                structure.schema
+            )
+
+        reply = await self._send_payload(payload)
+        if not isinstance(reply, list) or len(reply) != len(items):
+            raise HomeAssistantError(
+                f"Invalid webhook batch response, expected a list of {len(items)} "
+                f"results: {reply}"
+            )
+
+        responses: list[dict[str, Any]] = []
+        for data in reply:
+            if isinstance(data, dict) and data.keys() == {"error"}:
+                responses.append({"error": str(data["error"])})
+            elif data is None:
+                responses.append({"error": "No result returned by the webhook"})
+            else:
+                responses.append(
+                    {
+                        "conversation_id": payload["conversation_id"],
+                        "data": data if structure is not None else str(data),
+                    }
+                )
+        return responses
@@ -0,0 +1,184 @@
+"""Audio buffers and request bodies that avoid copying the audio."""
+
+from __future__ import annotations
+
+import binascii
+from collections.abc import Buffer, Iterator, Mapping
+from dataclasses import dataclass
+from itertools import zip_longest
+import struct
+from typing import Any
+
+from aiohttp import payload as aiohttp_payload
+from aiohttp.abc import AbstractStreamWriter
+import orjson
+
+from homeassistant.helpers.json import json_encoder_default
+
+WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+WAVE_FORMAT_PCM = 1
+
+# A multiple of 3, so the encoded chunks need no padding in between
+BASE64_CHUNK_SIZE = 3 * 16 * 1024
+
+_PLACEHOLDER = "\x00webhook_conversation_audio\x00"
+_PLACEHOLDER_JSON = orjson.dumps(_PLACEHOLDER)[1:-1]
+
+
+@dataclass(slots=True, frozen=True)
+class PCMFormat:
+    """Sample rate, sample width and channel count of PCM audio."""
+
+    sample_rate: int
+    bits_per_sample: int
+    channels: int
+
+    @property
+    def frame_size(self) -> int:
+        """Return the number of bytes of a frame."""
+        return self.bits_per_sample // 8 * self.channels
+
+
+class AudioBuffer:
+    """Growable buffer collecting the audio of an utterance.
+
+    Chunks are appended in place. With a WAV header, room for the header is
+    reserved up front and filled in once the length of the audio is known,
+    so the WAV file is never copied. No chunks can be appended while a view
+    of the buffer exists.
+    """
+
+    def __init__(self, wav_header: bool = False) -> None:
+        """Initialize the buffer."""
+        self._header_size = WAV_HEADER.size if wav_header else 0
+        self._buffer = bytearray(self._header_size)
+
+    def __len__(self) -> int:
+        """Return the number of audio bytes without the header."""
+        return len(self._buffer) - self._header_size
+
+    def append(self, chunk: Buffer) -> None:
+        """Append a chunk of audio."""
+        self._buffer += chunk
+
+    def write_wav_header(self, audio_format: PCMFormat) -> None:
+        """Write the header of a PCM WAV file into the reserved room."""
+        if not self._header_size:
+            raise ValueError("Buffer has no room for a WAV header")
+        data_size = len(self)
+        WAV_HEADER.pack_into(
+            self._buffer,
+            0,
+            b"RIFF",
+            WAV_HEADER.size - 8 + data_size,
+            b"WAVE",
+            b"fmt ",
+            16,
+            WAVE_FORMAT_PCM,
+            audio_format.channels,
+            audio_format.sample_rate,
+            audio_format.sample_rate * audio_format.frame_size,
+            audio_format.frame_size,
+            audio_format.bits_per_sample,
+            b"data",
+            data_size,
+        )
+
+    def view(self) -> memoryview:
+        """Return a view of the buffer including the header."""
+        return memoryview(self._buffer)
+
+
+class Base64Audio:
+    """Audio that is only encoded to base64 when it is sent.
+
+    Its length is the length of the encoded text.
+    """
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: memoryview) -> None:
+        """Initialize the audio."""
+        self._data = data
+
+    def __len__(self) -> int:
+        """Return the length of the encoded audio."""
+        return (self._data.nbytes + 2) // 3 * 4
+
+    def __str__(self) -> str:
+        """Return the encoded audio."""
+        return binascii.b2a_base64(self._data, newline=False).decode("ascii")
+
+    def iter_encoded(self) -> Iterator[bytes]:
+        """Encode the audio in chunks."""
+        data = self._data
+        for start in range(0, data.nbytes, BASE64_CHUNK_SIZE):
+            yield binascii.b2a_base64(
+                data[start : start + BASE64_CHUNK_SIZE], newline=False
+            )
+
+
+def audio_json_default(obj: Any) -> Any:
+    """Convert audio and Home Assistant objects when serializing a payload."""
+    if isinstance(obj, Base64Audio):
+        return str(obj)
+    return json_encoder_default(obj)
+
+
+class JSONAudioPayload(aiohttp_payload.Payload):
+    """JSON request body which encodes its audio while it is written.
+
+    The payload is serialized with placeholders for its audio, and the audio
+    is encoded in chunks in between the serialized parts. Neither the encoded
+    audio nor the body are ever held in memory as a whole.
+    """
+
+    _default_content_type = "application/json"
+    _autoclose = True
+
+    def __init__(self, value: Mapping[str, Any]) -> None:
+        """Serialize the payload without its audio."""
+        super().__init__(value)
+        audio: list[Base64Audio] = []
+
+        def default(obj: Any) -> Any:
+            if isinstance(obj, Base64Audio):
+                audio.append(obj)
+                return _PLACEHOLDER
+            return json_encoder_default(obj)
+
+        self._parts = orjson.dumps(
+            value, option=orjson.OPT_NON_STR_KEYS, default=default
+        ).split(_PLACEHOLDER_JSON)
+        self._audio = audio
+        self._size = sum(len(part) for part in self._parts) + sum(
+            len(item) for item in audio
+        )
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        """Return the chunks of the body."""
+        for part, audio in zip_longest(self._parts, self._audio):
+            yield part
+            if audio is not None:
+                yield from audio.iter_encoded()
+
+    def decode(self, encoding: str = "utf-8", errors: str = "strict") -> str:
+        """Return the whole body."""
+        return b"".join(self._iter_chunks()).decode(encoding, errors)
+
+    async def write(self, writer: AbstractStreamWriter) -> None:
+        """Write the body."""
+        await self.write_with_length(writer, None)
+
+    async def write_with_length(
+        self, writer: AbstractStreamWriter, content_length: int | None
+    ) -> None:
+        """Write the body up to a length."""
+        remaining = content_length
+        for chunk in self._iter_chunks():
+            if remaining is not None:
+                if remaining <= 0:
+                    return
+                chunk = chunk[:remaining]
+                remaining -= len(chunk)
+            await writer.write(chunk)
@@ -0,0 +1,88 @@
+"""Caching helpers for the webhook conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+import math
+import time
+
+
+class TTLCache[K: Hashable, V]:
+    """Bounded least recently used cache with a time to live per item."""
+
+    def __init__(self, max_size: int, ttl: float = math.inf) -> None:
+        """Initialize the cache, items never expire without a time to live."""
+        self._max_size = max_size
+        self._ttl = ttl
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Return if the cache stores any items."""
+        return self._max_size > 0 and self._ttl > 0
+
+    def __len__(self) -> int:
+        """Return the number of cached items, including expired ones."""
+        return len(self._data)
+
+    def get(self, key: K) -> V | None:
+        """Return a cached item if present and not expired."""
+        if (item := self._data.get(key)) is None:
+            self.misses += 1
+            return None
+
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: K, value: V, ttl: float | None = None) -> None:
+        """Store an item, evicting the least recently used items if full.
+
+        The time to live of the cache can be overridden for a single item.
+        """
+        if not self.enabled:
+            return
+
+        self._data[key] = (
+            time.monotonic() + (self._ttl if ttl is None else ttl),
+            value,
+        )
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def pop(self, key: K) -> None:
+        """Remove an item if present."""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all items."""
+        self._data.clear()
+
+
+class SingleFlight[K: Hashable, V]:
+    """Share a single in-flight call between concurrent callers with the same key."""
+
+    def __init__(self) -> None:
+        """Initialize the call group."""
+        self._calls: dict[K, asyncio.Future[V]] = {}
+
+    async def async_run(self, key: K, call: Callable[[], Awaitable[V]]) -> V:
+        """Run the call or wait for the in-flight call with the same key."""
+        if (future := self._calls.get(key)) is None:
+            future = asyncio.ensure_future(call())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+
+        # Shield the shared call so a cancelled caller does not cancel the others
+        return await asyncio.shield(future)
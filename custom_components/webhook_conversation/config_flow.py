@@ -7,15 +7,21 @@ from typing import Any, cast
 
 import voluptuous as vol
 
+from homeassistant.components import stt
 from homeassistant.config_entries import (
     ConfigEntry,
     ConfigFlow,
     ConfigFlowResult,
     ConfigSubentryFlow,
+    OptionsFlow,
     SubentryFlowResult,
 )
+from homeassistant.const import CONF_LLM_HASS_API
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import llm
 from homeassistant.helpers.selector import (
+    ObjectSelector,
+    SelectOptionDict,
     SelectSelector,
     SelectSelectorConfig,
     TemplateSelector,
@@ -27,22 +33,61 @@ from homeassistant.util import language as language_util
 from .const import (
     CONF_AUTH_TYPE,
     CONF_ENABLE_STREAMING,
+    CONF_EXPOSED_ENTITIES_ENDPOINT,
+    CONF_EXPOSED_ENTITIES_LIMIT,
+    CONF_EXPOSED_ENTITY_ATTRIBUTES,
+    CONF_MAX_CONCURRENT_REQUESTS,
     CONF_NAME,
     CONF_OUTPUT_FIELD,
     CONF_PASSWORD,
     CONF_PROMPT,
+    CONF_PRUNE_EXPOSED_ENTITIES,
+    CONF_QUEUE_TIMEOUT,
+    CONF_RECORD_TRAFFIC,
+    CONF_RESPONSE_CACHE_SIZE,
+    CONF_RESULT_CACHE_SIZE,
+    CONF_RESULT_CACHE_TTL,
+    CONF_SEND_STRUCTURE_ID,
+    CONF_STREAM_COALESCE_INTERVAL,
+    CONF_STREAM_COALESCE_SIZE,
+    CONF_STT_BIT_DEPTH,
+    CONF_STT_CHANNELS,
+    CONF_STT_END_SILENCE,
+    CONF_STT_SAMPLE_RATE,
+    CONF_STT_SILENCE_THRESHOLD,
+    CONF_STT_TRIM_SILENCE,
     CONF_SUPPORTED_LANGUAGES,
     CONF_TIMEOUT,
     CONF_USERNAME,
     CONF_VOICES,
     CONF_WEBHOOK_URL,
+    CONF_WEBSOCKET_URL,
     DEFAULT_AI_TASK_NAME,
     DEFAULT_AUTH_TYPE,
     DEFAULT_CONVERSATION_NAME,
     DEFAULT_ENABLE_STREAMING,
+    DEFAULT_EXPOSED_ENTITIES_ENDPOINT,
+    DEFAULT_EXPOSED_ENTITIES_LIMIT,
+    DEFAULT_EXPOSED_ENTITY_ATTRIBUTES,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
     DEFAULT_OUTPUT_FIELD,
     DEFAULT_PROMPT,
+    DEFAULT_PRUNE_EXPOSED_ENTITIES,
+    DEFAULT_QUEUE_TIMEOUT,
+    DEFAULT_RECORD_TRAFFIC,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_SIZE,
+    DEFAULT_RESULT_CACHE_TTL,
+    DEFAULT_SEND_STRUCTURE_ID,
+    DEFAULT_STREAM_COALESCE_INTERVAL,
+    DEFAULT_STREAM_COALESCE_SIZE,
+    DEFAULT_STT_BIT_DEPTH,
+    DEFAULT_STT_CHANNELS,
+    DEFAULT_STT_END_SILENCE,
     DEFAULT_STT_NAME,
+    DEFAULT_STT_SAMPLE_RATE,
+    DEFAULT_STT_SILENCE_THRESHOLD,
+    DEFAULT_STT_TRIM_SILENCE,
     DEFAULT_SUPPORTED_LANGUAGES,
     DEFAULT_TIMEOUT,
     DEFAULT_TTS_NAME,
@@ -91,6 +136,10 @@ def _get_subentry_schema(
                 description={"suggested_value": options.get(CONF_WEBHOOK_URL)},
                 default=None,
             ): str,
+            vol.Optional(
+                CONF_WEBSOCKET_URL,
+                description={"suggested_value": options.get(CONF_WEBSOCKET_URL)},
+            ): str,
             vol.Optional(
                 CONF_TIMEOUT,
                 description={
@@ -141,8 +190,128 @@ def _get_subentry_schema(
                     },
                     default=DEFAULT_ENABLE_STREAMING,
                 ): bool,
+                vol.Optional(
+                    CONF_STREAM_COALESCE_INTERVAL,
+                    description={
+                        "suggested_value": options.get(
+                            CONF_STREAM_COALESCE_INTERVAL,
+                            DEFAULT_STREAM_COALESCE_INTERVAL,
+                        )
+                    },
+                    default=DEFAULT_STREAM_COALESCE_INTERVAL,
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=1000)),
+                vol.Optional(
+                    CONF_STREAM_COALESCE_SIZE,
+                    description={
+                        "suggested_value": options.get(
+                            CONF_STREAM_COALESCE_SIZE, DEFAULT_STREAM_COALESCE_SIZE
+                        )
+                    },
+                    default=DEFAULT_STREAM_COALESCE_SIZE,
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=4096)),
             }
         )
+
+        if subentry_type == "conversation":
+            schema_dict.update(
+                {
+                    vol.Optional(
+                        CONF_PRUNE_EXPOSED_ENTITIES,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_PRUNE_EXPOSED_ENTITIES,
+                                DEFAULT_PRUNE_EXPOSED_ENTITIES,
+                            )
+                        },
+                        default=DEFAULT_PRUNE_EXPOSED_ENTITIES,
+                    ): bool,
+                    vol.Optional(
+                        CONF_EXPOSED_ENTITIES_LIMIT,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_EXPOSED_ENTITIES_LIMIT,
+                                DEFAULT_EXPOSED_ENTITIES_LIMIT,
+                            )
+                        },
+                        default=DEFAULT_EXPOSED_ENTITIES_LIMIT,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=1000)),
+                    vol.Optional(
+                        CONF_EXPOSED_ENTITIES_ENDPOINT,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_EXPOSED_ENTITIES_ENDPOINT,
+                                DEFAULT_EXPOSED_ENTITIES_ENDPOINT,
+                            )
+                        },
+                        default=DEFAULT_EXPOSED_ENTITIES_ENDPOINT,
+                    ): bool,
+                    vol.Optional(
+                        CONF_EXPOSED_ENTITY_ATTRIBUTES,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_EXPOSED_ENTITY_ATTRIBUTES,
+                                DEFAULT_EXPOSED_ENTITY_ATTRIBUTES,
+                            )
+                        },
+                    ): ObjectSelector(),
+                    vol.Optional(
+                        CONF_RESPONSE_CACHE_SIZE,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE
+                            )
+                        },
+                        default=DEFAULT_RESPONSE_CACHE_SIZE,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=4096)),
+                }
+            )
+
+        if subentry_type == "conversation" and hass is not None:
+            schema_dict[vol.Optional(
+                CONF_LLM_HASS_API,
+                description={"suggested_value": options.get(CONF_LLM_HASS_API)},
+            )] = SelectSelector(
+                SelectSelectorConfig(
+                    options=[
+                        SelectOptionDict(label=api.name, value=api.id)
+                        for api in llm.async_get_apis(hass)
+                    ],
+                    multiple=True,
+                )
+            )
+
+        if subentry_type == "ai_task":
+            schema_dict.update(
+                {
+                    vol.Optional(
+                        CONF_RESULT_CACHE_TTL,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_RESULT_CACHE_TTL, DEFAULT_RESULT_CACHE_TTL
+                            )
+                        },
+                        default=DEFAULT_RESULT_CACHE_TTL,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=86400)),
+                    vol.Optional(
+                        CONF_RESULT_CACHE_SIZE,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_RESULT_CACHE_SIZE, DEFAULT_RESULT_CACHE_SIZE
+                            )
+                        },
+                        default=DEFAULT_RESULT_CACHE_SIZE,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=4096)),
+                    vol.Optional(
+                        CONF_SEND_STRUCTURE_ID,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_SEND_STRUCTURE_ID, DEFAULT_SEND_STRUCTURE_ID
+                            )
+                        },
+                        default=DEFAULT_SEND_STRUCTURE_ID,
+                    ): bool,
+                }
+            )
     elif subentry_type in ("tts", "stt"):
         default_languages = options.get(
             CONF_SUPPORTED_LANGUAGES, DEFAULT_SUPPORTED_LANGUAGES
@@ -181,10 +350,91 @@ def _get_subentry_schema(
                 },
                 default=DEFAULT_OUTPUT_FIELD,
             )] = str
+            schema_dict.update(
+                {
+                    vol.Optional(
+                        CONF_STT_SAMPLE_RATE,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_SAMPLE_RATE, DEFAULT_STT_SAMPLE_RATE
+                            )
+                        },
+                        default=DEFAULT_STT_SAMPLE_RATE,
+                    ): vol.In([rate.value for rate in stt.AudioSampleRates]),
+                    vol.Optional(
+                        CONF_STT_BIT_DEPTH,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_BIT_DEPTH, DEFAULT_STT_BIT_DEPTH
+                            )
+                        },
+                        default=DEFAULT_STT_BIT_DEPTH,
+                    ): vol.In([bit_rate.value for bit_rate in stt.AudioBitRates]),
+                    vol.Optional(
+                        CONF_STT_CHANNELS,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_CHANNELS, DEFAULT_STT_CHANNELS
+                            )
+                        },
+                        default=DEFAULT_STT_CHANNELS,
+                    ): vol.In([channel.value for channel in stt.AudioChannels]),
+                    vol.Optional(
+                        CONF_STT_TRIM_SILENCE,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_TRIM_SILENCE, DEFAULT_STT_TRIM_SILENCE
+                            )
+                        },
+                        default=DEFAULT_STT_TRIM_SILENCE,
+                    ): bool,
+                    vol.Optional(
+                        CONF_STT_SILENCE_THRESHOLD,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_SILENCE_THRESHOLD,
+                                DEFAULT_STT_SILENCE_THRESHOLD,
+                            )
+                        },
+                        default=DEFAULT_STT_SILENCE_THRESHOLD,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=-90, max=-10)),
+                    vol.Optional(
+                        CONF_STT_END_SILENCE,
+                        description={
+                            "suggested_value": options.get(
+                                CONF_STT_END_SILENCE, DEFAULT_STT_END_SILENCE
+                            )
+                        },
+                        default=DEFAULT_STT_END_SILENCE,
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=10000)),
+                }
+            )
 
     return vol.Schema(schema_dict)
 
 
+def _get_options_schema(options: dict[str, Any]) -> vol.Schema:
+    """Return the config entry options schema."""
+    return vol.Schema(
+        {
+            vol.Required(
+                CONF_MAX_CONCURRENT_REQUESTS,
+                default=options.get(
+                    CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                ),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=64)),
+            vol.Required(
+                CONF_QUEUE_TIMEOUT,
+                default=options.get(CONF_QUEUE_TIMEOUT, DEFAULT_QUEUE_TIMEOUT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=1, max=300)),
+            vol.Required(
+                CONF_RECORD_TRAFFIC,
+                default=options.get(CONF_RECORD_TRAFFIC, DEFAULT_RECORD_TRAFFIC),
+            ): bool,
+        }
+    )
+
+
 def _get_auth_schema(options: dict[str, Any] | None = None) -> vol.Schema:
     """Return the authentication schema."""
     if options is None:
@@ -219,6 +469,12 @@ class WebhookConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         """Handle a flow initialized by the user."""
         return self.async_create_entry(title=MANUFACTURER, data={}, subentries=[])
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry: ConfigEntry) -> OptionsFlow:
+        """Return the options flow for the config entry."""
+        return WebhookConversationOptionsFlow()
+
     @classmethod
     @callback
     def async_get_supported_subentry_types(
@@ -233,6 +489,22 @@ class WebhookConversationConfigFlow(ConfigFlow, domain=DOMAIN):
         }
 
 
+class WebhookConversationOptionsFlow(OptionsFlow):
+    """Options flow for settings shared by all subentries of a config entry."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> ConfigFlowResult:
+        """Manage the request scheduling options."""
+        if user_input is not None:
+            return self.async_create_entry(data=user_input)
+
+        return self.async_show_form(
+            step_id="init",
+            data_schema=_get_options_schema(dict(self.config_entry.options)),
+        )
+
+
 class WebhookSubentryFlowHandler(ConfigSubentryFlow):
     """Flow for managing webhook subentries."""
 
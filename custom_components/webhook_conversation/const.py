@@ -1,5 +1,6 @@
 "Constants for the webhook conversation integration."
 
+from datetime import timedelta
 from enum import StrEnum
 
 from homeassistant.helpers import llm
@@ -19,6 +20,7 @@ DEFAULT_STT_NAME = "Webhook STT"
 
 # Subentry configuration constants
 CONF_WEBHOOK_URL = "webhook_url"
+CONF_WEBSOCKET_URL = "websocket_url"
 CONF_OUTPUT_FIELD = "output_field"
 CONF_TIMEOUT = "timeout"
 CONF_ENABLE_STREAMING = "enable_streaming"
@@ -28,6 +30,27 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_SUPPORTED_LANGUAGES = "supported_languages"
 CONF_VOICES = "voices"
+CONF_RESULT_CACHE_TTL = "result_cache_ttl"
+CONF_RESULT_CACHE_SIZE = "result_cache_size"
+CONF_SEND_STRUCTURE_ID = "send_structure_id"
+CONF_STREAM_COALESCE_INTERVAL = "stream_coalesce_interval"
+CONF_STREAM_COALESCE_SIZE = "stream_coalesce_size"
+CONF_PRUNE_EXPOSED_ENTITIES = "prune_exposed_entities"
+CONF_EXPOSED_ENTITIES_LIMIT = "exposed_entities_limit"
+CONF_EXPOSED_ENTITIES_ENDPOINT = "exposed_entities_endpoint"
+CONF_EXPOSED_ENTITY_ATTRIBUTES = "exposed_entity_attributes"
+CONF_RESPONSE_CACHE_SIZE = "response_cache_size"
+CONF_STT_SAMPLE_RATE = "stt_sample_rate"
+CONF_STT_BIT_DEPTH = "stt_bit_depth"
+CONF_STT_CHANNELS = "stt_channels"
+CONF_STT_TRIM_SILENCE = "stt_trim_silence"
+CONF_STT_SILENCE_THRESHOLD = "stt_silence_threshold"
+CONF_STT_END_SILENCE = "stt_end_silence"
+
+# Config entry options constants
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+CONF_QUEUE_TIMEOUT = "queue_timeout"
+CONF_RECORD_TRAFFIC = "record_traffic"
 
 # Defaults for subentries
 DEFAULT_OUTPUT_FIELD = "output"
@@ -35,6 +58,55 @@ DEFAULT_TIMEOUT = 30
 DEFAULT_ENABLE_STREAMING = True
 DEFAULT_PROMPT = llm.DEFAULT_INSTRUCTIONS_PROMPT
 DEFAULT_SUPPORTED_LANGUAGES = ["en-US"]
+DEFAULT_RESULT_CACHE_TTL = 0
+DEFAULT_RESULT_CACHE_SIZE = 64
+DEFAULT_SEND_STRUCTURE_ID = False
+DEFAULT_STREAM_COALESCE_INTERVAL = 50
+DEFAULT_STREAM_COALESCE_SIZE = 64
+DEFAULT_PRUNE_EXPOSED_ENTITIES = False
+DEFAULT_EXPOSED_ENTITIES_LIMIT = 25
+DEFAULT_EXPOSED_ENTITIES_ENDPOINT = False
+DEFAULT_EXPOSED_ENTITY_ATTRIBUTES: dict[str, list[str]] = {}
+DEFAULT_RESPONSE_CACHE_SIZE = 0
+DEFAULT_STT_SAMPLE_RATE = 16000
+DEFAULT_STT_BIT_DEPTH = 16
+DEFAULT_STT_CHANNELS = 1
+DEFAULT_STT_TRIM_SILENCE = False
+DEFAULT_STT_SILENCE_THRESHOLD = -45
+DEFAULT_STT_END_SILENCE = 0
+
+MAX_TOOL_ITERATIONS = 10
+
+EXPOSED_ENTITIES_URL = "/api/webhook_conversation/{subentry_id}/exposed_entities"
+EXPOSED_ENTITIES_URL_EXPIRATION = timedelta(minutes=5)
+
+# Defaults for config entry options
+DEFAULT_MAX_CONCURRENT_REQUESTS = 4
+DEFAULT_QUEUE_TIMEOUT = 10
+DEFAULT_RECORD_TRAFFIC = False
+
+
+# Services
+SERVICE_GENERATE_BATCH = "generate_batch"
+SERVICE_GET_TRACES = "get_traces"
+SERVICE_PROFILE = "profile"
+
+ATTR_ITEMS = "items"
+ATTR_MODE = "mode"
+ATTR_MAX_CONCURRENCY = "max_concurrency"
+ATTR_TRACE_ID = "trace_id"
+ATTR_DURATION = "duration"
+ATTR_REQUESTS = "requests"
+
+DEFAULT_BATCH_MAX_CONCURRENCY = 4
+DEFAULT_PROFILE_DURATION = 30
+
+
+class BatchMode(StrEnum):
+    """Modes for processing a batch of AI tasks."""
+
+    BATCH = "batch"
+    PARALLEL = "parallel"
 
 
 class AuthType(StrEnum):
@@ -52,6 +124,8 @@ RECOMMENDED_CONVERSATION_OPTIONS = {
     CONF_PROMPT: DEFAULT_PROMPT,
     CONF_TIMEOUT: DEFAULT_TIMEOUT,
     CONF_ENABLE_STREAMING: DEFAULT_ENABLE_STREAMING,
+    CONF_STREAM_COALESCE_INTERVAL: DEFAULT_STREAM_COALESCE_INTERVAL,
+    CONF_STREAM_COALESCE_SIZE: DEFAULT_STREAM_COALESCE_SIZE,
     CONF_AUTH_TYPE: DEFAULT_AUTH_TYPE,
 }
 
@@ -60,7 +134,12 @@ RECOMMENDED_AI_TASK_OPTIONS = {
     CONF_PROMPT: DEFAULT_PROMPT,
     CONF_TIMEOUT: DEFAULT_TIMEOUT,
     CONF_ENABLE_STREAMING: DEFAULT_ENABLE_STREAMING,
+    CONF_STREAM_COALESCE_INTERVAL: DEFAULT_STREAM_COALESCE_INTERVAL,
+    CONF_STREAM_COALESCE_SIZE: DEFAULT_STREAM_COALESCE_SIZE,
     CONF_AUTH_TYPE: DEFAULT_AUTH_TYPE,
+    CONF_RESULT_CACHE_TTL: DEFAULT_RESULT_CACHE_TTL,
+    CONF_RESULT_CACHE_SIZE: DEFAULT_RESULT_CACHE_SIZE,
+    CONF_SEND_STRUCTURE_ID: DEFAULT_SEND_STRUCTURE_ID,
 }
 
 RECOMMENDED_TTS_OPTIONS = {
@@ -73,6 +152,12 @@ RECOMMENDED_STT_OPTIONS = {
     CONF_TIMEOUT: DEFAULT_TIMEOUT,
     CONF_AUTH_TYPE: DEFAULT_AUTH_TYPE,
     CONF_SUPPORTED_LANGUAGES: DEFAULT_SUPPORTED_LANGUAGES,
+    CONF_STT_SAMPLE_RATE: DEFAULT_STT_SAMPLE_RATE,
+    CONF_STT_BIT_DEPTH: DEFAULT_STT_BIT_DEPTH,
+    CONF_STT_CHANNELS: DEFAULT_STT_CHANNELS,
+    CONF_STT_TRIM_SILENCE: DEFAULT_STT_TRIM_SILENCE,
+    CONF_STT_SILENCE_THRESHOLD: DEFAULT_STT_SILENCE_THRESHOLD,
+    CONF_STT_END_SILENCE: DEFAULT_STT_END_SILENCE,
 }
 
 # Legacy constants for backward compatibility
@@ -1,45 +1,80 @@
 """Conversation platform for webhook conversation integration."""
 
 from collections.abc import AsyncIterator
-import json
+from contextlib import aclosing
 import logging
 from typing import Any, Literal
 
+from yarl import URL
+
 from homeassistant.components import conversation
-from homeassistant.components.homeassistant.exposed_entities import async_should_expose
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.const import MATCH_ALL
-from homeassistant.core import HomeAssistant
+from homeassistant.components.http.auth import async_sign_path
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.const import CONF_LLM_HASS_API, MATCH_ALL, Platform
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import (
-    area_registry as ar,
-    device_registry as dr,
-    entity_registry as er,
-)
+from homeassistant.helpers import llm
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.json import json_dumps
+from homeassistant.helpers.network import NoURLAvailableError, get_url
 
-from .const import DOMAIN
+from .const import (
+    CONF_EXPOSED_ENTITIES_ENDPOINT,
+    CONF_EXPOSED_ENTITIES_LIMIT,
+    CONF_EXPOSED_ENTITY_ATTRIBUTES,
+    CONF_PRUNE_EXPOSED_ENTITIES,
+    CONF_RESPONSE_CACHE_SIZE,
+    DEFAULT_EXPOSED_ENTITIES_ENDPOINT,
+    DEFAULT_EXPOSED_ENTITIES_LIMIT,
+    DEFAULT_PRUNE_EXPOSED_ENTITIES,
+    DEFAULT_RESPONSE_CACHE_SIZE,
+    DOMAIN,
+    EXPOSED_ENTITIES_URL,
+    EXPOSED_ENTITIES_URL_EXPIRATION,
+    MAX_TOOL_ITERATIONS,
+)
 from .entity import WebhookConversationLLMBaseEntity
-from .models import WebhookConversationPayload
+from .entity_index import async_get_entity_index, compile_attribute_projection
+from .models import (
+    WebhookConversationConfigEntry,
+    WebhookConversationPayload,
+    WebhookConversationTool,
+)
+from .registry_cache import async_get_registry_cache
+from .response_cache import (
+    CacheDirective,
+    ConversationResponseCache,
+    parse_cache_directive,
+)
+from .stream import parse_tool_call
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry,
+    config_entry: WebhookConversationConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up the integration from a config entry."""
-    for subentry in config_entry.subentries.values():
+
+    @callback
+    def async_add_subentry(subentry: ConfigSubentry) -> None:
+        """Add the entity of a subentry."""
         if subentry.subentry_type != "conversation":
-            continue
+            return
 
         async_add_entities(
             [WebhookConversationEntity(config_entry, subentry)],
             config_subentry_id=subentry.subentry_id,
         )
 
+    for subentry in config_entry.subentries.values():
+        async_add_subentry(subentry)
+    config_entry.runtime_data.subentry_adders[Platform.CONVERSATION] = (
+        async_add_subentry
+    )
+
 
 class WebhookConversationEntity(
     conversation.ConversationEntity,
@@ -50,10 +85,18 @@ class WebhookConversationEntity(
 
     _attr_supported_features = conversation.ConversationEntityFeature.CONTROL
 
-    def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
         """Initialize the agent."""
         super().__init__(config_entry, subentry)
         self._attr_supports_streaming = self._streaming_enabled
+        self._attribute_projection = compile_attribute_projection(
+            subentry.data.get(CONF_EXPOSED_ENTITY_ATTRIBUTES)
+        )
+        self._response_cache = ConversationResponseCache(
+            subentry.data.get(CONF_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_SIZE)
+        )
 
     @property
     def supported_languages(self) -> list[str] | Literal["*"]:
@@ -79,7 +122,7 @@ class WebhookConversationEntity(
         try:
             await chat_log.async_provide_llm_data(
                 user_input.as_llm_context(DOMAIN),
-                user_llm_hass_api=None,
+                user_llm_hass_api=self._subentry.data.get(CONF_LLM_HASS_API) or None,
                 user_llm_prompt=self._system_prompt,
                 user_extra_system_prompt=user_input.extra_system_prompt,
             )
@@ -96,7 +139,6 @@ class WebhookConversationEntity(
         chat_log: conversation.ChatLog,
     ) -> None:
         """Send the chat log to the webhook and process the response."""
-        payload = self._build_payload(chat_log)
         user_messages = [
             self._convert_content_to_param(user_message)
             for user_message in chat_log.content
@@ -106,100 +148,232 @@ class WebhookConversationEntity(
         if not user_messages:
             raise HomeAssistantError("No user message found in chat log")
 
-        def set_default(obj: Any) -> Any:
-            if isinstance(obj, set):
-                return list(obj)
-            return obj
+        # Only the first turn of a conversation is answered from the cache,
+        # later turns may depend on the conversation history
+        query = user_messages[-1]["content"]
+        agent_id = user_input.agent_id or self.entity_id
+        cacheable = self._response_cache.enabled and len(chat_log.content) == 2
+        if cacheable and (
+            response := self._response_cache.async_get(
+                self.hass, query, user_input.language, agent_id
+            )
+        ):
+            _LOGGER.debug("Serving cached response to: %s", query)
+            await self._async_add_cached_response(chat_log, response)
+            return
 
-        device_registry = dr.async_get(self.hass)
+        payload = self._build_payload(chat_log)
 
-        payload["query"] = user_messages[-1]["content"]
-        payload["agent_id"] = user_input.agent_id
-        payload["device_id"] = user_input.device_id
-        payload["device_info"] = (
-            (
-                device.dict_repr
-                if (device := device_registry.async_get(user_input.device_id))
-                else None
-            )
+        registry_cache = async_get_registry_cache(self.hass)
+        device = (
+            registry_cache.async_get_device(user_input.device_id)
             if user_input.device_id
             else None
         )
-        payload["exposed_entities"] = json.dumps(
-            self._get_exposed_entities(), default=set_default
+
+        payload["query"] = query
+        payload["agent_id"] = user_input.agent_id
+        payload["device_id"] = user_input.device_id
+        payload["device_info"] = device.info if device else None
+        self._add_exposed_entities(
+            payload, payload["query"], device.area_id if device else None
         )
         payload["language"] = user_input.language
         payload["user_id"] = user_input.context.user_id
+        if chat_log.llm_api:
+            # Only agents controlling Home Assistant need the converter
+            from voluptuous_openapi import convert
 
-        if self._streaming_enabled:
-            async for _ in chat_log.async_add_delta_content_stream(
-                self.entity_id,
-                self._transform_webhook_stream(payload),
-            ):
-                pass
-        else:
-            reply = await self._send_payload(payload)
-            async for _ in chat_log.async_add_assistant_content(
-                conversation.AssistantContent(
-                    self.entity_id,
-                    reply,
+            payload["tools"] = [
+                WebhookConversationTool(
+                    {
+                        "name": tool.name,
+                        "description": tool.description,
+                        "parameters": convert(
+                            tool.parameters,
+                            custom_serializer=chat_log.llm_api.custom_serializer,
+                        ),
+                    }
                 )
+                for tool in chat_log.llm_api.tools
+            ]
+
+        # Tools requested by the webhook are executed locally and their
+        # results are sent back in a follow-up request of the same turn
+        directives: list[CacheDirective] = []
+        for _iteration in range(MAX_TOOL_ITERATIONS):
+            if self._streaming_enabled:
+                async for _ in chat_log.async_add_delta_content_stream(
+                    self.entity_id,
+                    self._transform_webhook_stream(payload, chat_log, directives),
+                ):
+                    pass
+            else:
+                result = await self._send_payload_json(payload)
+                if directive := parse_cache_directive(
+                    result.get("cache_ttl"), result.get("cache_entities")
+                ):
+                    directives.append(directive)
+                tool_calls = self._get_tool_calls(result, chat_log)
+                if not tool_calls and self._output_field not in result:
+                    raise HomeAssistantError(f"Invalid webhook response: {result}")
+                async for _ in chat_log.async_add_assistant_content(
+                    conversation.AssistantContent(
+                        self.entity_id,
+                        result.get(self._output_field),
+                        tool_calls=tool_calls or None,
+                    )
+                ):
+                    pass
+
+            if not chat_log.unresponded_tool_results:
+                break
+            # Responses that needed tools are never cached, as serving them
+            # from the cache would skip the tool calls
+            cacheable = False
+            payload["messages"] = self._build_messages(chat_log)
+
+        last_content = chat_log.content[-1]
+        if (
+            cacheable
+            and directives
+            and isinstance(last_content, conversation.AssistantContent)
+            and last_content.content
+        ):
+            self._response_cache.async_set(
+                self.hass,
+                query,
+                user_input.language,
+                agent_id,
+                last_content.content,
+                directives[-1],
+            )
+
+    async def _async_add_cached_response(
+        self, chat_log: conversation.ChatLog, response: str
+    ) -> None:
+        """Add a cached response to the chat log, streamed if enabled."""
+        if not self._streaming_enabled:
+            async for _ in chat_log.async_add_assistant_content(
+                conversation.AssistantContent(self.entity_id, response)
             ):
                 pass
+            return
+
+        async def _cached_stream() -> AsyncIterator[
+            conversation.AssistantContentDeltaDict
+        ]:
+            yield {"role": "assistant"}
+            yield {"content": response}
+
+        async for _ in chat_log.async_add_delta_content_stream(
+            self.entity_id, _cached_stream()
+        ):
+            pass
+
+    def _get_tool_calls(
+        self, result: dict[str, Any], chat_log: conversation.ChatLog
+    ) -> list[llm.ToolInput]:
+        """Return the tool calls requested in a webhook response."""
+        if not (tool_calls := result.get("tool_calls")):
+            return []
+        if not chat_log.llm_api:
+            _LOGGER.warning("Ignoring tool calls without an LLM API: %s", tool_calls)
+            return []
+        return [
+            tool_input
+            for tool_call in tool_calls
+            if isinstance(tool_call, dict)
+            and (tool_input := parse_tool_call(tool_call)) is not None
+        ]
 
     async def _transform_webhook_stream(
-        self, payload: WebhookConversationPayload
+        self,
+        payload: WebhookConversationPayload,
+        chat_log: conversation.ChatLog,
+        directives: list[CacheDirective],
     ) -> AsyncIterator[conversation.AssistantContentDeltaDict]:
-        """Transform webhook streaming content into HA format."""
+        """Transform webhook streaming content into HA format.
+
+        Cache directives of the webhook are collected in the given list.
+        """
         yield {"role": "assistant"}
 
-        async for content_delta in self._send_payload_streaming(payload):
-            _LOGGER.debug("Webhook streaming response: %s", content_delta)
-            yield {"content": content_delta}
+        async with aclosing(self._send_payload_stream(payload)) as stream:
+            async for delta in stream:
+                _LOGGER.debug("Webhook streaming response: %s", delta)
+                if isinstance(delta, str):
+                    yield {"content": delta}
+                elif isinstance(delta, CacheDirective):
+                    directives.append(delta)
+                elif chat_log.llm_api:
+                    yield {"tool_calls": [delta]}
+                else:
+                    _LOGGER.warning("Ignoring tool call without an LLM API: %s", delta)
 
-    def _get_exposed_entities(self) -> list[dict[str, Any]]:
-        states = [
-            state
-            for state in self.hass.states.async_all()
-            if async_should_expose(self.hass, conversation.DOMAIN, state.entity_id)
-        ]
-        entity_registry = er.async_get(self.hass)
-        device_registry = dr.async_get(self.hass)
-        area_registry = ar.async_get(self.hass)
-        exposed_entities: list[dict[str, Any]] = []
-
-        for state in states:
-            entity_id = state.entity_id
-            entity = entity_registry.async_get(entity_id)
-
-            aliases: list[str] = []
-            if entity and entity.aliases:
-                aliases = list(entity.aliases)
-
-            area_id = None
-            area_name = None
-
-            if entity and entity.area_id:
-                area_id = entity.area_id
-                area = area_registry.async_get_area(area_id)
-                if area:
-                    area_name = area.name
-            elif entity and entity.device_id:
-                device = device_registry.async_get(entity.device_id)
-                if device and device.area_id:
-                    area_id = device.area_id
-                    area = area_registry.async_get_area(area_id)
-                    if area:
-                        area_name = area.name
-
-            exposed_entities.append(
-                {
-                    "entity_id": entity_id,
-                    "name": state.name,
-                    "state": state.state,
-                    "aliases": aliases,
-                    "area_id": area_id,
-                    "area_name": area_name,
-                }
+    def _get_exposed_entities_params(
+        self, query: str, area_id: str | None
+    ) -> dict[str, str]:
+        """Return the filters selecting the exposed entities to send for a query.
+
+        If pruning is enabled, only the entities matching the query and the
+        entities in the area of the requesting device are sent, unless no
+        entity matches the query at all.
+        """
+        if not self._subentry.data.get(
+            CONF_PRUNE_EXPOSED_ENTITIES, DEFAULT_PRUNE_EXPOSED_ENTITIES
+        ):
+            return {}
+        params = {
+            "query": query,
+            "limit": str(
+                self._subentry.data.get(
+                    CONF_EXPOSED_ENTITIES_LIMIT, DEFAULT_EXPOSED_ENTITIES_LIMIT
+                )
+            ),
+        }
+        if area_id:
+            params["area_id"] = area_id
+        return params
+
+    def _add_exposed_entities(
+        self,
+        payload: WebhookConversationPayload,
+        query: str,
+        area_id: str | None,
+    ) -> None:
+        """Add the exposed entities, or where to fetch them, to a payload."""
+        index = async_get_entity_index(self.hass)
+        params = self._get_exposed_entities_params(query, area_id)
+        entity_ids = index.async_select(
+            params.get("query"),
+            int(params.get("limit", DEFAULT_EXPOSED_ENTITIES_LIMIT)),
+            params.get("area_id"),
+        )
+
+        if not self._subentry.data.get(
+            CONF_EXPOSED_ENTITIES_ENDPOINT, DEFAULT_EXPOSED_ENTITIES_ENDPOINT
+        ):
+            payload["exposed_entities"] = json_dumps(
+                index.async_get_details(entity_ids, self._attribute_projection)
             )
-        return exposed_entities
+            return
+
+        path = URL(
+            EXPOSED_ENTITIES_URL.format(subentry_id=self._subentry.subentry_id)
+        ).with_query(params)
+        signed_path = async_sign_path(
+            self.hass,
+            str(path),
+            EXPOSED_ENTITIES_URL_EXPIRATION,
+            use_content_user=True,
+        )
+        try:
+            base_url = get_url(self.hass)
+        except NoURLAvailableError:
+            base_url = ""
+        payload["exposed_entities_url"] = f"{base_url}{signed_path}"
+        etag = index.async_etag(
+            entity_ids, self._subentry.data.get(CONF_EXPOSED_ENTITY_ATTRIBUTES)
+        )
+        payload["exposed_entities_etag"] = f'"{etag}"'
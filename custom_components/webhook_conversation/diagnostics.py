@@ -0,0 +1,98 @@
+"""Diagnostics support for webhook conversation."""
+
+from __future__ import annotations
+
+from dataclasses import asdict
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.components.homeassistant.exposed_entities import async_should_expose
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_PASSWORD, CONF_USERNAME, CONF_WEBHOOK_URL, CONF_WEBSOCKET_URL
+from .models import WebhookConversationConfigEntry
+from .structured_output import schema_cache_stats
+from .telemetry import RequestMetrics
+from .tracing import async_get_tracer
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, CONF_WEBHOOK_URL, CONF_WEBSOCKET_URL}
+
+
+def _metrics_diagnostics(metrics: RequestMetrics) -> dict[str, Any]:
+    """Return the counters, percentiles and recent requests of a subentry."""
+    shapes = [trace.payload_shape or {} for trace in metrics.recent]
+    return {
+        "requests": metrics.requests,
+        "errors": metrics.errors,
+        "timeouts": metrics.timeouts,
+        "request_bytes": metrics.request_bytes,
+        "response_bytes": metrics.response_bytes,
+        "percentiles_ms": {
+            name: metrics.percentiles(name)
+            for name in (
+                "connect_time",
+                "time_to_first_byte",
+                "time_to_first_chunk",
+                "duration",
+                "stream_reader_blocked",
+                "stream_consumer_waited",
+            )
+        },
+        "stream_buffer_high_water": {
+            "bytes": max(
+                (trace.stream_buffer_bytes or 0 for trace in metrics.recent),
+                default=None,
+            ),
+            "chunks": max(
+                (trace.stream_buffer_chunks or 0 for trace in metrics.recent),
+                default=None,
+            ),
+        },
+        "max_payload_lengths": {
+            field: max(
+                (shape[field]["length"] for shape in shapes if field in shape),
+                default=None,
+            )
+            for field in ("messages", "exposed_entities", "binary_objects")
+        },
+        "recent_requests": [trace.as_dict() for trace in metrics.recent],
+    }
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: WebhookConversationConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    runtime_data = entry.runtime_data
+    telemetry = runtime_data.telemetry
+
+    return {
+        "title": entry.title,
+        "options": dict(entry.options),
+        "subentries": {
+            subentry_id: {
+                "subentry_type": subentry.subentry_type,
+                "title": subentry.title,
+                "data": async_redact_data(dict(subentry.data), TO_REDACT),
+                "metrics": _metrics_diagnostics(telemetry.metrics(subentry_id)),
+            }
+            for subentry_id, subentry in entry.subentries.items()
+        },
+        "scheduler": {
+            "active": runtime_data.scheduler.active,
+            "queued": runtime_data.scheduler.queued,
+            "hosts": [asdict(stats) for stats in runtime_data.scheduler.stats.values()],
+        },
+        "exposed_entities": sum(
+            async_should_expose(hass, conversation.DOMAIN, state.entity_id)
+            for state in hass.states.async_all()
+        ),
+        "structure_cache": schema_cache_stats(),
+        "spans": [
+            span.as_dict()
+            for span in async_get_tracer(hass).async_get_spans(
+                subentry_ids=set(entry.subentries)
+            )
+        ],
+    }
@@ -2,54 +2,88 @@
 
 from __future__ import annotations
 
+import asyncio
 import base64
-from collections.abc import AsyncGenerator
 import json
+from collections.abc import AsyncGenerator, AsyncIterator, Mapping
+from contextlib import AbstractAsyncContextManager, aclosing, asynccontextmanager
 import logging
+import time
 from typing import Any
 
 import aiohttp
 
 from homeassistant.components import conversation
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.config_entries import ConfigSubentry
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers import device_registry as dr, llm
 from homeassistant.helpers.entity import Entity
 
+from .audio import JSONAudioPayload
 from .const import (
     CONF_AUTH_TYPE,
     CONF_ENABLE_STREAMING,
     CONF_OUTPUT_FIELD,
     CONF_PASSWORD,
     CONF_PROMPT,
+    CONF_STREAM_COALESCE_INTERVAL,
+    CONF_STREAM_COALESCE_SIZE,
     CONF_TIMEOUT,
     CONF_USERNAME,
     CONF_WEBHOOK_URL,
+    CONF_WEBSOCKET_URL,
     DEFAULT_AUTH_TYPE,
     DEFAULT_ENABLE_STREAMING,
     DEFAULT_OUTPUT_FIELD,
+    DEFAULT_STREAM_COALESCE_INTERVAL,
+    DEFAULT_STREAM_COALESCE_SIZE,
     DEFAULT_TIMEOUT,
     DOMAIN,
     MANUFACTURER,
     AuthType,
 )
-from .models import WebhookConversationMessage, WebhookConversationPayload
+from .models import (
+    WebhookConversationConfigEntry,
+    WebhookConversationMessage,
+    WebhookConversationPayload,
+    WebhookConversationToolCall,
+)
+from .profiling import async_get_profiler
+from .response_cache import CacheDirective
+from .scheduler import RequestPriority
+from .stream import StreamBuffer, async_iter_stream_content
+from .telemetry import TRACE_CONTEXT_KEY, RequestTrace, describe_payload
+from .tracing import TRACEPARENT_HEADER, async_get_tracer
+from .transport import WebhookResponse, WebSocketTransport
 
 _LOGGER = logging.getLogger(__name__)
 
 
+class WebhookResponseError(HomeAssistantError):
+    """Error raised when the webhook responds with an unexpected HTTP status."""
+
+    def __init__(self, status: int, reason: str | None) -> None:
+        """Initialize the error."""
+        super().__init__(f"Error contacting webhook: HTTP {status} - {reason}")
+        self.status = status
+
+
 class WebhookConversationBaseEntity(Entity):
     """Base entity for webhook conversation integration providing shared basics."""
 
     _attr_has_entity_name = True
     _attr_name: str | None = None
+    _request_priority = RequestPriority.INTERACTIVE
 
-    def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
         """Initialize base properties shared by all webhook conversation entities."""
         self._config_entry = config_entry
         self._subentry = subentry
         self._webhook_url = subentry.data[CONF_WEBHOOK_URL]
+        self._websocket_url: str | None = subentry.data.get(CONF_WEBSOCKET_URL)
+        self._transport: WebSocketTransport | None = None
         self._auth_type = subentry.data.get(CONF_AUTH_TYPE, DEFAULT_AUTH_TYPE)
         self._attr_unique_id = subentry.subentry_id
         self._attr_device_info = dr.DeviceInfo(
@@ -59,6 +93,24 @@ class WebhookConversationBaseEntity(Entity):
             entry_type=dr.DeviceEntryType.SERVICE,
         )
 
+    async def async_added_to_hass(self) -> None:
+        """Connect the WebSocket transport if one is configured."""
+        await super().async_added_to_hass()
+        if self._websocket_url:
+            headers = self._get_auth_headers()
+            del headers["Content-Type"]
+            self._transport = WebSocketTransport(
+                self.hass, self._config_entry, self._websocket_url, headers
+            )
+            self._transport.start()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Close the WebSocket transport."""
+        if self._transport is not None:
+            await self._transport.async_close()
+            self._transport = None
+        await super().async_will_remove_from_hass()
+
     def _get_auth_headers(self) -> dict[str, str]:
         """Get authentication headers based on configured auth type."""
         headers = {"Content-Type": "application/json"}
@@ -79,91 +131,194 @@ class WebhookConversationBaseEntity(Entity):
 
         return headers
 
+    @asynccontextmanager
+    async def _async_post(
+        self,
+        payload: Mapping[str, Any],
+        trace: RequestTrace | None = None,
+        *,
+        stream_body: bool = False,
+    ) -> AsyncIterator[WebhookResponse]:
+        """Post a payload to the webhook once a request slot is available.
+
+        The request is sent over the WebSocket transport while it is connected
+        and as an HTTP POST otherwise. It is traced and recorded in the metrics
+        of the subentry once the response has been consumed. A W3C traceparent
+        links it to the other webhook requests of the same pipeline run. With
+        stream_body, the HTTP body is serialized while it is sent, so its
+        audio is encoded in chunks instead of at once.
+        """
+        timeout = self._subentry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+        headers = self._get_auth_headers()
+        runtime_data = self._config_entry.runtime_data
+        metrics = runtime_data.telemetry.metrics(self._subentry.subentry_id)
+        span = async_get_tracer(self.hass).async_start_span(self._subentry)
+        headers[TRACEPARENT_HEADER] = span.traceparent
+        trace = trace or RequestTrace()
+
+        try:
+            async with runtime_data.scheduler.async_slot(
+                self._webhook_url, self._request_priority
+            ):
+                trace.start = time.monotonic()
+                trace.timestamp = time.time()
+                trace.payload_shape = describe_payload(payload)
+                timed_out = False
+                request: AbstractAsyncContextManager[WebhookResponse]
+                if self._transport is not None and self._transport.connected:
+                    request = self._transport.async_request(
+                        payload, span.traceparent, trace, timeout
+                    )
+                elif stream_body:
+                    request = runtime_data.session.post(
+                        self._webhook_url,
+                        data=JSONAudioPayload(payload),
+                        headers=headers,
+                        timeout=client_timeout,
+                        trace_request_ctx={TRACE_CONTEXT_KEY: trace},
+                    )
+                else:
+                    request = runtime_data.session.post(
+                        self._webhook_url,
+                        json=payload,
+                        headers=headers,
+                        timeout=client_timeout,
+                        trace_request_ctx={TRACE_CONTEXT_KEY: trace},
+                    )
+                try:
+                    async with request as response:
+                        try:
+                            yield response
+                        finally:
+                            trace.response_bytes = response.content.total_bytes
+                            if response.status != 200:
+                                trace.error = f"HTTP {response.status}"
+                except TimeoutError:
+                    timed_out = True
+                    trace.error = "timeout"
+                    raise
+                except Exception as err:
+                    trace.error = trace.error or type(err).__name__
+                    raise
+                finally:
+                    trace.end = time.monotonic()
+                    metrics.async_record(trace, timeout=timed_out)
+                    if runtime_data.recorder is not None:
+                        runtime_data.recorder.async_record(
+                            self._subentry.subentry_type, payload, trace
+                        )
+        except HomeAssistantError:
+            # Request errors are already recorded, so this is the scheduler
+            # giving up on waiting for a request slot
+            trace.error = trace.error or "queue timeout"
+            raise
+        finally:
+            span.async_end(trace.status, trace.error)
+            async_get_profiler(self.hass).async_request_finished()
+
 
 class WebhookConversationLLMBaseEntity(WebhookConversationBaseEntity):
     """Base entity for LLM-based webhook conversation entities (conversation and AI task)."""
 
-    def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
         """Initialize LLM-specific properties."""
         super().__init__(config_entry, subentry)
         self._system_prompt = subentry.data[CONF_PROMPT]
         self._streaming_enabled: bool = subentry.data.get(
             CONF_ENABLE_STREAMING, DEFAULT_ENABLE_STREAMING
         )
+        self._coalesce_interval: float = (
+            subentry.data.get(
+                CONF_STREAM_COALESCE_INTERVAL, DEFAULT_STREAM_COALESCE_INTERVAL
+            )
+            / 1000
+        )
+        self._coalesce_size: int = subentry.data.get(
+            CONF_STREAM_COALESCE_SIZE, DEFAULT_STREAM_COALESCE_SIZE
+        )
 
-    async def _send_payload(self, payload: WebhookConversationPayload) -> Any:
-        """Send the payload to the webhook."""
+    @property
+    def _output_field(self) -> str:
+        """Return the field of the webhook response containing the reply."""
+        output_field: str = self._subentry.data.get(
+            CONF_OUTPUT_FIELD, DEFAULT_OUTPUT_FIELD
+        )
+        return output_field
+
+    async def _send_payload_json(
+        self, payload: WebhookConversationPayload
+    ) -> dict[str, Any]:
+        """Send the payload to the webhook and return the JSON response."""
         _LOGGER.debug(
             "Webhook request: %s",
             payload,
         )
 
-        timeout = self._subentry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-        session = async_get_clientsession(self.hass)
-        client_timeout = aiohttp.ClientTimeout(total=timeout)
-        headers = self._get_auth_headers()
-
-        async with session.post(
-            self._webhook_url,
-            json=payload,
-            headers=headers,
-            timeout=client_timeout,
-        ) as response:
+        async with self._async_post(payload) as response:
             if response.status != 200:
-                raise HomeAssistantError(
-                    f"Error contacting webhook: HTTP {response.status} - {response.reason}"
-                )
+                raise WebhookResponseError(response.status, response.reason)
             result = await response.json()
 
-        output_field: str = self._subentry.data.get(
-            CONF_OUTPUT_FIELD, DEFAULT_OUTPUT_FIELD
-        )
-        if not isinstance(result, dict) or output_field not in result:
+        if not isinstance(result, dict):
             raise HomeAssistantError(f"Invalid webhook response: {result}")
 
         _LOGGER.debug("Webhook response: %s", result)
-        return result.get(output_field)
+        return result
+
+    async def _send_payload(self, payload: WebhookConversationPayload) -> Any:
+        """Send the payload to the webhook and return the reply."""
+        result = await self._send_payload_json(payload)
+        if self._output_field not in result:
+            raise HomeAssistantError(f"Invalid webhook response: {result}")
+        return result[self._output_field]
 
     async def _send_payload_streaming(
         self, payload: WebhookConversationPayload
     ) -> AsyncGenerator[str]:
-        """Send the payload to the webhook and stream the response."""
-        _LOGGER.debug("Webhook streaming request: %s", payload)
+        """Send the payload to the webhook and stream the reply."""
+        async with aclosing(self._send_payload_stream(payload)) as stream:
+            async for delta in stream:
+                if isinstance(delta, str):
+                    yield delta
+                elif isinstance(delta, llm.ToolInput):
+                    _LOGGER.warning("Ignoring unsupported tool call: %s", delta)
 
-        timeout = self._subentry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-        session = async_get_clientsession(self.hass)
-        client_timeout = aiohttp.ClientTimeout(total=timeout)
-        headers = self._get_auth_headers()
+    async def _send_payload_stream(
+        self, payload: WebhookConversationPayload
+    ) -> AsyncGenerator[str | llm.ToolInput | CacheDirective]:
+        """Send the payload to the webhook and stream the reply and tool calls."""
+        _LOGGER.debug("Webhook streaming request: %s", payload)
 
-        async with session.post(
-            self._webhook_url,
-            json=payload,
-            headers=headers,
-            timeout=client_timeout,
-        ) as response:
+        trace = RequestTrace()
+        async with self._async_post(payload, trace) as response:
             if response.status != 200:
-                raise HomeAssistantError(
-                    f"Error contacting webhook: HTTP {response.status} - {response.reason}"
-                )
+                raise WebhookResponseError(response.status, response.reason)
 
-            async for line in response.content:
-                if line:
-                    line_str = line.decode("utf-8").strip()
-                    if line_str:
-                        try:
-                            chunk_data = json.loads(line_str)
-                            if (
-                                chunk_data.get("type") == "item"
-                                and "content" in chunk_data
-                            ):
-                                yield chunk_data["content"]
-                            elif chunk_data.get("type") == "end":
-                                break
-                        except json.JSONDecodeError:
-                            _LOGGER.warning(
-                                "Failed to parse streaming response chunk: %s", line_str
-                            )
-                            continue
+            # Read the response in a separate task, so a slow chat log does
+            # not stall the connection until the buffer is full
+            buffer = StreamBuffer(trace)
+            reader = self._config_entry.async_create_task(
+                self.hass,
+                buffer.async_read(response.content),
+                f"{DOMAIN} stream reader",
+            )
+            try:
+                async with aclosing(
+                    async_iter_stream_content(
+                        buffer,
+                        response.content_type,
+                        self._coalesce_interval,
+                        self._coalesce_size,
+                    )
+                ) as stream:
+                    async for content in stream:
+                        yield content
+            finally:
+                reader.cancel()
+                await asyncio.wait((reader,))
 
     def _build_payload(
         self, chat_log: conversation.ChatLog
@@ -173,14 +328,9 @@ class WebhookConversationLLMBaseEntity(WebhookConversationBaseEntity):
         if not isinstance(system_message, conversation.SystemContent):
             raise TypeError("First message must be a system message")
 
-        messages = [
-            self._convert_content_to_param(content)
-            for content in chat_log.content[1:-1]
-        ]
-
         return WebhookConversationPayload(
             {
-                "messages": messages,
+                "messages": self._build_messages(chat_log),
                 "conversation_id": chat_log.conversation_id,
                 "system_prompt": system_message.content,
                 "stream": self._streaming_enabled,
@@ -188,15 +338,45 @@ class WebhookConversationLLMBaseEntity(WebhookConversationBaseEntity):
             }
         )
 
+    def _build_messages(
+        self, chat_log: conversation.ChatLog
+    ) -> list[WebhookConversationMessage]:
+        """Return the messages of the chat log after the system prompt.
+
+        A trailing user message is sent as the query instead, while tool
+        results that follow it are part of the messages.
+        """
+        contents = chat_log.content[1:]
+        if contents and isinstance(contents[-1], conversation.UserContent):
+            contents = contents[:-1]
+        return [self._convert_content_to_param(content) for content in contents]
+
     def _convert_content_to_param(
         self, content: conversation.Content
     ) -> WebhookConversationMessage:
         """Convert native chat content into a simple dict."""
-        return WebhookConversationMessage(
-            {
-                "role": content.role,
-                "content": str(content.tool_result or "")
-                if isinstance(content, conversation.ToolResultContent)
-                else content.content or "",
-            }
+        if isinstance(content, conversation.ToolResultContent):
+            return WebhookConversationMessage(
+                {
+                    "role": content.role,
+                    "content": json.dumps(content.tool_result),
+                    "tool_call_id": content.tool_call_id,
+                    "tool_name": content.tool_name,
+                }
+            )
+
+        message = WebhookConversationMessage(
+            {"role": content.role, "content": content.content or ""}
         )
+        if isinstance(content, conversation.AssistantContent) and content.tool_calls:
+            message["tool_calls"] = [
+                WebhookConversationToolCall(
+                    {
+                        "id": tool_call.id,
+                        "name": tool_call.tool_name,
+                        "args": tool_call.tool_args,
+                    }
+                )
+                for tool_call in content.tool_calls
+            ]
+        return message
@@ -0,0 +1,380 @@
+"""Index of exposed entities to find the ones relevant to a query."""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+import difflib
+from functools import lru_cache
+import hashlib
+import logging
+import math
+import re
+from typing import Any
+
+from homeassistant.components import conversation
+from homeassistant.components.homeassistant.exposed_entities import (
+    async_listen_entity_updates,
+    async_should_expose,
+)
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import (
+    Event,
+    EventStateChangedData,
+    HomeAssistant,
+    State,
+    callback,
+)
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.json import json_bytes_sorted
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+from .registry_cache import async_get_registry_cache
+
+_LOGGER = logging.getLogger(__name__)
+
+DATA_ENTITY_INDEX: HassKey[ExposedEntityIndex] = HassKey(f"{DOMAIN}_entity_index")
+
+FUZZY_CUTOFF = 0.8
+FUZZY_MIN_LENGTH = 4
+
+ALL_DOMAINS = "*"
+
+_TOKEN = re.compile(r"\w+")
+
+type AttributeExtractor = Callable[[Mapping[str, Any]], dict[str, Any]]
+type AttributeProjection = Mapping[str, AttributeExtractor]
+
+
+def tokenize(text: str) -> set[str]:
+    """Return the lowercase words of a text."""
+    return set(_TOKEN.findall(text.casefold().replace("_", " ")))
+
+
+def _attribute_extractor(names: tuple[str, ...]) -> AttributeExtractor:
+    """Return a function picking the given attributes of a state."""
+
+    def extract(attributes: Mapping[str, Any]) -> dict[str, Any]:
+        return {name: attributes[name] for name in names if name in attributes}
+
+    return extract
+
+
+@lru_cache(maxsize=32)
+def _compile_projection(
+    domains: tuple[tuple[str, tuple[str, ...]], ...],
+) -> AttributeProjection:
+    """Return the attribute extractors of normalized domain attribute lists."""
+    all_domains = dict(domains).get(ALL_DOMAINS, ())
+    return {
+        domain: _attribute_extractor(tuple(dict.fromkeys(names + all_domains)))
+        for domain, names in domains
+    }
+
+
+def compile_attribute_projection(
+    config: Mapping[str, Any] | None,
+) -> AttributeProjection:
+    """Compile the configured attributes per domain into extractor functions.
+
+    The configuration maps domains, or "*" for all domains, to attribute
+    names. Compiled projections are cached, so compiling the same
+    configuration again is cheap.
+    """
+    if not config:
+        return {}
+    domains: list[tuple[str, tuple[str, ...]]] = []
+    for domain, names in config.items():
+        if isinstance(names, str):
+            names = [names]
+        if not isinstance(names, list):
+            _LOGGER.warning(
+                "Ignoring invalid attributes of domain %s: %s", domain, names
+            )
+            continue
+        domains.append((str(domain), tuple(str(name) for name in names)))
+    return _compile_projection(tuple(sorted(domains)))
+
+
+@dataclass(slots=True)
+class _IndexedEntity:
+    """Tokens and registry details of an indexed entity."""
+
+    area_id: str | None
+    area_name: str | None
+    aliases: list[str]
+    tokens: set[str]
+
+
+class ExposedEntityIndex:
+    """Inverted index over names, aliases, areas and domains of exposed entities.
+
+    Single entities are reindexed when their state name or registry entry
+    changes. Changes of exposure settings, devices and areas, which may
+    affect many entities, rebuild the whole index on its next use.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the index and listen for changes."""
+        self._hass = hass
+        self._entities: dict[str, _IndexedEntity] = {}
+        self._postings: dict[str, set[str]] = defaultdict(set)
+        self._vocabulary: list[str] | None = None
+        self._dirty = True
+        self._generation = 0
+        # Created first, so the cache drops changed entries before the
+        # registry update listeners below reindex entities
+        self._registry_cache = async_get_registry_cache(hass)
+
+        hass.bus.async_listen(
+            EVENT_STATE_CHANGED,
+            self._async_state_changed,
+            event_filter=self._async_state_filter,
+        )
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+        )
+        hass.bus.async_listen(dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_invalidate)
+        hass.bus.async_listen(ar.EVENT_AREA_REGISTRY_UPDATED, self._async_invalidate)
+        async_listen_entity_updates(hass, conversation.DOMAIN, self._async_invalidate)
+
+    @property
+    def entity_ids(self) -> list[str]:
+        """Return the IDs of all exposed entities."""
+        self._async_ensure_built()
+        return list(self._entities)
+
+    @callback
+    def _async_invalidate(self, event: Event[Any] | None = None) -> None:
+        """Rebuild the index on its next use."""
+        self._dirty = True
+        self._generation += 1
+
+    @callback
+    def _async_state_filter(self, event_data: EventStateChangedData) -> bool:
+        """Return if a state change affects the index."""
+        old_state = event_data["old_state"]
+        new_state = event_data["new_state"]
+        return (
+            old_state is None or new_state is None or old_state.name != new_state.name
+        )
+
+    @callback
+    def _async_state_changed(self, event: Event[EventStateChangedData]) -> None:
+        """Reindex an entity that was added, removed or renamed."""
+        if not self._dirty:
+            self._async_reindex(event.data["entity_id"], event.data["new_state"])
+
+    @callback
+    def _async_entity_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Reindex an entity whose registry entry changed."""
+        if self._dirty:
+            return
+        if event.data["action"] == "update" and "old_entity_id" in event.data:
+            self._async_remove(event.data["old_entity_id"])
+        entity_id = event.data["entity_id"]
+        self._async_reindex(entity_id, self._hass.states.get(entity_id))
+
+    @callback
+    def _async_ensure_built(self) -> None:
+        """Rebuild the index if it was invalidated."""
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._entities.clear()
+        self._postings.clear()
+        self._vocabulary = None
+        for state in self._hass.states.async_all():
+            self._async_reindex(state.entity_id, state)
+
+    @callback
+    def _async_remove(self, entity_id: str) -> None:
+        """Remove an entity from the index."""
+        if (indexed := self._entities.pop(entity_id, None)) is None:
+            return
+        self._generation += 1
+        for token in indexed.tokens:
+            postings = self._postings[token]
+            postings.discard(entity_id)
+            if not postings:
+                del self._postings[token]
+                self._vocabulary = None
+
+    @callback
+    def _async_reindex(self, entity_id: str, state: State | None) -> None:
+        """Index an entity with its current names and area."""
+        self._async_remove(entity_id)
+        if state is None or not async_should_expose(
+            self._hass, conversation.DOMAIN, entity_id
+        ):
+            return
+
+        tokens = tokenize(state.name) | tokenize(entity_id)
+        area_name: str | None = None
+        aliases: list[str] = []
+        if entity := self._registry_cache.async_get_entity(entity_id):
+            aliases = list(entity.aliases)
+            for alias in aliases:
+                tokens |= tokenize(alias)
+        area_id = self._registry_cache.async_get_entity_area_id(entity_id)
+        if area_id and (area := self._registry_cache.async_get_area(area_id)):
+            area_name = area.name
+            tokens |= tokenize(area.name)
+            for alias in area.aliases:
+                tokens |= tokenize(alias)
+
+        self._entities[entity_id] = _IndexedEntity(area_id, area_name, aliases, tokens)
+        self._generation += 1
+        for token in tokens:
+            if token not in self._postings:
+                self._vocabulary = None
+            self._postings[token].add(entity_id)
+
+    def _matching_tokens(self, token: str) -> list[tuple[str, float]]:
+        """Return the indexed tokens matching a query token and their similarity."""
+        if token in self._postings:
+            return [(token, 1.0)]
+        if len(token) < FUZZY_MIN_LENGTH:
+            return []
+        if self._vocabulary is None:
+            self._vocabulary = list(self._postings)
+        return [
+            (match, difflib.SequenceMatcher(None, token, match).ratio())
+            for match in difflib.get_close_matches(
+                token, self._vocabulary, n=3, cutoff=FUZZY_CUTOFF
+            )
+        ]
+
+    @callback
+    def async_match(
+        self, query: str, limit: int, area_id: str | None = None
+    ) -> list[str] | None:
+        """Return the exposed entities relevant to a query.
+
+        Entities are ranked by their matching query words, weighted by how
+        rare a word is, and the best ones are returned together with all
+        entities in the given area. Returns None if no word matched.
+        """
+        self._async_ensure_built()
+        scores: dict[str, float] = defaultdict(float)
+        total = len(self._entities)
+        for query_token in tokenize(query):
+            for token, similarity in self._matching_tokens(query_token):
+                postings = self._postings[token]
+                weight = similarity * math.log(1 + total / len(postings))
+                for entity_id in postings:
+                    scores[entity_id] += weight
+
+        if not scores:
+            return None
+
+        matches = sorted(scores, key=scores.__getitem__, reverse=True)[:limit]
+        if area_id:
+            selected = set(matches)
+            matches.extend(
+                entity_id
+                for entity_id, indexed in self._entities.items()
+                if indexed.area_id == area_id and entity_id not in selected
+            )
+        return matches
+
+    @callback
+    def async_select(
+        self,
+        query: str | None,
+        limit: int,
+        area_id: str | None = None,
+        domains: set[str] | None = None,
+    ) -> list[str]:
+        """Return the exposed entities matching optional filters.
+
+        With a query, the entities relevant to it are returned, or all of them
+        if nothing matched. Without a query, an area limits the entities to
+        that area.
+        """
+        self._async_ensure_built()
+        if query and (matches := self.async_match(query, limit, area_id)):
+            entity_ids = matches
+        elif area_id and not query:
+            entity_ids = [
+                entity_id
+                for entity_id, indexed in self._entities.items()
+                if indexed.area_id == area_id
+            ]
+        else:
+            entity_ids = self.entity_ids
+        if domains:
+            entity_ids = [
+                entity_id
+                for entity_id in entity_ids
+                if entity_id.partition(".")[0] in domains
+            ]
+        return entity_ids
+
+    @callback
+    def async_etag(
+        self, entity_ids: list[str], attributes: Mapping[str, Any] | None = None
+    ) -> str:
+        """Return a tag that changes whenever the details of the entities change.
+
+        Names, states and attributes are covered by the last update of each
+        state, aliases and areas by the generation of the index, and the
+        selected attributes by the configured attributes per domain.
+        """
+        digest = hashlib.sha256(str(self._generation).encode())
+        if attributes:
+            digest.update(json_bytes_sorted(attributes))
+        for entity_id in entity_ids:
+            if (state := self._hass.states.get(entity_id)) is None:
+                continue
+            digest.update(f"{entity_id}:{state.last_updated_timestamp};".encode())
+        return digest.hexdigest()[:32]
+
+    @callback
+    def async_get_details(
+        self, entity_ids: list[str], projection: AttributeProjection | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the names, states, aliases, areas and attributes of entities.
+
+        Aliases and areas come from the index, so no registry is looked up.
+        Only the attributes selected by the projection for the domain of an
+        entity are included.
+        """
+        self._async_ensure_built()
+        details: list[dict[str, Any]] = []
+        all_domains = projection.get(ALL_DOMAINS) if projection else None
+
+        for entity_id in entity_ids:
+            if (state := self._hass.states.get(entity_id)) is None or (
+                indexed := self._entities.get(entity_id)
+            ) is None:
+                continue
+            entity_details: dict[str, Any] = {
+                "entity_id": entity_id,
+                "name": state.name,
+                "state": state.state,
+                "aliases": indexed.aliases,
+                "area_id": indexed.area_id,
+                "area_name": indexed.area_name,
+            }
+            if projection and (extract := projection.get(state.domain, all_domains)):
+                if attributes := extract(state.attributes):
+                    entity_details["attributes"] = attributes
+            details.append(entity_details)
+        return details
+
+
+@callback
+@singleton(DATA_ENTITY_INDEX)
+def async_get_entity_index(hass: HomeAssistant) -> ExposedEntityIndex:
+    """Return the index of exposed entities shared by all conversation agents."""
+    return ExposedEntityIndex(hass)
@@ -1,18 +1,51 @@
-"""Typed models for the webhook conversation integration payloads."""
+"""Typed models for the webhook conversation integration."""
 
 from __future__ import annotations
 
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Literal, NotRequired, TypedDict
 
+import aiohttp
+
+from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.const import Platform
+
+from .audio import Base64Audio
+from .scheduler import WebhookRequestScheduler
+from .telemetry import WebhookTelemetry
+from .traffic import TrafficRecorder
+
+type WebhookConversationConfigEntry = ConfigEntry[WebhookConversationRuntimeData]
+
 MessageRole = Literal["assistant", "system", "tool_result", "user"]
 
 
+class WebhookConversationToolCall(TypedDict):
+    """A tool call requested by the webhook."""
+
+    id: str
+    name: str
+    args: dict[str, Any]
+
+
+class WebhookConversationTool(TypedDict):
+    """A tool of the Home Assistant LLM API the webhook may call."""
+
+    name: str
+    description: str | None
+    parameters: dict[str, Any]
+
+
 class WebhookConversationMessage(TypedDict):
     """A single message item."""
 
     role: MessageRole
     content: str
+    tool_calls: NotRequired[list[WebhookConversationToolCall]]
+    tool_call_id: NotRequired[str]
+    tool_name: NotRequired[str]
 
 
 class WebhookConversationBinaryObject(TypedDict):
@@ -24,6 +57,13 @@ class WebhookConversationBinaryObject(TypedDict):
     data: str
 
 
+class WebhookConversationBatchItem(TypedDict):
+    """A single task of a batched AI task request."""
+
+    task_name: str
+    query: str
+
+
 class WebhookConversationPayload(TypedDict):
     """Base payload shared by webhook calls."""
 
@@ -39,12 +79,17 @@ class WebhookConversationPayload(TypedDict):
     device_id: NotRequired[str | None]
     device_info: NotRequired[dict[str, Any] | None]
     exposed_entities: NotRequired[str]
+    exposed_entities_url: NotRequired[str]
+    exposed_entities_etag: NotRequired[str]
     language: NotRequired[str]
+    tools: NotRequired[list[WebhookConversationTool]]
     user_id: NotRequired[str | None]
 
     # task fields
+    batch: NotRequired[list[WebhookConversationBatchItem]]
     binary_objects: NotRequired[list[WebhookConversationBinaryObject]]
     structure: NotRequired[dict[str, Any] | None]
+    structure_id: NotRequired[str]
     task_name: NotRequired[str | None]
 
 
@@ -56,8 +101,44 @@ class WebhookTTSRequestPayload(TypedDict):
     voice: NotRequired[str]
 
 
+class WebhookSTTAudio(TypedDict):
+    """Audio of an STT request, encoded to base64 while it is sent."""
+
+    name: str
+    path: Path
+    mime_type: str
+    data: Base64Audio
+
+
+class WebhookSTTTrimmedSilence(TypedDict):
+    """Silence dropped from the audio of an STT request."""
+
+    leading_ms: int
+    trailing_ms: int
+    ended_early: bool
+
+
 class WebhookSTTRequestPayload(TypedDict):
     """STT request payload."""
 
-    audio: WebhookConversationBinaryObject
+    audio: WebhookSTTAudio
     language: str
+    trimmed_silence: NotRequired[WebhookSTTTrimmedSilence]
+
+
+@dataclass(slots=True)
+class WebhookConversationRuntimeData:
+    """Runtime data shared by all subentries of a config entry."""
+
+    scheduler: WebhookRequestScheduler
+    session: aiohttp.ClientSession
+    telemetry: WebhookTelemetry
+    recorder: TrafficRecorder | None = None
+    # Title and data of each subentry when its entities were last set up
+    subentries: dict[str, tuple[str, Mapping[str, Any]]] = field(default_factory=dict)
+    # Platforms set up for the subentry types of the entry
+    platforms: set[Platform] = field(default_factory=set)
+    # Callbacks of the set up platforms adding the entities of a subentry
+    subentry_adders: dict[Platform, Callable[[ConfigSubentry], None]] = field(
+        default_factory=dict
+    )
@@ -0,0 +1,296 @@
+"""Vectorized conversion of PCM audio while it streams in."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Buffer
+import math
+from typing import cast
+
+import numpy as np
+import numpy.typing as npt
+
+from .audio import PCMFormat
+
+# Zero crossings of the low-pass filter on each side, relative to the
+# target sample rate, which trade filter sharpness against latency
+FILTER_ZERO_CROSSINGS = 16
+FILTER_CUTOFF = 0.95
+
+VAD_WINDOW = 0.02
+# Silence kept before and after speech, so soft onsets and endings survive
+VAD_PADDING = 0.2
+
+type Samples = npt.NDArray[np.float32]
+
+
+def decode_samples(data: bytes | memoryview, audio_format: PCMFormat) -> Samples:
+    """Return little-endian PCM frames as floats with a column per channel."""
+    width = audio_format.bits_per_sample // 8
+    if width == 1:
+        samples = (np.frombuffer(data, np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(data, "<i2").astype(np.float32) / 32768
+    elif width == 3:
+        raw = np.frombuffer(data, np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        samples = ((values ^ 0x800000) - 0x800000).astype(np.float32) / 8388608
+    else:
+        samples = np.frombuffer(data, "<i4").astype(np.float32) / 2147483648
+    return samples.reshape(-1, audio_format.channels).astype(np.float32, copy=False)
+
+
+def encode_samples(samples: Samples, bits_per_sample: int) -> memoryview:
+    """Return float frames as interleaved little-endian PCM."""
+    clipped = np.clip(samples, -1.0, 1.0)
+    width = bits_per_sample // 8
+    encoded: npt.NDArray[np.generic]
+    if width == 1:
+        encoded = np.rint(clipped * 127 + 128).astype(np.uint8)
+    elif width == 2:
+        encoded = np.rint(clipped * 32767).astype("<i2")
+    elif width == 3:
+        values = np.rint(clipped.astype(np.float64) * 8388607).astype("<i4")
+        encoded = np.ascontiguousarray(values.view(np.uint8).reshape(-1, 4)[:, :3])
+    else:
+        encoded = np.rint(clipped.astype(np.float64) * 2147483647).astype("<i4")
+    return memoryview(encoded.reshape(-1).view(np.uint8))
+
+
+def _low_pass_filter(source_rate: int, target_rate: int) -> Samples:
+    """Return the taps of a windowed sinc filter against aliasing."""
+    ratio = target_rate / source_rate
+    half_width = math.ceil(FILTER_ZERO_CROSSINGS / ratio)
+    positions = np.arange(-half_width, half_width + 1)
+    cutoff = ratio * FILTER_CUTOFF / 2
+    taps: npt.NDArray[np.float64] = (
+        2 * cutoff * np.sinc(2 * cutoff * positions) * np.hamming(len(positions))
+    )
+    taps /= taps.sum()
+    return taps.astype(np.float32)
+
+
+class Resampler:
+    """Resample a stream of frames by linear interpolation.
+
+    When downsampling, frames are low-pass filtered first. Output frames are
+    positioned with integer arithmetic on the reduced ratio of the rates, so
+    no rounding errors add up over a long stream.
+    """
+
+    def __init__(self, source_rate: int, target_rate: int, channels: int) -> None:
+        """Initialize the resampler."""
+        divisor = math.gcd(source_rate, target_rate)
+        self._up = target_rate // divisor
+        self._down = source_rate // divisor
+        self._channels = channels
+        self._taps: Samples | None = None
+        self._history = np.zeros((0, channels), np.float32)
+        self._skip = 0
+        if target_rate < source_rate:
+            self._taps = _low_pass_filter(source_rate, target_rate)
+            self._history = np.zeros((len(self._taps) - 1, channels), np.float32)
+            # The filter delays the frames by half its length
+            self._skip = len(self._taps) // 2
+        self._previous: Samples = np.zeros((0, channels), np.float32)
+        self._offset = 0
+        self._next = 0
+
+    def _filter(self, frames: Samples) -> Samples:
+        """Low-pass filter frames, continuing the previous frames."""
+        if self._taps is None:
+            return frames
+        padded = np.concatenate((self._history, frames))
+        self._history = padded[len(padded) - len(self._taps) + 1 :]
+        filtered = np.stack(
+            [
+                np.convolve(padded[:, channel], self._taps, "valid")
+                for channel in range(self._channels)
+            ],
+            axis=1,
+        )
+        if self._skip:
+            skipped = min(self._skip, len(filtered))
+            self._skip -= skipped
+            filtered = filtered[skipped:]
+        return filtered
+
+    def _interpolate(self, frames: Samples) -> Samples:
+        """Return the output frames that fall between the frames seen so far."""
+        frames = np.concatenate((self._previous, frames))
+        if len(frames) < 2:
+            self._previous = frames
+            return np.zeros((0, self._channels), np.float32)
+        last = self._offset + len(frames) - 1
+        end = -(-last * self._up // self._down)
+        positions = np.arange(self._next, end, dtype=np.int64) * self._down
+        indices = positions // self._up - self._offset
+        weights = ((positions % self._up) / self._up).astype(np.float32)[:, None]
+        output = frames[indices] * (1 - weights) + frames[indices + 1] * weights
+        self._next = max(self._next, end)
+        self._previous = frames[-1:]
+        self._offset = last
+        return output
+
+    def process(self, frames: Samples) -> Samples:
+        """Resample the next frames of the stream."""
+        return self._interpolate(self._filter(frames))
+
+    def flush(self) -> Samples:
+        """Resample the frames still held back at the end of the stream."""
+        if self._taps is None:
+            # Repeating the last frame yields the frames up to its end
+            return self._interpolate(self._previous)
+        return self.process(
+            np.zeros((len(self._taps) // 2, self._channels), np.float32)
+        )
+
+
+class PCMConverter:
+    """Convert PCM audio to another format chunk by chunk.
+
+    Chunks are decoded to floats, mixed to the target channel count,
+    resampled and encoded to the target sample width. Chunks may end in the
+    middle of a frame, the rest of the frame is kept for the next chunk.
+    """
+
+    def __init__(self, source: PCMFormat, target: PCMFormat) -> None:
+        """Initialize the converter."""
+        self._source = source
+        self._target = target
+        self._remainder = b""
+        self._resampler: Resampler | None = None
+        if source.sample_rate != target.sample_rate:
+            self._resampler = Resampler(
+                source.sample_rate, target.sample_rate, target.channels
+            )
+
+    def _mix(self, frames: Samples) -> Samples:
+        """Return frames with the target number of channels."""
+        if self._source.channels == self._target.channels:
+            return frames
+        if self._target.channels == 1:
+            return cast(Samples, frames.mean(axis=1, keepdims=True))
+        return np.repeat(frames[:, :1], self._target.channels, axis=1)
+
+    def convert(self, chunk: bytes) -> memoryview:
+        """Convert the complete frames of a chunk."""
+        data: bytes | memoryview = chunk
+        if self._remainder:
+            data = self._remainder + chunk
+        usable = len(data) - len(data) % self._source.frame_size
+        self._remainder = bytes(data[usable:])
+        frames = self._mix(decode_samples(memoryview(data)[:usable], self._source))
+        if self._resampler is not None:
+            frames = self._resampler.process(frames)
+        return encode_samples(frames, self._target.bits_per_sample)
+
+    def flush(self) -> memoryview:
+        """Convert the frames held back at the end of the stream."""
+        frames = np.zeros((0, self._target.channels), np.float32)
+        if self._resampler is not None:
+            frames = self._resampler.flush()
+        return encode_samples(frames, self._target.bits_per_sample)
+
+
+class SilenceTrimmer:
+    """Energy based voice activity detection on a stream of PCM chunks.
+
+    Chunks are split into windows of 20 ms, and a window is voiced when its
+    RMS level is above the threshold. Silence before the first and after the
+    last voiced window is dropped, apart from some padding around the
+    speech. Silence between voiced windows is held back until speech
+    resumes, or the stream ends once it lasted the configured quiet period.
+    """
+
+    def __init__(
+        self,
+        audio_format: PCMFormat,
+        threshold_db: float,
+        end_silence: float | None = None,
+    ) -> None:
+        """Initialize the trimmer."""
+        self._format = audio_format
+        self._window_size = (
+            max(round(audio_format.sample_rate * VAD_WINDOW), 1)
+            * audio_format.frame_size
+        )
+        self._threshold = 10 ** (threshold_db / 20)
+        self._padding = round(VAD_PADDING / VAD_WINDOW)
+        self._end_windows = math.ceil(end_silence / VAD_WINDOW) if end_silence else 0
+        self._partial = b""
+        self._held: deque[memoryview] = deque()
+        self._leading = 0
+        self._trailing = 0
+        self.speech_detected = False
+        self.ended = False
+
+    def _duration(self, size: int) -> float:
+        """Return the duration of audio in seconds."""
+        return size / (self._format.sample_rate * self._format.frame_size)
+
+    @property
+    def leading_silence(self) -> float:
+        """Return the seconds of silence dropped before the speech."""
+        return self._duration(self._leading)
+
+    @property
+    def trailing_silence(self) -> float:
+        """Return the seconds of silence dropped after the speech."""
+        return self._duration(self._trailing)
+
+    def process(self, chunk: Buffer) -> list[memoryview]:
+        """Return the audio of a chunk that is kept so far."""
+        data = memoryview(chunk).cast("B")
+        if self.ended:
+            self._trailing += data.nbytes
+            return []
+        if self._partial:
+            data = memoryview(self._partial + data)
+        usable = data.nbytes - data.nbytes % self._window_size
+        self._partial = bytes(data[usable:])
+        if not usable:
+            return []
+
+        frames = decode_samples(data[:usable], self._format)
+        windows = frames.reshape(usable // self._window_size, -1)
+        voiced = np.sqrt(np.mean(np.square(windows), axis=1)) > self._threshold
+
+        kept: list[memoryview] = []
+        for index, is_voiced in enumerate(voiced.tolist()):
+            window = data[index * self._window_size : (index + 1) * self._window_size]
+            if is_voiced:
+                kept.extend(self._held)
+                self._held.clear()
+                kept.append(window)
+                self.speech_detected = True
+                continue
+            self._held.append(window)
+            if not self.speech_detected and len(self._held) > self._padding:
+                self._leading += self._held.popleft().nbytes
+            elif (
+                self.speech_detected
+                and self._end_windows
+                and len(self._held) >= self._end_windows
+            ):
+                self.ended = True
+                self._trailing += usable - (index + 1) * self._window_size
+                break
+        return kept
+
+    def finish(self) -> list[memoryview]:
+        """Return the padding after the speech at the end of the stream."""
+        trailing = self._partial
+        self._partial = b""
+        if not self.speech_detected:
+            self._leading += sum(window.nbytes for window in self._held)
+            self._leading += len(trailing)
+            self._held.clear()
+            return []
+        kept: list[memoryview] = []
+        while self._held and len(kept) < self._padding:
+            kept.append(self._held.popleft())
+        self._trailing += sum(window.nbytes for window in self._held)
+        self._trailing += len(trailing)
+        self._held.clear()
+        return kept
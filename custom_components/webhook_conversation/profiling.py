@@ -0,0 +1,269 @@
+"""On-demand profiling of the webhook conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from enum import StrEnum
+import json
+import logging
+from pathlib import Path
+import sys
+import threading
+import time
+from types import FrameType
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util import dt as dt_util
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    import cProfile
+
+_LOGGER = logging.getLogger(__name__)
+
+PACKAGE_DIR = str(Path(__file__).parent)
+SAMPLE_INTERVAL = 0.002
+REPORT_SIZE = 25
+
+DATA_PROFILER: HassKey[WebhookProfiler] = HassKey(f"{DOMAIN}_profiler")
+
+
+class ProfileMode(StrEnum):
+    """Profiling modes."""
+
+    DETERMINISTIC = "deterministic"
+    SAMPLING = "sampling"
+
+
+def _function_name(filename: str, lineno: int, name: str) -> str:
+    """Return a readable name of a function of the integration."""
+    module = Path(filename).stem
+    return f"{module}.{name}:{lineno}"
+
+
+@dataclass(slots=True)
+class _FunctionSamples:
+    """Samples of a single function."""
+
+    own: int = 0
+    total: int = 0
+    longest_run: int = 0
+
+
+@dataclass
+class _StackSampler:
+    """Sample the event loop thread and attribute samples to our functions.
+
+    Suspended coroutines are not on the stack, so every sample that contains
+    a function of the integration means the event loop was busy running it.
+    """
+
+    thread_id: int
+    interval: float = SAMPLE_INTERVAL
+    samples: int = 0
+    functions: dict[str, _FunctionSamples] = field(default_factory=dict)
+    _stop: threading.Event = field(default_factory=threading.Event)
+    _thread: threading.Thread | None = None
+    _run_function: str | None = None
+    _run_length: int = 0
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        self._thread = threading.Thread(
+            target=self._run, name=f"{DOMAIN}_profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        """Take samples until stopped."""
+        while not self._stop.wait(self.interval):
+            if (frame := sys._current_frames().get(self.thread_id)) is not None:
+                self._sample(frame)
+
+    def _sample(self, frame: FrameType | None) -> None:
+        """Attribute a single sample."""
+        self.samples += 1
+        seen: set[str] = set()
+        innermost: str | None = None
+        while frame is not None:
+            code = frame.f_code
+            if code.co_filename.startswith(PACKAGE_DIR):
+                name = _function_name(
+                    code.co_filename, code.co_firstlineno, code.co_name
+                )
+                if innermost is None:
+                    innermost = name
+                seen.add(name)
+            frame = frame.f_back
+
+        for name in seen:
+            self.functions.setdefault(name, _FunctionSamples()).total += 1
+
+        if innermost is None:
+            self._run_function = None
+            return
+        function = self.functions[innermost]
+        function.own += 1
+        if innermost == self._run_function:
+            self._run_length += 1
+        else:
+            self._run_function = innermost
+            self._run_length = 1
+        function.longest_run = max(function.longest_run, self._run_length)
+
+    def report(self) -> list[dict[str, Any]]:
+        """Return the sampled functions ordered by their total time."""
+        interval_ms = self.interval * 1000
+        return [
+            {
+                "function": name,
+                "samples": samples.total,
+                "cumulative_time_ms": round(samples.total * interval_ms, 1),
+                "own_time_ms": round(samples.own * interval_ms, 1),
+                "max_blocking_ms": round(samples.longest_run * interval_ms, 1),
+            }
+            for name, samples in sorted(
+                self.functions.items(), key=lambda item: item[1].total, reverse=True
+            )
+        ]
+
+
+def _deterministic_report(profile: cProfile.Profile) -> list[dict[str, Any]]:
+    """Return the profiled functions of the integration by cumulative time.
+
+    Coroutines are entered and left on every resume, so the time per call is
+    the time the event loop was blocked by the function on average.
+    """
+    import pstats
+
+    stats = pstats.Stats(profile).get_stats_profile()
+    rows: list[dict[str, Any]] = []
+    for name, function in stats.func_profiles.items():
+        if not function.file_name.startswith(PACKAGE_DIR):
+            continue
+        # Recursive calls are reported as "total/primitive"
+        calls = int(function.ncalls.split("/")[0])
+        rows.append(
+            {
+                "function": _function_name(
+                    function.file_name, function.line_number, name
+                ),
+                "calls": calls,
+                "cumulative_time_ms": round(function.cumtime * 1000, 3),
+                "own_time_ms": round(function.tottime * 1000, 3),
+                "blocking_per_call_ms": round(function.cumtime / calls * 1000, 3),
+            }
+        )
+    return sorted(rows, key=lambda row: row["cumulative_time_ms"], reverse=True)
+
+
+def _write_report(path: Path, report: dict[str, Any]) -> None:
+    """Write a profiling report."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2))
+
+
+class WebhookProfiler:
+    """Profile the integration for a period of time or number of requests."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the profiler."""
+        self._hass = hass
+        self._lock = asyncio.Lock()
+        self._requests_left: int | None = None
+        self._requests_done: asyncio.Event | None = None
+
+    @callback
+    def async_request_finished(self) -> None:
+        """Count a finished webhook request while profiling."""
+        if self._requests_left is None or self._requests_done is None:
+            return
+        self._requests_left -= 1
+        if self._requests_left <= 0:
+            self._requests_done.set()
+
+    async def async_profile(
+        self, mode: ProfileMode, duration: float, requests: int | None
+    ) -> dict[str, Any]:
+        """Profile until the duration passed or the requests have finished."""
+        if self._lock.locked():
+            raise HomeAssistantError("A profiling session is already running")
+
+        async with self._lock:
+            self._requests_done = asyncio.Event()
+            self._requests_left = requests
+            profile: cProfile.Profile | None = None
+            sampler: _StackSampler | None = None
+            start = time.monotonic()
+
+            if mode == ProfileMode.DETERMINISTIC:
+                import cProfile
+
+                profile = cProfile.Profile()
+                profile.enable()
+            else:
+                sampler = _StackSampler(threading.get_ident())
+                sampler.start()
+
+            try:
+                if requests is None:
+                    await asyncio.sleep(duration)
+                else:
+                    try:
+                        async with asyncio.timeout(duration):
+                            await self._requests_done.wait()
+                    except TimeoutError:
+                        pass
+            finally:
+                if profile is not None:
+                    profile.disable()
+                if sampler is not None:
+                    await self._hass.async_add_executor_job(sampler.stop)
+                profiled_requests = None
+                if requests is not None:
+                    profiled_requests = requests - max(self._requests_left or 0, 0)
+                self._requests_left = None
+                self._requests_done = None
+
+            if profile is not None:
+                functions = _deterministic_report(profile)
+            else:
+                assert sampler is not None
+                functions = sampler.report()
+
+        report: dict[str, Any] = {
+            "mode": mode,
+            "duration_s": round(time.monotonic() - start, 3),
+            "requests": profiled_requests,
+            "functions": functions,
+        }
+        path = Path(
+            self._hass.config.path(
+                DOMAIN,
+                "profiles",
+                f"profile_{dt_util.utcnow().strftime('%Y%m%d_%H%M%S')}.json",
+            )
+        )
+        await self._hass.async_add_executor_job(_write_report, path, report)
+        _LOGGER.info("Wrote profiling report to %s", path)
+
+        return report | {"functions": functions[:REPORT_SIZE], "report": str(path)}
+
+
+@callback
+@singleton(DATA_PROFILER)
+def async_get_profiler(hass: HomeAssistant) -> WebhookProfiler:
+    """Return the profiler shared by all config entries."""
+    return WebhookProfiler(hass)
@@ -0,0 +1,144 @@
+"""Cache of the registry details looked up for every conversation turn."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+DATA_REGISTRY_CACHE: HassKey[RegistryCache] = HassKey(f"{DOMAIN}_registry_cache")
+
+
+@dataclass(slots=True, frozen=True)
+class CachedEntity:
+    """Registry details of an entity."""
+
+    area_id: str | None
+    device_id: str | None
+    aliases: tuple[str, ...]
+
+
+@dataclass(slots=True, frozen=True)
+class CachedDevice:
+    """Registry details of a device."""
+
+    area_id: str | None
+    info: dict[str, Any]
+
+
+@dataclass(slots=True, frozen=True)
+class CachedArea:
+    """Registry details of an area."""
+
+    name: str
+    aliases: tuple[str, ...]
+
+
+class RegistryCache:
+    """Projections of registry entries, dropped when their entry changes.
+
+    Device details are only converted to a dictionary once, and the area of
+    an entity is resolved through its device without repeated lookups.
+    Unknown entries are cached as well, until an entry with their ID is
+    created.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache and listen for registry changes."""
+        self._hass = hass
+        self._entities: dict[str, CachedEntity | None] = {}
+        self._devices: dict[str, CachedDevice | None] = {}
+        self._areas: dict[str, CachedArea | None] = {}
+
+        hass.bus.async_listen(
+            er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+        )
+        hass.bus.async_listen(
+            dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated
+        )
+        hass.bus.async_listen(
+            ar.EVENT_AREA_REGISTRY_UPDATED, self._async_area_registry_updated
+        )
+
+    @callback
+    def _async_entity_registry_updated(
+        self, event: Event[er.EventEntityRegistryUpdatedData]
+    ) -> None:
+        """Drop an entity whose registry entry changed."""
+        self._entities.pop(event.data["entity_id"], None)
+        if event.data["action"] == "update" and "old_entity_id" in event.data:
+            self._entities.pop(event.data["old_entity_id"], None)
+
+    @callback
+    def _async_device_registry_updated(
+        self, event: Event[dr.EventDeviceRegistryUpdatedData]
+    ) -> None:
+        """Drop a device whose registry entry changed."""
+        self._devices.pop(event.data["device_id"], None)
+
+    @callback
+    def _async_area_registry_updated(
+        self, event: Event[ar.EventAreaRegistryUpdatedData]
+    ) -> None:
+        """Drop an area whose registry entry changed."""
+        self._areas.pop(event.data["area_id"], None)
+
+    @callback
+    def async_get_entity(self, entity_id: str) -> CachedEntity | None:
+        """Return the registry details of an entity."""
+        if entity_id in self._entities:
+            return self._entities[entity_id]
+        cached: CachedEntity | None = None
+        if entry := er.async_get(self._hass).async_get(entity_id):
+            cached = CachedEntity(entry.area_id, entry.device_id, tuple(entry.aliases))
+        self._entities[entity_id] = cached
+        return cached
+
+    @callback
+    def async_get_device(self, device_id: str) -> CachedDevice | None:
+        """Return the registry details of a device."""
+        if device_id in self._devices:
+            return self._devices[device_id]
+        cached: CachedDevice | None = None
+        if device := dr.async_get(self._hass).async_get(device_id):
+            cached = CachedDevice(device.area_id, device.dict_repr)
+        self._devices[device_id] = cached
+        return cached
+
+    @callback
+    def async_get_area(self, area_id: str) -> CachedArea | None:
+        """Return the registry details of an area."""
+        if area_id in self._areas:
+            return self._areas[area_id]
+        cached: CachedArea | None = None
+        if area := ar.async_get(self._hass).async_get_area(area_id):
+            cached = CachedArea(area.name, tuple(area.aliases))
+        self._areas[area_id] = cached
+        return cached
+
+    @callback
+    def async_get_entity_area_id(self, entity_id: str) -> str | None:
+        """Return the area of an entity or else of its device."""
+        if (entity := self.async_get_entity(entity_id)) is None:
+            return None
+        if entity.area_id is None and entity.device_id:
+            device = self.async_get_device(entity.device_id)
+            return device.area_id if device else None
+        return entity.area_id
+
+
+@callback
+@singleton(DATA_REGISTRY_CACHE)
+def async_get_registry_cache(hass: HomeAssistant) -> RegistryCache:
+    """Return the registry cache shared by all conversation agents."""
+    return RegistryCache(hass)
@@ -0,0 +1,125 @@
+"""Cache of conversation responses the webhook marked as cacheable."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+import logging
+import re
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+
+from .cache import TTLCache
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
+_WORD = re.compile(r"\w+")
+
+
+def normalize_query(query: str) -> str:
+    """Return a query without case, punctuation and extra whitespace."""
+    return " ".join(_WORD.findall(query.casefold()))
+
+
+@dataclass(slots=True, frozen=True)
+class CacheDirective:
+    """Instruction of the webhook to cache its response."""
+
+    ttl: float
+    entity_ids: tuple[str, ...] = ()
+
+
+def parse_cache_directive(ttl: Any, entity_ids: Any) -> CacheDirective | None:
+    """Return the cache directive of a webhook response, if it has one."""
+    if ttl is None:
+        return None
+    if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+        _LOGGER.warning("Ignoring invalid cache TTL: %s", ttl)
+        return None
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    elif not isinstance(entity_ids, Sequence):
+        entity_ids = []
+    return CacheDirective(
+        min(float(ttl), MAX_RESPONSE_CACHE_TTL),
+        tuple(str(entity_id) for entity_id in entity_ids),
+    )
+
+
+@dataclass(slots=True, frozen=True)
+class _CachedResponse:
+    """A cached response and the states it depended on."""
+
+    response: str
+    entity_ids: tuple[str, ...]
+    states_hash: int
+
+
+class ConversationResponseCache:
+    """Responses keyed by normalized query, language and agent.
+
+    The webhook decides which responses are cached, for how long, and which
+    entities they depend on. A cached response is only served while the
+    states of these entities are unchanged.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Initialize the cache."""
+        self._cache: TTLCache[tuple[str, str, str], _CachedResponse] = TTLCache(
+            max_size
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Return if the cache stores any responses."""
+        return self._cache.enabled
+
+    @staticmethod
+    def _states_hash(hass: HomeAssistant, entity_ids: tuple[str, ...]) -> int:
+        """Return a hash of the current states of entities."""
+        states = hass.states
+        return hash(
+            tuple(
+                (state.state, state.last_updated_timestamp)
+                if (state := states.get(entity_id))
+                else None
+                for entity_id in entity_ids
+            )
+        )
+
+    @callback
+    def async_get(
+        self, hass: HomeAssistant, query: str, language: str, agent_id: str
+    ) -> str | None:
+        """Return the cached response to a query, if still valid."""
+        key = (normalize_query(query), language, agent_id)
+        if (cached := self._cache.get(key)) is None:
+            return None
+        if cached.states_hash != self._states_hash(hass, cached.entity_ids):
+            self._cache.pop(key)
+            return None
+        return cached.response
+
+    @callback
+    def async_set(
+        self,
+        hass: HomeAssistant,
+        query: str,
+        language: str,
+        agent_id: str,
+        response: str,
+        directive: CacheDirective,
+    ) -> None:
+        """Cache the response to a query as instructed by the webhook."""
+        self._cache.set(
+            (normalize_query(query), language, agent_id),
+            _CachedResponse(
+                response,
+                directive.entity_ids,
+                self._states_hash(hass, directive.entity_ids),
+            ),
+            directive.ttl,
+        )
@@ -0,0 +1,207 @@
+"""Request scheduling for the webhook conversation integration."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+import heapq
+import itertools
+import logging
+import time
+
+from yarl import URL
+
+from homeassistant.core import CALLBACK_TYPE, callback
+from homeassistant.exceptions import HomeAssistantError
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RequestPriority(IntEnum):
+    """Priority of a webhook request, lower values are served first."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+@dataclass(slots=True)
+class HostStats:
+    """Snapshot of the request queue of a single backend host."""
+
+    active: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    requests: int = 0
+    timeouts: int = 0
+    last_wait: float = 0.0
+    max_wait: float = 0.0
+    total_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """Return the average time spent waiting for a slot in seconds."""
+        return self.total_wait / self.requests if self.requests else 0.0
+
+
+@dataclass(slots=True)
+class _HostQueue:
+    """Concurrency state of a single backend host."""
+
+    stats: HostStats = field(default_factory=HostStats)
+    waiters: list[tuple[int, int, asyncio.Future[None]]] = field(default_factory=list)
+
+
+def _host_key(url: str) -> str:
+    """Return the key identifying the backend host of a webhook URL."""
+    parsed = URL(url)
+    return f"{parsed.host}:{parsed.port}" if parsed.host else url
+
+
+class WebhookRequestScheduler:
+    """Limit concurrent webhook requests per backend host.
+
+    Requests beyond the limit are queued and served by priority, so interactive
+    requests overtake queued background work. Waiting is bounded by the queue
+    timeout.
+    """
+
+    def __init__(self, max_concurrent: int, queue_timeout: float) -> None:
+        """Initialize the scheduler."""
+        self._max_concurrent = max_concurrent
+        self._queue_timeout = queue_timeout
+        self._hosts: dict[str, _HostQueue] = {}
+        self._sequence = itertools.count()
+        self._listeners: list[CALLBACK_TYPE] = []
+
+    @property
+    def stats(self) -> dict[str, HostStats]:
+        """Return the queue statistics per backend host."""
+        return {host: queue.stats for host, queue in self._hosts.items()}
+
+    @property
+    def queued(self) -> int:
+        """Return the number of requests waiting for a slot."""
+        return sum(queue.stats.queued for queue in self._hosts.values())
+
+    @property
+    def active(self) -> int:
+        """Return the number of requests currently in flight."""
+        return sum(queue.stats.active for queue in self._hosts.values())
+
+    @callback
+    def async_update_limits(self, max_concurrent: int, queue_timeout: float) -> None:
+        """Apply new limits, handing newly free slots to queued requests.
+
+        Requests in flight are not interrupted if the limit is lowered, and
+        queued requests keep the queue timeout they started waiting with.
+        """
+        self._max_concurrent = max_concurrent
+        self._queue_timeout = queue_timeout
+        for queue in self._hosts.values():
+            while queue.stats.active < max_concurrent and self._async_hand_over(queue):
+                pass
+        self._async_notify()
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for changes of the queue statistics."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def _async_notify(self) -> None:
+        """Notify listeners about changed queue statistics."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    @asynccontextmanager
+    async def async_slot(
+        self, url: str, priority: RequestPriority
+    ) -> AsyncIterator[None]:
+        """Wait for a free request slot for the host of the given URL."""
+        host = _host_key(url)
+        queue = self._hosts.setdefault(host, _HostQueue())
+        stats = queue.stats
+        start = time.monotonic()
+
+        if stats.active < self._max_concurrent and not stats.queued:
+            stats.active += 1
+        else:
+            await self._async_wait(host, queue, priority)
+
+        wait = time.monotonic() - start
+        stats.requests += 1
+        stats.last_wait = wait
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+        if wait:
+            _LOGGER.debug(
+                "Webhook request to %s waited %.3f seconds for a free slot", host, wait
+            )
+        self._async_notify()
+
+        try:
+            yield
+        finally:
+            self._async_release(queue)
+
+    async def _async_wait(
+        self, host: str, queue: _HostQueue, priority: RequestPriority
+    ) -> None:
+        """Queue the caller until a slot is handed over to it."""
+        stats = queue.stats
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(queue.waiters, (priority, next(self._sequence), future))
+        stats.queued += 1
+        stats.max_queued = max(stats.max_queued, stats.queued)
+        self._async_notify()
+
+        try:
+            async with asyncio.timeout(self._queue_timeout):
+                await future
+        except BaseException as err:
+            if future.done() and not future.cancelled():
+                # The slot was handed over right before we gave up, pass it on
+                self._async_release(queue)
+            else:
+                future.cancel()
+                stats.queued -= 1
+            if isinstance(err, TimeoutError):
+                stats.timeouts += 1
+                self._async_notify()
+                raise HomeAssistantError(
+                    f"Timed out after {self._queue_timeout} seconds waiting for a "
+                    f"free request slot for {host}"
+                ) from err
+            self._async_notify()
+            raise
+
+    @callback
+    def _async_release(self, queue: _HostQueue) -> None:
+        """Release a slot and hand it over to the next queued request."""
+        queue.stats.active -= 1
+        if queue.stats.active < self._max_concurrent:
+            self._async_hand_over(queue)
+        self._async_notify()
+
+    @callback
+    def _async_hand_over(self, queue: _HostQueue) -> bool:
+        """Hand a slot over to the next queued request, if there is one."""
+        stats = queue.stats
+        while queue.waiters:
+            _, _, future = heapq.heappop(queue.waiters)
+            if future.done():
+                continue
+            stats.queued -= 1
+            stats.active += 1
+            future.set_result(None)
+            return True
+        return False
@@ -0,0 +1,315 @@
+"""Sensor platform for webhook conversation integration."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.const import EntityCategory, Platform, UnitOfInformation, UnitOfTime
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+from .models import WebhookConversationConfigEntry
+from .scheduler import WebhookRequestScheduler
+from .telemetry import RequestMetrics
+
+ALL_SUBENTRY_TYPES = frozenset({"ai_task", "conversation", "stt", "tts"})
+STREAMING_SUBENTRY_TYPES = frozenset({"ai_task", "conversation"})
+
+# The scheduler changes several times per request, so its sensors write their
+# state at most once per interval
+SCHEDULER_UPDATE_INTERVAL = 5
+
+
+@dataclass(frozen=True, kw_only=True)
+class WebhookMetricsSensorEntityDescription(SensorEntityDescription):
+    """Describes a request metrics sensor of a subentry."""
+
+    value_fn: Callable[[RequestMetrics], float | int | None]
+    attributes_fn: Callable[[RequestMetrics], dict[str, Any] | None] = lambda _: None
+    subentry_types: frozenset[str] = ALL_SUBENTRY_TYPES
+
+
+def _timing_description(
+    key: str,
+    subentry_types: frozenset[str] = ALL_SUBENTRY_TYPES,
+    enabled_default: bool = True,
+) -> WebhookMetricsSensorEntityDescription:
+    """Describe a sensor reporting the median and percentiles of a timing."""
+    return WebhookMetricsSensorEntityDescription(
+        key=key,
+        translation_key=key,
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        suggested_display_precision=0,
+        state_class=SensorStateClass.MEASUREMENT,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=enabled_default,
+        value_fn=lambda metrics: (
+            None
+            if (percentiles := metrics.percentiles(key)) is None
+            else percentiles["p50"]
+        ),
+        attributes_fn=lambda metrics: metrics.percentiles(key),
+        subentry_types=subentry_types,
+    )
+
+
+METRICS_SENSORS: tuple[WebhookMetricsSensorEntityDescription, ...] = (
+    _timing_description("duration"),
+    _timing_description("time_to_first_byte"),
+    _timing_description("time_to_first_chunk", STREAMING_SUBENTRY_TYPES),
+    _timing_description("connect_time", enabled_default=False),
+    WebhookMetricsSensorEntityDescription(
+        key="requests",
+        translation_key="requests",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda metrics: metrics.requests,
+    ),
+    WebhookMetricsSensorEntityDescription(
+        key="errors",
+        translation_key="errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda metrics: metrics.errors,
+    ),
+    WebhookMetricsSensorEntityDescription(
+        key="timeouts",
+        translation_key="timeouts",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        value_fn=lambda metrics: metrics.timeouts,
+    ),
+    WebhookMetricsSensorEntityDescription(
+        key="request_bytes",
+        translation_key="request_bytes",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.request_bytes,
+    ),
+    WebhookMetricsSensorEntityDescription(
+        key="response_bytes",
+        translation_key="response_bytes",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_category=EntityCategory.DIAGNOSTIC,
+        entity_registry_enabled_default=False,
+        value_fn=lambda metrics: metrics.response_bytes,
+    ),
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: WebhookConversationConfigEntry,
+    async_add_entities: AddConfigEntryEntitiesCallback,
+) -> None:
+    """Set up sensor entities for webhook conversation."""
+    scheduler = config_entry.runtime_data.scheduler
+    async_add_entities(
+        [
+            WebhookQueueDepthSensor(config_entry, scheduler),
+            WebhookQueueWaitSensor(config_entry, scheduler),
+        ]
+    )
+
+    telemetry = config_entry.runtime_data.telemetry
+
+    @callback
+    def async_add_subentry(subentry: ConfigSubentry) -> None:
+        """Add the metrics sensors of a subentry."""
+        metrics = telemetry.metrics(subentry.subentry_id)
+        async_add_entities(
+            [
+                WebhookMetricsSensor(subentry, metrics, description)
+                for description in METRICS_SENSORS
+                if subentry.subentry_type in description.subentry_types
+            ],
+            config_subentry_id=subentry.subentry_id,
+        )
+
+    for subentry in config_entry.subentries.values():
+        async_add_subentry(subentry)
+    config_entry.runtime_data.subentry_adders[Platform.SENSOR] = async_add_subentry
+
+
+class WebhookMetricsSensor(SensorEntity):
+    """Sensor reporting the request metrics of a subentry."""
+
+    _attr_has_entity_name = True
+    _attr_should_poll = False
+    # Percentiles change with every request, recording them would add a row of
+    # attributes per request
+    _unrecorded_attributes = frozenset({"p50", "p95", "p99"})
+    entity_description: WebhookMetricsSensorEntityDescription
+
+    def __init__(
+        self,
+        subentry: ConfigSubentry,
+        metrics: RequestMetrics,
+        description: WebhookMetricsSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        self.entity_description = description
+        self._metrics = metrics
+        self._attr_unique_id = f"{subentry.subentry_id}-{description.key}"
+        self._attr_device_info = dr.DeviceInfo(
+            identifiers={(DOMAIN, subentry.subentry_id)},
+        )
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._metrics.async_add_listener(self._async_handle_update)
+        )
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Write the updated metrics."""
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> float | int | None:
+        """Return the value of the metric."""
+        return self.entity_description.value_fn(self._metrics)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the percentiles of timing metrics."""
+        return self.entity_description.attributes_fn(self._metrics)
+
+
+class WebhookSchedulerSensor(SensorEntity):
+    """Base sensor reporting the state of the request scheduler."""
+
+    _attr_has_entity_name = False
+    _attr_should_poll = False
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _key: str
+    _cancel_update: CALLBACK_TYPE | None = None
+
+    def __init__(
+        self,
+        config_entry: WebhookConversationConfigEntry,
+        scheduler: WebhookRequestScheduler,
+    ) -> None:
+        """Initialize the sensor."""
+        self._scheduler = scheduler
+        self._attr_unique_id = f"{config_entry.entry_id}-{self._key}"
+
+    async def async_added_to_hass(self) -> None:
+        """When entity is added to Home Assistant."""
+        await super().async_added_to_hass()
+        self.async_on_remove(
+            self._scheduler.async_add_listener(self._async_handle_update)
+        )
+
+    async def async_will_remove_from_hass(self) -> None:
+        """When entity will be removed from Home Assistant."""
+        if self._cancel_update is not None:
+            self._cancel_update()
+            self._cancel_update = None
+        await super().async_will_remove_from_hass()
+
+    @callback
+    def _async_handle_update(self) -> None:
+        """Schedule writing the updated scheduler state."""
+        if self._cancel_update is None:
+            self._cancel_update = async_call_later(
+                self.hass, SCHEDULER_UPDATE_INTERVAL, self._async_write_update
+            )
+
+    @callback
+    def _async_write_update(self, _: datetime) -> None:
+        """Write the scheduler state after the update interval."""
+        self._cancel_update = None
+        self.async_write_ha_state()
+
+
+class WebhookQueueDepthSensor(WebhookSchedulerSensor):
+    """Sensor reporting the number of queued webhook requests."""
+
+    _key = "queue_depth"
+    _unrecorded_attributes = frozenset({"active", "hosts"})
+
+    def __init__(
+        self,
+        config_entry: WebhookConversationConfigEntry,
+        scheduler: WebhookRequestScheduler,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(config_entry, scheduler)
+        self._attr_name = f"{config_entry.title} queued requests"
+
+    @property
+    def native_value(self) -> int:
+        """Return the number of queued requests."""
+        return self._scheduler.queued
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the queue statistics per backend host."""
+        return {
+            "active": self._scheduler.active,
+            "hosts": {
+                host: asdict(stats) for host, stats in self._scheduler.stats.items()
+            },
+        }
+
+
+class WebhookQueueWaitSensor(WebhookSchedulerSensor):
+    """Sensor reporting the wait time of the last scheduled webhook request."""
+
+    _key = "queue_wait"
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_suggested_display_precision = 0
+
+    def __init__(
+        self,
+        config_entry: WebhookConversationConfigEntry,
+        scheduler: WebhookRequestScheduler,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(config_entry, scheduler)
+        self._attr_name = f"{config_entry.title} queue wait"
+
+    @property
+    def native_value(self) -> float:
+        """Return the longest of the last wait times across hosts."""
+        return (
+            max(
+                (stats.last_wait for stats in self._scheduler.stats.values()),
+                default=0.0,
+            )
+            * 1000
+        )
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any]:
+        """Return the average and maximum wait times across hosts."""
+        stats = self._scheduler.stats.values()
+        return {
+            "average_wait_ms": max((host.average_wait for host in stats), default=0.0)
+            * 1000,
+            "max_wait_ms": max((host.max_wait for host in stats), default=0.0) * 1000,
+        }
@@ -0,0 +1,79 @@
+"""Services for the webhook conversation integration."""
+
+from __future__ import annotations
+
+from typing import Any, cast
+
+import voluptuous as vol
+
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.helpers import config_validation as cv
+
+from .const import (
+    ATTR_DURATION,
+    ATTR_MODE,
+    ATTR_REQUESTS,
+    ATTR_TRACE_ID,
+    DEFAULT_PROFILE_DURATION,
+    DOMAIN,
+    SERVICE_GET_TRACES,
+    SERVICE_PROFILE,
+)
+from .profiling import ProfileMode, async_get_profiler
+from .tracing import async_get_tracer
+
+GET_TRACES_SCHEMA = vol.Schema({vol.Optional(ATTR_TRACE_ID): cv.string})
+
+PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_MODE, default=ProfileMode.SAMPLING): vol.Coerce(ProfileMode),
+        vol.Optional(ATTR_DURATION, default=DEFAULT_PROFILE_DURATION): vol.All(
+            vol.Coerce(float), vol.Range(min=1, max=600)
+        ),
+        vol.Optional(ATTR_REQUESTS): vol.All(vol.Coerce(int), vol.Range(min=1)),
+    }
+)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    @callback
+    def async_get_traces(call: ServiceCall) -> ServiceResponse:
+        """Return the recorded spans of recent webhook requests."""
+        tracer = async_get_tracer(hass)
+        response: dict[str, Any] = {
+            "traces": tracer.async_get_traces(call.data.get(ATTR_TRACE_ID))
+        }
+        return cast(ServiceResponse, response)
+
+    async def async_profile(call: ServiceCall) -> ServiceResponse:
+        """Profile the integration and return the hottest functions."""
+        profiler = async_get_profiler(hass)
+        return await profiler.async_profile(
+            call.data[ATTR_MODE],
+            call.data[ATTR_DURATION],
+            call.data.get(ATTR_REQUESTS),
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_GET_TRACES,
+        async_get_traces,
+        schema=GET_TRACES_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile,
+        schema=PROFILE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
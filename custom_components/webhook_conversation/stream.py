@@ -0,0 +1,353 @@
+"""Incremental parsing of streamed webhook responses."""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncGenerator, Iterable, Mapping
+import codecs
+from dataclasses import dataclass
+from enum import StrEnum
+import json
+import logging
+import time
+from typing import Any
+
+from homeassistant.helpers import llm
+
+from .response_cache import CacheDirective, parse_cache_directive
+from .telemetry import RequestTrace
+from .transport import ResponseContent
+
+_LOGGER = logging.getLogger(__name__)
+
+SSE_CONTENT_TYPE = "text/event-stream"
+SSE_DONE = "[DONE]"
+
+STREAM_BUFFER_MAX_BYTES = 256 * 1024
+STREAM_BUFFER_MAX_CHUNKS = 256
+
+EVENT_ITEM = "item"
+EVENT_END = "end"
+EVENT_TOOL_CALL = "tool_call"
+EVENT_CACHE = "cache"
+
+
+class StreamFormat(StrEnum):
+    """Formats of streamed webhook responses."""
+
+    NDJSON = "ndjson"
+    SSE = "sse"
+
+
+def stream_format(content_type: str) -> StreamFormat:
+    """Return the stream format of a response content type."""
+    if content_type == SSE_CONTENT_TYPE:
+        return StreamFormat.SSE
+    return StreamFormat.NDJSON
+
+
+@dataclass(slots=True, frozen=True)
+class StreamEvent:
+    """A single event of a streamed response."""
+
+    type: str | None
+    content: Any = None
+    data: Mapping[str, Any] | None = None
+
+
+class StreamParser:
+    """Parse NDJSON or Server-Sent Events from arbitrarily split chunks.
+
+    Bytes are decoded incrementally, so multi-byte characters may be split
+    across chunks, and lines may be of any length.
+    """
+
+    def __init__(self, stream_format: StreamFormat) -> None:
+        """Initialize the parser."""
+        self._format = stream_format
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._partial: list[str] = []
+        self._event: str | None = None
+        self._data: list[str] = []
+
+    def feed(self, data: bytes) -> list[StreamEvent]:
+        """Parse a chunk and return the events it completed."""
+        text = self._decoder.decode(data)
+        if "\n" not in text:
+            if text:
+                self._partial.append(text)
+            return []
+
+        if self._partial:
+            self._partial.append(text)
+            text = "".join(self._partial)
+            self._partial.clear()
+        *lines, rest = text.split("\n")
+        if rest:
+            self._partial.append(rest)
+        return self._parse_lines(lines)
+
+    def close(self) -> list[StreamEvent]:
+        """Return the events of the remaining data at the end of the stream."""
+        self._partial.append(self._decoder.decode(b"", final=True))
+        lines = ["".join(self._partial)]
+        self._partial.clear()
+        if self._format is StreamFormat.SSE:
+            # A final event is only dispatched by an empty line
+            lines.append("")
+        return self._parse_lines(lines)
+
+    def _parse_lines(self, lines: Iterable[str]) -> list[StreamEvent]:
+        """Parse complete lines."""
+        if self._format is StreamFormat.SSE:
+            parse_line = self._parse_sse_line
+        else:
+            parse_line = self._parse_ndjson_line
+        return [
+            event
+            for line in lines
+            if (event := parse_line(line.removesuffix("\r"))) is not None
+        ]
+
+    def _parse_ndjson_line(self, line: str) -> StreamEvent | None:
+        """Parse a line of newline-delimited JSON."""
+        if not (line := line.strip()):
+            return None
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError:
+            _LOGGER.warning("Failed to parse streaming response chunk: %s", line)
+            return None
+        if not isinstance(data, dict):
+            _LOGGER.warning("Unexpected streaming response chunk: %s", line)
+            return None
+        return StreamEvent(data.get("type"), data.get("content"), data)
+
+    def _parse_sse_line(self, line: str) -> StreamEvent | None:
+        """Parse a line of a Server-Sent Events stream."""
+        if not line:
+            return self._dispatch_sse_event()
+        if line.startswith(":"):
+            return None
+
+        name, _, value = line.partition(":")
+        value = value.removeprefix(" ")
+        if name == "data":
+            self._data.append(value)
+        elif name == "event":
+            self._event = value
+        return None
+
+    def _dispatch_sse_event(self) -> StreamEvent | None:
+        """Return the event of the data lines received so far.
+
+        JSON objects are parsed like NDJSON lines, with the event field as the
+        type if they have none, so named events like tool calls can carry
+        their fields as data. Other data is the content of an event of the
+        type given by the event field.
+        """
+        if not self._data:
+            self._event = None
+            return None
+
+        data = "\n".join(self._data)
+        event_type = self._event or EVENT_ITEM
+        self._data.clear()
+        self._event = None
+
+        if data == SSE_DONE:
+            return StreamEvent(EVENT_END)
+        try:
+            decoded = json.loads(data)
+        except json.JSONDecodeError:
+            return StreamEvent(event_type, data)
+        if isinstance(decoded, dict):
+            return StreamEvent(
+                decoded.get("type", event_type), decoded.get("content"), decoded
+            )
+        return StreamEvent(event_type, data)
+
+
+def parse_tool_call(data: Mapping[str, Any]) -> llm.ToolInput | None:
+    """Return the tool input of a tool call requested by the webhook."""
+    if not isinstance(name := data.get("name"), str):
+        _LOGGER.warning("Tool call without a tool name: %s", data)
+        return None
+    args = data.get("args") or {}
+    if tool_call_id := data.get("id"):
+        return llm.ToolInput(tool_name=name, tool_args=args, id=str(tool_call_id))
+    return llm.ToolInput(tool_name=name, tool_args=args)
+
+
+class StreamBuffer:
+    """Bounded buffer between the reader of a streamed response and its consumer.
+
+    The reader stops reading from the connection while the buffer is full, so
+    a slow consumer applies backpressure to the webhook instead of the buffer
+    growing without limit. The consumer takes everything buffered at once,
+    so bursts are parsed in a single batch. High-water marks and the time
+    either side waited for the other are recorded on the request trace.
+    """
+
+    def __init__(
+        self,
+        trace: RequestTrace,
+        max_bytes: int = STREAM_BUFFER_MAX_BYTES,
+        max_chunks: int = STREAM_BUFFER_MAX_CHUNKS,
+    ) -> None:
+        """Initialize the buffer."""
+        self._trace = trace
+        self._max_bytes = max_bytes
+        self._max_chunks = max_chunks
+        self._chunks: deque[bytes] = deque()
+        self._size = 0
+        self._eof = False
+        self._exception: Exception | None = None
+        self._readable = asyncio.Event()
+        self._writable = asyncio.Event()
+        self._writable.set()
+        self._high_water_bytes = trace.stream_buffer_bytes = 0
+        self._high_water_chunks = trace.stream_buffer_chunks = 0
+        self._reader_blocked = trace.stream_reader_blocked = 0.0
+        self._consumer_waited = trace.stream_consumer_waited = 0.0
+
+    @property
+    def full(self) -> bool:
+        """Return if the buffer reached one of its limits."""
+        return self._size >= self._max_bytes or len(self._chunks) >= self._max_chunks
+
+    async def async_read(self, content: ResponseContent) -> None:
+        """Read the response into the buffer until it ends."""
+        trace = self._trace
+        try:
+            while data := await content.readany():
+                trace.mark_first_chunk()
+                if self.full:
+                    self._writable.clear()
+                    blocked = time.monotonic()
+                    await self._writable.wait()
+                    self._reader_blocked += time.monotonic() - blocked
+                    trace.stream_reader_blocked = self._reader_blocked
+
+                self._chunks.append(data)
+                self._size += len(data)
+                if self._size > self._high_water_bytes:
+                    self._high_water_bytes = trace.stream_buffer_bytes = self._size
+                if len(self._chunks) > self._high_water_chunks:
+                    self._high_water_chunks = len(self._chunks)
+                    trace.stream_buffer_chunks = self._high_water_chunks
+                self._readable.set()
+        except Exception as err:
+            # Raised in the consumer once the buffered data has been taken
+            self._exception = err
+        finally:
+            self._eof = True
+            self._readable.set()
+
+    async def async_get_batch(self) -> bytes:
+        """Return all buffered data, waiting for some if the buffer is empty.
+
+        Returns empty bytes at the end of the response. Cancelling the wait
+        does not lose any data.
+        """
+        if not self._chunks and not self._eof:
+            self._readable.clear()
+            waited = time.monotonic()
+            try:
+                await self._readable.wait()
+            finally:
+                self._consumer_waited += time.monotonic() - waited
+                self._trace.stream_consumer_waited = self._consumer_waited
+
+        if not self._chunks:
+            if self._exception is not None:
+                raise self._exception
+            return b""
+
+        data = self._chunks[0] if len(self._chunks) == 1 else b"".join(self._chunks)
+        self._chunks.clear()
+        self._size = 0
+        self._writable.set()
+        return data
+
+
+async def async_iter_stream_content(
+    buffer: StreamBuffer,
+    content_type: str,
+    coalesce_interval: float,
+    coalesce_size: int,
+) -> AsyncGenerator[str | llm.ToolInput | CacheDirective]:
+    """Yield the content, tool calls and cache directive of a streamed response.
+
+    Content arriving within the coalesce interval is merged until it reaches
+    the coalesce size, so very small deltas do not each pass through the chat
+    log. An interval of zero yields every delta as it arrives. Tool calls are
+    yielded after the content that preceded them.
+    """
+    parser = StreamParser(stream_format(content_type))
+    loop = asyncio.get_running_loop()
+    pending: list[str] = []
+    pending_size = 0
+    deadline: float | None = None
+
+    while True:
+        timeout = asyncio.timeout_at(deadline)
+        data: bytes | None = None
+        try:
+            async with timeout:
+                data = await buffer.async_get_batch()
+        except TimeoutError:
+            if not timeout.expired():
+                raise
+
+        if data is None:
+            # Nothing more arrived within the coalesce interval
+            yield "".join(pending)
+            pending.clear()
+            pending_size = 0
+            deadline = None
+            continue
+
+        events = parser.feed(data) if data else parser.close()
+        finished = not data
+
+        for event in events:
+            if event.type == EVENT_END:
+                finished = True
+                break
+            if event.type == EVENT_TOOL_CALL:
+                if (tool_input := parse_tool_call(event.data or {})) is None:
+                    continue
+                if pending:
+                    yield "".join(pending)
+                    pending.clear()
+                    pending_size = 0
+                    deadline = None
+                yield tool_input
+                continue
+            if event.type == EVENT_CACHE:
+                directive_data = event.data or {}
+                if directive := parse_cache_directive(
+                    directive_data.get("ttl"), directive_data.get("entities")
+                ):
+                    yield directive
+                continue
+            if event.type != EVENT_ITEM or event.content is None:
+                continue
+            content = str(event.content)
+            if not coalesce_interval:
+                yield content
+                continue
+            pending.append(content)
+            pending_size += len(content)
+            if deadline is None:
+                deadline = loop.time() + coalesce_interval
+
+        if pending and (finished or pending_size >= coalesce_size):
+            yield "".join(pending)
+            pending.clear()
+            pending_size = 0
+            deadline = None
+        if finished:
+            return
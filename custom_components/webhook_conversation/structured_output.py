@@ -0,0 +1,258 @@
+"""Structured output handling for AI tasks."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Mapping
+import hashlib
+import json
+import logging
+import re
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import llm, selector
+
+from .cache import TTLCache
+
+_LOGGER = logging.getLogger(__name__)
+
+SCHEMA_CACHE_SIZE = 32
+
+_STRUCTURAL_CHARS = re.compile(r'["{}\[\],]')
+_STRING_CHARS = re.compile(r'["\\]')
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "string": lambda value: isinstance(value, str),
+    "integer": lambda value: isinstance(value, int) and not isinstance(value, bool),
+    "number": lambda value: (
+        isinstance(value, int | float) and not isinstance(value, bool)
+    ),
+    "boolean": lambda value: isinstance(value, bool),
+    "array": lambda value: isinstance(value, list),
+    "object": lambda value: isinstance(value, dict),
+}
+
+
+_converted_schemas: TTLCache[str, dict[str, Any]] = TTLCache(SCHEMA_CACHE_SIZE)
+
+
+def _schema_signature(value: Any) -> Any:
+    """Return a JSON serializable signature of a voluptuous schema."""
+    if isinstance(value, vol.Schema):
+        return ["Schema", _schema_signature(value.schema), value.extra]
+    if isinstance(value, vol.Marker):
+        # Only Optional and Required markers have a default
+        default: Any = getattr(value, "default", vol.UNDEFINED)
+        return [
+            type(value).__name__,
+            _schema_signature(value.schema),
+            value.description,
+            None if default is vol.UNDEFINED else repr(default()),
+        ]
+    if isinstance(value, selector.Selector):
+        return value.serialize()
+    if isinstance(value, Mapping):
+        return sorted(
+            (
+                [_schema_signature(key), _schema_signature(item)]
+                for key, item in value.items()
+            ),
+            key=repr,
+        )
+    if isinstance(value, list | tuple):
+        return [_schema_signature(item) for item in value]
+    if isinstance(value, type):
+        return value.__name__
+    if value is None or isinstance(value, str | int | float | bool):
+        return value
+    if validators := getattr(value, "validators", None):
+        return [type(value).__name__, _schema_signature(validators)]
+    return repr(value)
+
+
+def schema_fingerprint(schema: Any) -> str:
+    """Return a stable fingerprint of a voluptuous schema."""
+    return hashlib.sha256(
+        json.dumps(
+            _schema_signature(schema), separators=(",", ":"), default=repr
+        ).encode()
+    ).hexdigest()[:32]
+
+
+def convert_structure(schema: Any) -> tuple[str, dict[str, Any]]:
+    """Return the fingerprint and the OpenAPI schema of a task structure.
+
+    Converted schemas are cached by fingerprint, since automations reuse the
+    same few structures over and over.
+    """
+    fingerprint = schema_fingerprint(schema)
+    if (converted := _converted_schemas.get(fingerprint)) is None:
+        # Deferred until the first structured task to keep setup fast
+        from voluptuous_openapi import convert
+
+        converted = convert(schema, custom_serializer=llm.selector_serializer)
+        _converted_schemas.set(fingerprint, converted)
+        _LOGGER.debug(
+            "Converted structure %s (cache hits: %s, misses: %s)",
+            fingerprint,
+            _converted_schemas.hits,
+            _converted_schemas.misses,
+        )
+    return fingerprint, converted
+
+
+def schema_cache_stats() -> dict[str, int]:
+    """Return the hit and miss counters of the converted schema cache."""
+    return {
+        "size": len(_converted_schemas),
+        "hits": _converted_schemas.hits,
+        "misses": _converted_schemas.misses,
+    }
+
+
+def _matches_schema(value: Any, schema: dict[str, Any]) -> bool:
+    """Return if a value matches an OpenAPI schema."""
+    if value is None:
+        return bool(schema.get("nullable")) or schema.get("type") == "null"
+
+    if "enum" in schema and value not in schema["enum"]:
+        return False
+
+    for combinator in ("anyOf", "oneOf"):
+        if combinator in schema and not any(
+            _matches_schema(value, option) for option in schema[combinator]
+        ):
+            return False
+
+    expected_type = schema.get("type")
+    if expected_type is None:
+        return True
+
+    if (check := _TYPE_CHECKS.get(expected_type)) and not check(value):
+        return False
+
+    if expected_type == "array" and (items := schema.get("items")):
+        return all(_matches_schema(item, items) for item in value)
+
+    if expected_type == "object" and (properties := schema.get("properties")):
+        return all(
+            _matches_schema(item, properties[key])
+            for key, item in value.items()
+            if key in properties
+        )
+
+    return True
+
+
+class StructuredOutputParser:
+    """Parse a streamed JSON object and validate its fields as they complete.
+
+    Only the text of the member currently being streamed is buffered. Each
+    top-level member is decoded and validated against the schema as soon as
+    it is complete, so schema violations surface before the stream ends.
+    """
+
+    def __init__(self, schema: dict[str, Any]) -> None:
+        """Initialize the parser with the converted OpenAPI schema."""
+        self._properties: dict[str, Any] = schema.get("properties", {})
+        self._required: list[str] = schema.get("required", [])
+        self._additional_properties = bool(schema.get("additionalProperties")) or (
+            "properties" not in schema
+        )
+        self._member: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self.complete = False
+        self.result: dict[str, Any] = {}
+
+    def feed(self, chunk: str) -> bool:
+        """Feed a streamed chunk and return if the top-level object is closed."""
+        if self.complete:
+            return True
+
+        position = 0
+        if not self._depth:
+            # Skip anything in front of the object, like markdown code fences
+            if (start := chunk.find("{")) == -1:
+                return False
+            self._depth = 1
+            position = start + 1
+
+        member_start = position
+        end = len(chunk)
+        while position < end:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    position += 1
+                    continue
+                if (match := _STRING_CHARS.search(chunk, position)) is None:
+                    break
+                position = match.end()
+                if match.group() == "\\":
+                    self._escaped = True
+                else:
+                    self._in_string = False
+                continue
+
+            if (match := _STRUCTURAL_CHARS.search(chunk, position)) is None:
+                break
+            char = match.group()
+            position = match.end()
+
+            if char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if not self._depth:
+                    self._member.append(chunk[member_start : position - 1])
+                    self._finish_member()
+                    self._finish_object()
+                    return True
+            elif self._depth == 1:
+                self._member.append(chunk[member_start : position - 1])
+                self._finish_member()
+                member_start = position
+
+        self._member.append(chunk[member_start:])
+        return False
+
+    def _finish_member(self) -> None:
+        """Decode and validate a completed top-level member."""
+        text = "".join(self._member).strip()
+        self._member.clear()
+        if not text:
+            return
+
+        try:
+            member: dict[str, Any] = json.loads(f"{{{text}}}")
+        except json.JSONDecodeError as err:
+            raise HomeAssistantError(
+                f"Invalid structured output from webhook: {text}"
+            ) from err
+
+        for key, value in member.items():
+            if (schema := self._properties.get(key)) is None:
+                if not self._additional_properties:
+                    raise HomeAssistantError(
+                        f"Structured output contains unexpected field '{key}'"
+                    )
+            elif not _matches_schema(value, schema):
+                raise HomeAssistantError(
+                    f"Structured output field '{key}' does not match the schema: "
+                    f"{value!r}"
+                )
+            self.result[key] = value
+
+    def _finish_object(self) -> None:
+        """Check that all required fields were received."""
+        self.complete = True
+        if missing := [key for key in self._required if key not in self.result]:
+            raise HomeAssistantError(
+                f"Structured output is missing required fields: {', '.join(missing)}"
+            )
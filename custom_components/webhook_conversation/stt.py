@@ -2,73 +2,74 @@
 
 from __future__ import annotations
 
-import base64
-from collections.abc import AsyncIterable
-import io
+from collections.abc import AsyncIterable, Buffer
 import logging
 from pathlib import Path
-import wave
+from typing import TYPE_CHECKING
 
 import aiohttp
 
 from homeassistant.components import stt
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
+from .audio import AudioBuffer, Base64Audio, PCMFormat
 from .const import (
     CONF_OUTPUT_FIELD,
+    CONF_STT_BIT_DEPTH,
+    CONF_STT_CHANNELS,
+    CONF_STT_END_SILENCE,
+    CONF_STT_SAMPLE_RATE,
+    CONF_STT_SILENCE_THRESHOLD,
+    CONF_STT_TRIM_SILENCE,
     CONF_SUPPORTED_LANGUAGES,
-    CONF_TIMEOUT,
     DEFAULT_OUTPUT_FIELD,
-    DEFAULT_TIMEOUT,
+    DEFAULT_STT_BIT_DEPTH,
+    DEFAULT_STT_CHANNELS,
+    DEFAULT_STT_END_SILENCE,
+    DEFAULT_STT_SAMPLE_RATE,
+    DEFAULT_STT_SILENCE_THRESHOLD,
+    DEFAULT_STT_TRIM_SILENCE,
 )
 from .entity import WebhookConversationBaseEntity
-from .models import WebhookConversationBinaryObject, WebhookSTTRequestPayload
-
-_LOGGER = logging.getLogger(__name__)
-
-
-def _convert_to_wav(
-    audio_data: bytes, sample_rate: int, bit_rate: int, channels: int = 1
-) -> bytes:
-    """Convert raw audio data to WAV format with proper headers.
-
-    Args:
-        audio_data: The raw audio data as bytes
-        sample_rate: Sample rate in Hz (e.g., 16000)
-        bit_rate: Bit depth (e.g., 16)
-        channels: Number of audio channels (default: 1 for mono)
+from .models import (
+    WebhookConversationConfigEntry,
+    WebhookSTTAudio,
+    WebhookSTTRequestPayload,
+    WebhookSTTTrimmedSilence,
+)
 
-    Returns:
-        Properly formatted WAV file as bytes
-    """
-    wav_buffer = io.BytesIO()
-    with wave.open(wav_buffer, "wb") as wf:
-        wf.setnchannels(channels)
-        wf.setsampwidth(bit_rate // 8)
-        wf.setframerate(sample_rate)
-        wf.writeframes(audio_data)
+if TYPE_CHECKING:
+    from .pcm import PCMConverter, SilenceTrimmer
 
-    return wav_buffer.getvalue()
+_LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry,
+    config_entry: WebhookConversationConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up STT entity for webhook conversation."""
-    for subentry in config_entry.subentries.values():
+
+    @callback
+    def async_add_subentry(subentry: ConfigSubentry) -> None:
+        """Add the entity of a subentry."""
         if subentry.subentry_type != "stt":
-            continue
+            return
 
         async_add_entities(
             [WebhookConversationSTTEntity(config_entry, subentry)],
             config_subentry_id=subentry.subentry_id,
         )
 
+    for subentry in config_entry.subentries.values():
+        async_add_subentry(subentry)
+    config_entry.runtime_data.subentry_adders[Platform.STT] = async_add_subentry
+
 
 class WebhookConversationSTTEntity(
     WebhookConversationBaseEntity, stt.SpeechToTextEntity
@@ -78,7 +79,9 @@ class WebhookConversationSTTEntity(
     _attr_has_entity_name = False
     _attr_name: str
 
-    def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
         """Initialize STT entity."""
         super().__init__(config_entry, subentry)
         self._attr_name: str = (
@@ -89,6 +92,20 @@ class WebhookConversationSTTEntity(
 
         supported_languages: list[str] = subentry.data[CONF_SUPPORTED_LANGUAGES]
         self._supported_languages = supported_languages
+        self._upload_format = PCMFormat(
+            subentry.data.get(CONF_STT_SAMPLE_RATE, DEFAULT_STT_SAMPLE_RATE),
+            subentry.data.get(CONF_STT_BIT_DEPTH, DEFAULT_STT_BIT_DEPTH),
+            subentry.data.get(CONF_STT_CHANNELS, DEFAULT_STT_CHANNELS),
+        )
+        self._trim_silence: bool = subentry.data.get(
+            CONF_STT_TRIM_SILENCE, DEFAULT_STT_TRIM_SILENCE
+        )
+        self._silence_threshold: int = subentry.data.get(
+            CONF_STT_SILENCE_THRESHOLD, DEFAULT_STT_SILENCE_THRESHOLD
+        )
+        self._end_silence: float = (
+            subentry.data.get(CONF_STT_END_SILENCE, DEFAULT_STT_END_SILENCE) / 1000
+        )
 
     @property
     def supported_languages(self) -> list[str]:
@@ -108,47 +125,87 @@ class WebhookConversationSTTEntity(
     @property
     def supported_bit_rates(self) -> list[stt.AudioBitRates]:
         """Return a list of supported bit rates."""
-        return [stt.AudioBitRates.BITRATE_16]
+        return list(stt.AudioBitRates)
 
     @property
     def supported_sample_rates(self) -> list[stt.AudioSampleRates]:
         """Return a list of supported sample rates."""
-        return [stt.AudioSampleRates.SAMPLERATE_16000]
+        return list(stt.AudioSampleRates)
 
     @property
     def supported_channels(self) -> list[stt.AudioChannels]:
         """Return a list of supported channels."""
-        return [stt.AudioChannels.CHANNEL_MONO]
+        return list(stt.AudioChannels)
 
     async def async_process_audio_stream(
         self, metadata: stt.SpeechMetadata, stream: AsyncIterable[bytes]
     ) -> stt.SpeechResult:
-        """Process an audio stream to STT service."""
-        # Collect all audio data from the stream
-        audio_data = b""
+        """Process an audio stream to STT service.
+
+        The audio is collected in a single buffer, which is encoded while it
+        is sent. Raw PCM audio is converted to the upload format and trimmed
+        of silence as it arrives, and gets a WAV header. Other formats are
+        sent as they are.
+        """
+        is_wav = metadata.format == stt.AudioFormats.WAV
+        audio_format = PCMFormat(
+            metadata.sample_rate.value,
+            metadata.bit_rate.value,
+            metadata.channel.value,
+        )
+        buffer = AudioBuffer(wav_header=is_wav)
+        converter: PCMConverter | None = None
+        trimmer: SilenceTrimmer | None = None
+
+        if is_wav and (audio_format != self._upload_format or self._trim_silence):
+            # NumPy is only needed when the audio is converted or trimmed
+            from .pcm import PCMConverter, SilenceTrimmer
+
+            if audio_format != self._upload_format:
+                converter = PCMConverter(audio_format, self._upload_format)
+                audio_format = self._upload_format
+            if self._trim_silence:
+                trimmer = SilenceTrimmer(
+                    audio_format, self._silence_threshold, self._end_silence
+                )
+
+        def append(audio: Buffer) -> None:
+            if trimmer is None:
+                buffer.append(audio)
+                return
+            for segment in trimmer.process(audio):
+                buffer.append(segment)
+
         async for chunk in stream:
-            audio_data += chunk
-
-        # Convert to proper WAV format if needed
-        if metadata.format == stt.AudioFormats.WAV:
-            # Convert raw audio data to proper WAV format with headers
-            wav_data = _convert_to_wav(
-                audio_data,
-                metadata.sample_rate.value,
-                metadata.bit_rate.value,
-                metadata.channel.value,
-            )
-            audio_base64 = base64.b64encode(wav_data).decode("utf-8")
+            append(converter.convert(chunk) if converter else chunk)
+            if trimmer is not None and trimmer.ended:
+                break
         else:
-            # For other formats, use as-is (assuming they're already properly formatted)
-            audio_base64 = base64.b64encode(audio_data).decode("utf-8")
-
-        # Create audio binary object
-        audio_object: WebhookConversationBinaryObject = {
+            if converter is not None:
+                append(converter.flush())
+
+        trimmed_silence: WebhookSTTTrimmedSilence | None = None
+        if trimmer is not None:
+            for segment in trimmer.finish():
+                buffer.append(segment)
+            trimmed_silence = {
+                "leading_ms": round(trimmer.leading_silence * 1000),
+                "trailing_ms": round(trimmer.trailing_silence * 1000),
+                "ended_early": trimmer.ended,
+            }
+            _LOGGER.debug("Trimmed silence from STT audio: %s", trimmed_silence)
+            if not trimmer.speech_detected:
+                _LOGGER.debug("No speech detected, skipping STT webhook")
+                return stt.SpeechResult("", stt.SpeechResultState.SUCCESS)
+
+        if is_wav:
+            buffer.write_wav_header(audio_format)
+
+        audio_object: WebhookSTTAudio = {
             "name": f"audio.{metadata.format.value}",
             "path": Path(f"audio.{metadata.format.value}"),
             "mime_type": f"audio/{metadata.format.value}",
-            "data": audio_base64,
+            "data": Base64Audio(buffer.view()),
         }
 
         # Prepare the payload
@@ -156,19 +213,11 @@ class WebhookConversationSTTEntity(
             "audio": audio_object,
             "language": metadata.language,
         }
-
-        timeout = self._subentry.data.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-        session = async_get_clientsession(self.hass)
-        client_timeout = aiohttp.ClientTimeout(total=timeout)
-        headers = self._get_auth_headers()
+        if trimmed_silence is not None:
+            payload["trimmed_silence"] = trimmed_silence
 
         try:
-            async with session.post(
-                self._webhook_url,
-                json=payload,
-                headers=headers,
-                timeout=client_timeout,
-            ) as response:
+            async with self._async_post(payload, stream_body=True) as response:
                 if response.status != 200:
                     _LOGGER.error(
                         "Error contacting STT webhook: HTTP %s - %s",
@@ -197,7 +246,7 @@ class WebhookConversationSTTEntity(
                 )
                 return stt.SpeechResult(None, stt.SpeechResultState.ERROR)
 
-        except aiohttp.ClientError as err:
+        except (aiohttp.ClientError, HomeAssistantError) as err:
             _LOGGER.error("Error during STT request: %s", err)
             return stt.SpeechResult(None, stt.SpeechResultState.ERROR)
         except (ValueError, KeyError) as err:
@@ -0,0 +1,299 @@
+"""Request telemetry for the webhook conversation integration."""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass, field
+import math
+import time
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, callback
+
+from .audio import Base64Audio
+
+METRICS_WINDOW = 200
+RECENT_REQUESTS = 25
+
+TRACE_CONTEXT_KEY = "webhook_conversation_trace"
+
+
+@dataclass(slots=True)
+class RequestTrace:
+    """Timings and sizes of a single webhook request.
+
+    All timings are monotonic timestamps, phases that did not happen are None.
+    """
+
+    start: float = field(default_factory=time.monotonic)
+    timestamp: float = field(default_factory=time.time)
+    dns_start: float | None = None
+    dns_end: float | None = None
+    connect_start: float | None = None
+    connect_end: float | None = None
+    headers_sent: float | None = None
+    first_byte: float | None = None
+    first_chunk: float | None = None
+    end: float | None = None
+    request_bytes: int = 0
+    response_bytes: int = 0
+    status: int | None = None
+    error: str | None = None
+    payload_shape: dict[str, Any] | None = None
+    stream_buffer_bytes: int | None = None
+    stream_buffer_chunks: int | None = None
+    stream_reader_blocked: float | None = None
+    stream_consumer_waited: float | None = None
+
+    @property
+    def connect_time(self) -> float | None:
+        """Return the time spent opening a new connection in seconds."""
+        if self.connect_start is None or self.connect_end is None:
+            return None
+        return self.connect_end - self.connect_start
+
+    @property
+    def time_to_first_byte(self) -> float | None:
+        """Return the time until the response headers arrived in seconds."""
+        return None if self.first_byte is None else self.first_byte - self.start
+
+    @property
+    def time_to_first_chunk(self) -> float | None:
+        """Return the time until the first streamed chunk arrived in seconds."""
+        return None if self.first_chunk is None else self.first_chunk - self.start
+
+    @property
+    def duration(self) -> float | None:
+        """Return the total duration of the request in seconds."""
+        return None if self.end is None else self.end - self.start
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the trace with phase offsets in milliseconds."""
+
+        def offset(timestamp: float | None) -> float | None:
+            return (
+                None if timestamp is None else round((timestamp - self.start) * 1000, 1)
+            )
+
+        return {
+            "timestamp": self.timestamp,
+            "status": self.status,
+            "error": self.error,
+            "request_bytes": self.request_bytes,
+            "response_bytes": self.response_bytes,
+            "phases_ms": {
+                "dns_start": offset(self.dns_start),
+                "dns_end": offset(self.dns_end),
+                "connect_start": offset(self.connect_start),
+                "connect_end": offset(self.connect_end),
+                "headers_sent": offset(self.headers_sent),
+                "first_byte": offset(self.first_byte),
+                "first_chunk": offset(self.first_chunk),
+                "end": offset(self.end),
+            },
+            "payload_shape": self.payload_shape,
+            "stream": None
+            if self.stream_buffer_bytes is None
+            else {
+                "buffer_high_water_bytes": self.stream_buffer_bytes,
+                "buffer_high_water_chunks": self.stream_buffer_chunks,
+                "reader_blocked_ms": round((self.stream_reader_blocked or 0) * 1000, 1),
+                "consumer_waited_ms": round(
+                    (self.stream_consumer_waited or 0) * 1000, 1
+                ),
+            },
+        }
+
+    def mark_first_chunk(self) -> None:
+        """Record the arrival of the first streamed chunk."""
+        if self.first_chunk is None:
+            self.first_chunk = time.monotonic()
+
+
+def describe_payload(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Return the shape of a payload without any of its values."""
+    shape: dict[str, Any] = {}
+    for key, value in payload.items():
+        if isinstance(value, Base64Audio):
+            shape[key] = {"type": "str", "length": len(value)}
+        elif isinstance(value, str | list):
+            shape[key] = {"type": type(value).__name__, "length": len(value)}
+        elif isinstance(value, Mapping):
+            shape[key] = describe_payload(value)
+        else:
+            shape[key] = type(value).__name__
+    return shape
+
+
+def _percentile(samples: list[float], percentile: float) -> float:
+    """Return the nearest-rank percentile of sorted samples."""
+    rank = math.ceil(percentile / 100 * len(samples))
+    return samples[max(rank - 1, 0)]
+
+
+class RequestMetrics:
+    """Rolling request metrics of a single subentry."""
+
+    def __init__(self, window: int = METRICS_WINDOW) -> None:
+        """Initialize the metrics."""
+        self._samples: dict[str, deque[float]] = {
+            "connect_time": deque(maxlen=window),
+            "time_to_first_byte": deque(maxlen=window),
+            "time_to_first_chunk": deque(maxlen=window),
+            "duration": deque(maxlen=window),
+            "stream_reader_blocked": deque(maxlen=window),
+            "stream_consumer_waited": deque(maxlen=window),
+        }
+        self._listeners: list[CALLBACK_TYPE] = []
+        self.recent: deque[RequestTrace] = deque(maxlen=RECENT_REQUESTS)
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+
+    @callback
+    def async_add_listener(self, update_callback: CALLBACK_TYPE) -> Callable[[], None]:
+        """Listen for new request metrics."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_record(self, trace: RequestTrace, *, timeout: bool = False) -> None:
+        """Record a finished request."""
+        self.recent.append(trace)
+        self.requests += 1
+        self.request_bytes += trace.request_bytes
+        self.response_bytes += trace.response_bytes
+        if timeout:
+            self.timeouts += 1
+        elif trace.error is not None:
+            self.errors += 1
+
+        for name, samples in self._samples.items():
+            if (value := getattr(trace, name)) is not None:
+                samples.append(value)
+
+        for update_callback in list(self._listeners):
+            update_callback()
+
+    def percentiles(self, name: str) -> dict[str, float] | None:
+        """Return the p50, p95 and p99 of a timing in milliseconds."""
+        if not (samples := self._samples[name]):
+            return None
+        ordered = sorted(samples)
+        return {
+            f"p{percentile}": _percentile(ordered, percentile) * 1000
+            for percentile in (50, 95, 99)
+        }
+
+
+def _get_trace(context: SimpleNamespace) -> RequestTrace | None:
+    """Return the request trace attached to an aiohttp trace context."""
+    if not context.trace_request_ctx:
+        return None
+    trace: RequestTrace | None = context.trace_request_ctx.get(TRACE_CONTEXT_KEY)
+    return trace
+
+
+async def _on_dns_resolvehost_start(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Record the start of a host name resolution."""
+    if trace := _get_trace(context):
+        trace.dns_start = time.monotonic()
+
+
+async def _on_dns_resolvehost_end(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Record the end of a host name resolution."""
+    if trace := _get_trace(context):
+        trace.dns_end = time.monotonic()
+
+
+async def _on_connection_create_start(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Record the start of a new connection."""
+    if trace := _get_trace(context):
+        trace.connect_start = time.monotonic()
+
+
+async def _on_connection_create_end(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Record the end of a new connection."""
+    if trace := _get_trace(context):
+        trace.connect_end = time.monotonic()
+
+
+async def _on_request_headers_sent(
+    session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+) -> None:
+    """Record when the request headers were sent."""
+    if trace := _get_trace(context):
+        trace.headers_sent = time.monotonic()
+
+
+async def _on_request_chunk_sent(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestChunkSentParams,
+) -> None:
+    """Record the size of a sent request body chunk."""
+    if trace := _get_trace(context):
+        trace.request_bytes += len(params.chunk)
+
+
+async def _on_request_end(
+    session: aiohttp.ClientSession,
+    context: SimpleNamespace,
+    params: aiohttp.TraceRequestEndParams,
+) -> None:
+    """Record the arrival of the response headers."""
+    if trace := _get_trace(context):
+        trace.first_byte = time.monotonic()
+        trace.status = params.response.status
+
+
+def create_trace_config() -> aiohttp.TraceConfig:
+    """Return a trace config recording the phases of webhook requests."""
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_dns_resolvehost_start.append(_on_dns_resolvehost_start)
+    trace_config.on_dns_resolvehost_end.append(_on_dns_resolvehost_end)
+    trace_config.on_connection_create_start.append(_on_connection_create_start)
+    trace_config.on_connection_create_end.append(_on_connection_create_end)
+    trace_config.on_request_headers_sent.append(_on_request_headers_sent)
+    trace_config.on_request_chunk_sent.append(_on_request_chunk_sent)
+    trace_config.on_request_end.append(_on_request_end)
+    return trace_config
+
+
+class WebhookTelemetry:
+    """Request metrics of all subentries of a config entry."""
+
+    def __init__(self) -> None:
+        """Initialize the telemetry."""
+        self.trace_config = create_trace_config()
+        self._metrics: dict[str, RequestMetrics] = {}
+
+    @property
+    def subentry_metrics(self) -> dict[str, RequestMetrics]:
+        """Return the request metrics per subentry."""
+        return self._metrics
+
+    def metrics(self, subentry_id: str) -> RequestMetrics:
+        """Return the request metrics of a subentry."""
+        if (metrics := self._metrics.get(subentry_id)) is None:
+            metrics = self._metrics[subentry_id] = RequestMetrics()
+        return metrics
@@ -0,0 +1,150 @@
+"""Trace propagation for the webhook conversation integration."""
+
+from __future__ import annotations
+
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import secrets
+import time
+from typing import Any
+
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.chat_session import current_session
+from homeassistant.helpers.singleton import singleton
+from homeassistant.util.hass_dict import HassKey
+
+from .const import DOMAIN
+
+MAX_SPANS = 500
+
+TRACEPARENT_HEADER = "traceparent"
+
+DATA_TRACER: HassKey[WebhookTracer] = HassKey(f"{DOMAIN}_tracer")
+
+
+@dataclass(slots=True, frozen=True)
+class TraceContext:
+    """Trace shared by all webhook requests of a pipeline run."""
+
+    trace_id: str = field(default_factory=lambda: secrets.token_hex(16))
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+
+
+_current_trace: ContextVar[TraceContext | None] = ContextVar(
+    f"{DOMAIN}_trace", default=None
+)
+
+
+def async_get_trace_context() -> TraceContext:
+    """Return the trace of the current task, starting a new one if needed.
+
+    Every pipeline run executes in its own task, and the text-to-speech stage
+    is started from within that task, so the STT, conversation and TTS
+    requests of a run end up in the same trace.
+    """
+    if (trace := _current_trace.get()) is None:
+        trace = TraceContext()
+        _current_trace.set(trace)
+    return trace
+
+
+@dataclass(slots=True)
+class Span:
+    """A single webhook request within a trace."""
+
+    trace_id: str
+    parent_id: str
+    name: str
+    subentry_id: str
+    conversation_id: str | None
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    timestamp: float = field(default_factory=time.time)
+    start: float = field(default_factory=time.monotonic)
+    duration: float | None = None
+    status: int | None = None
+    error: str | None = None
+
+    @property
+    def traceparent(self) -> str:
+        """Return the W3C trace context header value of the span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    @callback
+    def async_end(self, status: int | None, error: str | None) -> None:
+        """Finish the span."""
+        self.duration = time.monotonic() - self.start
+        self.status = status
+        self.error = error
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the span as a dictionary."""
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "subentry_id": self.subentry_id,
+            "conversation_id": self.conversation_id,
+            "timestamp": self.timestamp,
+            "duration_ms": None
+            if self.duration is None
+            else round(self.duration * 1000, 1),
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class WebhookTracer:
+    """Record the spans of recent webhook requests."""
+
+    def __init__(self) -> None:
+        """Initialize the tracer."""
+        self._spans: deque[Span] = deque(maxlen=MAX_SPANS)
+
+    @callback
+    def async_start_span(self, subentry: ConfigSubentry) -> Span:
+        """Start a span for a webhook request of a subentry."""
+        trace = async_get_trace_context()
+        session = current_session.get()
+        span = Span(
+            trace_id=trace.trace_id,
+            parent_id=trace.span_id,
+            name=f"{subentry.subentry_type} {subentry.title}",
+            subentry_id=subentry.subentry_id,
+            conversation_id=session.conversation_id if session else None,
+        )
+        self._spans.append(span)
+        return span
+
+    @callback
+    def async_get_spans(
+        self,
+        trace_id: str | None = None,
+        subentry_ids: set[str] | None = None,
+    ) -> list[Span]:
+        """Return the recorded spans, optionally filtered."""
+        return [
+            span
+            for span in self._spans
+            if (trace_id is None or span.trace_id == trace_id)
+            and (subentry_ids is None or span.subentry_id in subentry_ids)
+        ]
+
+    @callback
+    def async_get_traces(self, trace_id: str | None = None) -> list[dict[str, Any]]:
+        """Return the recorded spans grouped by trace, most recent trace last."""
+        traces: dict[str, list[dict[str, Any]]] = {}
+        for span in self.async_get_spans(trace_id):
+            traces.setdefault(span.trace_id, []).append(span.as_dict())
+        return [
+            {"trace_id": trace_id, "spans": spans} for trace_id, spans in traces.items()
+        ]
+
+
+@callback
+@singleton(DATA_TRACER)
+def async_get_tracer(hass: HomeAssistant) -> WebhookTracer:
+    """Return the tracer shared by all config entries."""
+    return WebhookTracer()
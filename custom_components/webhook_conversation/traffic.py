@@ -0,0 +1,182 @@
+"""Recording of webhook traffic for load testing."""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+import gzip
+import hashlib
+import json
+import logging
+from pathlib import Path
+import re
+from typing import Any
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+from .telemetry import RequestTrace
+
+_LOGGER = logging.getLogger(__name__)
+
+FLUSH_DELAY = 5
+MAX_FILE_SIZE = 10 * 1024 * 1024
+MAX_BACKUPS = 3
+
+REDACTED = "**REDACTED**"
+REDACTED_FIELDS = {
+    "agent_id",
+    "device_id",
+    "device_info",
+    "exposed_entities_url",
+    "user_id",
+}
+HASHED_FIELDS = {"conversation_id"}
+MASKED_FIELDS = {
+    "batch",
+    "exposed_entities",
+    "query",
+    "system_prompt",
+    "task_name",
+    "text",
+}
+
+_MASK_PATTERN = re.compile(r"\S")
+
+
+def _mask_text(value: str) -> str:
+    """Replace the characters of a text by placeholders of equal UTF-8 size."""
+    return _MASK_PATTERN.sub(lambda match: "x" * len(match[0].encode()), value)
+
+
+def _mask(value: Any) -> Any:
+    """Mask all texts in a value, keeping its structure and keys."""
+    if isinstance(value, str):
+        return _mask_text(value)
+    if isinstance(value, Mapping):
+        return {key: _mask(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_mask(item) for item in value]
+    return value
+
+
+def _mask_message(message: Mapping[str, Any]) -> dict[str, Any]:
+    """Mask the content and tool call arguments of a message."""
+    masked = dict(message)
+    masked["content"] = _mask(message.get("content"))
+    if tool_calls := message.get("tool_calls"):
+        masked["tool_calls"] = [
+            {**tool_call, "args": _mask(tool_call.get("args"))}
+            for tool_call in tool_calls
+        ]
+    return masked
+
+
+def _redact_binary_object(binary_object: Mapping[str, Any]) -> dict[str, Any]:
+    """Replace the content of a binary object with its length."""
+    return {
+        "name": binary_object["name"],
+        "mime_type": binary_object["mime_type"],
+        "data_length": len(binary_object["data"]),
+    }
+
+
+def redact_payload(payload: Mapping[str, Any]) -> dict[str, Any]:
+    """Return a payload without identifiers, credentials and user content.
+
+    Conversation IDs are replaced by a hash so turns of the same conversation
+    can still be correlated. Queries, prompts, messages and exposed entities
+    are masked character by character and binary content is replaced by its
+    length, which is enough to replay requests of the same size.
+    """
+    redacted: dict[str, Any] = {}
+    for key, value in payload.items():
+        if key in REDACTED_FIELDS:
+            redacted[key] = None if value is None else REDACTED
+        elif key in HASHED_FIELDS and isinstance(value, str):
+            redacted[key] = hashlib.sha256(value.encode()).hexdigest()[:16]
+        elif key in MASKED_FIELDS:
+            redacted[key] = _mask(value)
+        elif key == "messages":
+            redacted[key] = [_mask_message(message) for message in value]
+        elif key == "binary_objects":
+            redacted[key] = [_redact_binary_object(item) for item in value]
+        elif key == "audio":
+            redacted[key] = _redact_binary_object(value)
+        else:
+            redacted[key] = value
+    return redacted
+
+
+def _write_records(path: Path, lines: list[str]) -> None:
+    """Append records to the recording, rotating it when it gets too large."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.exists() and path.stat().st_size > MAX_FILE_SIZE:
+        for index in range(MAX_BACKUPS - 1, 0, -1):
+            backup = path.with_name(f"{path.name}.{index}")
+            if backup.exists():
+                backup.replace(path.with_name(f"{path.name}.{index + 1}"))
+        path.replace(path.with_name(f"{path.name}.1"))
+
+    with gzip.open(path, "at", encoding="utf-8") as file:
+        file.writelines(lines)
+
+
+class TrafficRecorder:
+    """Record redacted webhook requests and their timings to a rotated file.
+
+    Records are buffered and written in the executor in batches, so recording
+    does not add file I/O to the request path.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        """Initialize the recorder."""
+        self._hass = hass
+        self.path = Path(hass.config.path(DOMAIN, "recordings", f"{entry_id}.jsonl.gz"))
+        self._pending: list[str] = []
+        self._cancel_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_record(
+        self, subentry_type: str, payload: Mapping[str, Any], trace: RequestTrace
+    ) -> None:
+        """Buffer a finished request."""
+        record = {
+            "timestamp": trace.timestamp,
+            "subentry_type": subentry_type,
+            "payload": redact_payload(payload),
+            "status": trace.status,
+            "error": trace.error,
+            "time_to_first_byte": trace.time_to_first_byte,
+            "duration": trace.duration,
+            "request_bytes": trace.request_bytes,
+            "response_bytes": trace.response_bytes,
+        }
+        self._pending.append(json.dumps(record, separators=(",", ":"), default=str))
+        self._pending.append("\n")
+        if self._cancel_flush is None:
+            self._cancel_flush = async_call_later(
+                self._hass, FLUSH_DELAY, self._async_scheduled_flush
+            )
+
+    @callback
+    def _async_scheduled_flush(self, _: Any) -> None:
+        """Flush the buffered records after the flush delay."""
+        self._cancel_flush = None
+        self._hass.async_create_background_task(
+            self.async_flush(), f"{DOMAIN} flush traffic recording"
+        )
+
+    async def async_flush(self) -> None:
+        """Write all buffered records."""
+        if self._cancel_flush is not None:
+            self._cancel_flush()
+            self._cancel_flush = None
+        if not self._pending:
+            return
+
+        lines, self._pending = self._pending, []
+        try:
+            await self._hass.async_add_executor_job(_write_records, self.path, lines)
+        except OSError as err:
+            _LOGGER.warning("Failed to write traffic recording %s: %s", self.path, err)
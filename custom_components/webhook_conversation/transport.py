@@ -0,0 +1,315 @@
+"""Persistent WebSocket transport to the webhook backend."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+import json
+import logging
+import time
+from typing import Any, Protocol
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util.ulid import ulid_now
+
+from .audio import audio_json_default
+from .const import DOMAIN
+from .models import WebhookConversationConfigEntry
+from .telemetry import RequestTrace
+
+_LOGGER = logging.getLogger(__name__)
+
+HEARTBEAT = 30
+RECONNECT_MIN_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+REQUEST_ID_LENGTH = 26
+
+MESSAGE_REQUEST = "request"
+MESSAGE_RESPONSE = "response"
+MESSAGE_END = "end"
+
+
+class ResponseContent(Protocol):
+    """Body of a webhook response that is read incrementally."""
+
+    @property
+    def total_bytes(self) -> int:
+        """Return the number of bytes received so far."""
+
+    async def readany(self) -> bytes:
+        """Return the next available data, or empty bytes at the end."""
+
+
+class WebhookResponse(Protocol):
+    """Response of a webhook request, independent of its transport."""
+
+    @property
+    def status(self) -> int:
+        """Return the HTTP status code."""
+
+    @property
+    def reason(self) -> str | None:
+        """Return the HTTP status reason."""
+
+    @property
+    def headers(self) -> Mapping[str, str]:
+        """Return the response headers."""
+
+    @property
+    def content_type(self) -> str:
+        """Return the content type of the body."""
+
+    @property
+    def content(self) -> ResponseContent:
+        """Return the body to read incrementally."""
+
+    async def read(self) -> bytes:
+        """Return the whole body."""
+
+    async def json(self) -> Any:
+        """Return the decoded JSON body."""
+
+
+class WebSocketResponseContent:
+    """Body of a response received as WebSocket messages."""
+
+    def __init__(self) -> None:
+        """Initialize the body."""
+        self.total_bytes = 0
+        self._chunks: asyncio.Queue[bytes | BaseException] = asyncio.Queue()
+        self._eof = False
+
+    def feed_data(self, data: bytes) -> None:
+        """Add received data."""
+        self.total_bytes += len(data)
+        self._chunks.put_nowait(data)
+
+    def feed_eof(self) -> None:
+        """Mark the end of the body."""
+        self._chunks.put_nowait(b"")
+
+    def set_exception(self, exception: BaseException) -> None:
+        """Fail reading the rest of the body."""
+        self._chunks.put_nowait(exception)
+
+    async def readany(self) -> bytes:
+        """Return the next received data, or empty bytes at the end."""
+        if self._eof:
+            return b""
+        chunk = await self._chunks.get()
+        if isinstance(chunk, BaseException):
+            self._eof = True
+            raise chunk
+        self._eof = not chunk
+        return chunk
+
+    async def read(self) -> bytes:
+        """Return the rest of the body."""
+        chunks: list[bytes] = []
+        while chunk := await self.readany():
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+class WebSocketResponse:
+    """Response to a request multiplexed over the WebSocket."""
+
+    def __init__(self, message: Mapping[str, Any]) -> None:
+        """Initialize the response from its response message."""
+        self.status: int = message.get("status", 200)
+        self.reason: str | None = message.get("reason")
+        self.content_type: str = message.get("content_type", "application/json")
+        self.headers: Mapping[str, str] = {"Content-Type": self.content_type}
+        self.content = WebSocketResponseContent()
+        self._body: Any = message.get("body")
+        self.complete = "body" in message
+        if self.complete:
+            self.content.feed_data(json.dumps(self._body).encode())
+            self.content.feed_eof()
+
+    async def read(self) -> bytes:
+        """Return the whole body."""
+        return await self.content.read()
+
+    async def json(self) -> Any:
+        """Return the decoded JSON body."""
+        if self.complete:
+            return self._body
+        return json.loads(await self.read())
+
+
+class WebSocketTransport:
+    """Multiplex webhook requests over one authenticated WebSocket.
+
+    Every request is sent as a message with a request ID. The backend
+    answers with a response message carrying the same ID and either the
+    whole body or the content type of a body that follows as stream item
+    messages or binary audio frames, prefixed with the request ID, until an
+    end message. The connection is reopened with backoff when it drops.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        entry: WebhookConversationConfigEntry,
+        url: str,
+        headers: Mapping[str, str],
+    ) -> None:
+        """Initialize the transport."""
+        self._hass = hass
+        self._entry = entry
+        self._url = url
+        self._headers = dict(headers)
+        self._ws: aiohttp.ClientWebSocketResponse | None = None
+        self._pending: dict[str, asyncio.Future[WebSocketResponse]] = {}
+        self._responses: dict[str, WebSocketResponse] = {}
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def connected(self) -> bool:
+        """Return if requests can be sent over the WebSocket."""
+        return self._ws is not None and not self._ws.closed
+
+    def start(self) -> None:
+        """Connect and keep the connection open in the background."""
+        self._task = self._entry.async_create_background_task(
+            self._hass, self._async_run(), f"{DOMAIN} websocket {self._url}"
+        )
+
+    async def async_close(self) -> None:
+        """Close the connection and stop reconnecting."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.wait((self._task,))
+            self._task = None
+
+    async def _async_run(self) -> None:
+        """Keep the WebSocket connected."""
+        delay = RECONNECT_MIN_DELAY
+        session = self._entry.runtime_data.session
+        while True:
+            try:
+                async with session.ws_connect(
+                    self._url, headers=self._headers, heartbeat=HEARTBEAT
+                ) as ws:
+                    _LOGGER.debug("Connected to %s", self._url)
+                    self._ws = ws
+                    delay = RECONNECT_MIN_DELAY
+                    await self._async_receive(ws)
+            except (aiohttp.ClientError, TimeoutError) as err:
+                _LOGGER.debug("WebSocket connection to %s failed: %s", self._url, err)
+            except Exception:
+                # Keep reconnecting instead of leaving the transport dead
+                _LOGGER.exception("Unexpected error on WebSocket to %s", self._url)
+            finally:
+                self._ws = None
+                self._fail_requests(
+                    HomeAssistantError(f"WebSocket connection to {self._url} closed")
+                )
+
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, RECONNECT_MAX_DELAY)
+
+    async def _async_receive(self, ws: aiohttp.ClientWebSocketResponse) -> None:
+        """Dispatch received messages to their requests."""
+        async for message in ws:
+            if message.type is aiohttp.WSMsgType.TEXT:
+                self._handle_text(message.data)
+            elif message.type is aiohttp.WSMsgType.BINARY:
+                self._handle_binary(message.data)
+            elif message.type is aiohttp.WSMsgType.ERROR:
+                _LOGGER.debug("WebSocket error from %s: %s", self._url, ws.exception())
+
+    def _handle_text(self, data: str) -> None:
+        """Handle a JSON message."""
+        try:
+            message = json.loads(data)
+            request_id = message["id"]
+            message_type = message["type"]
+        except (ValueError, KeyError, TypeError):
+            _LOGGER.warning("Invalid WebSocket message from %s: %s", self._url, data)
+            return
+        if not isinstance(request_id, str) or not isinstance(message_type, str):
+            _LOGGER.warning("Invalid WebSocket message from %s: %s", self._url, data)
+            return
+
+        if message_type == MESSAGE_RESPONSE:
+            if (future := self._pending.pop(request_id, None)) is None:
+                return
+            response = WebSocketResponse(message)
+            if not response.complete:
+                self._responses[request_id] = response
+            if not future.done():
+                future.set_result(response)
+            return
+
+        if (streamed := self._responses.get(request_id)) is None:
+            return
+        if message_type == MESSAGE_END:
+            del self._responses[request_id]
+            streamed.content.feed_eof()
+            return
+
+        # Items, tool calls and other events are passed on as NDJSON lines for
+        # the stream parser, with the tool call ID in place of the request ID
+        del message["id"]
+        if (tool_call_id := message.pop("tool_call_id", None)) is not None:
+            message["id"] = tool_call_id
+        streamed.content.feed_data(json.dumps(message).encode() + b"\n")
+
+    def _handle_binary(self, data: bytes) -> None:
+        """Handle a binary frame of a response body."""
+        request_id = data[:REQUEST_ID_LENGTH].decode("ascii", "replace")
+        if (response := self._responses.get(request_id)) is not None:
+            response.content.feed_data(data[REQUEST_ID_LENGTH:])
+
+    def _fail_requests(self, err: Exception) -> None:
+        """Fail all requests waiting for a response or body."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(err)
+        for response in self._responses.values():
+            response.content.set_exception(err)
+        self._pending.clear()
+        self._responses.clear()
+
+    @asynccontextmanager
+    async def async_request(
+        self,
+        payload: Mapping[str, Any],
+        traceparent: str,
+        trace: RequestTrace,
+        timeout: float,
+    ) -> AsyncIterator[WebSocketResponse]:
+        """Send a request and return its response once it starts arriving."""
+        if (ws := self._ws) is None or ws.closed:
+            raise HomeAssistantError(f"WebSocket to {self._url} is not connected")
+
+        request_id = ulid_now()
+        future: asyncio.Future[WebSocketResponse] = self._hass.loop.create_future()
+        self._pending[request_id] = future
+        message = json.dumps(
+            {
+                "id": request_id,
+                "type": MESSAGE_REQUEST,
+                "traceparent": traceparent,
+                "payload": payload,
+            },
+            default=audio_json_default,
+        ).encode()
+        try:
+            async with asyncio.timeout(timeout):
+                await ws.send_frame(message, aiohttp.WSMsgType.TEXT)
+                trace.headers_sent = time.monotonic()
+                trace.request_bytes = len(message)
+                response = await future
+                trace.first_byte = time.monotonic()
+                trace.status = response.status
+                yield response
+        finally:
+            self._pending.pop(request_id, None)
+            self._responses.pop(request_id, None)
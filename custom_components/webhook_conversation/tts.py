@@ -2,47 +2,50 @@
 
 from __future__ import annotations
 
-from collections.abc import Mapping
+from collections.abc import AsyncGenerator, Mapping
+from contextlib import AsyncExitStack
 import logging
 from typing import Any, cast
 
-import aiohttp
 from propcache.api import cached_property
 
-from homeassistant.components.tts import (
-    ATTR_VOICE,
-    TextToSpeechEntity,
-    TtsAudioType,
-    Voice,
-)
-from homeassistant.config_entries import ConfigEntry, ConfigSubentry
+from homeassistant.components.tts import ATTR_VOICE, TextToSpeechEntity, Voice
+from homeassistant.components.tts.entity import TTSAudioRequest, TTSAudioResponse
+from homeassistant.config_entries import ConfigSubentry
+from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import HomeAssistantError
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant.helpers.entity_platform import AddConfigEntryEntitiesCallback
 
-from .const import CONF_SUPPORTED_LANGUAGES, CONF_TIMEOUT, CONF_VOICES, DEFAULT_TIMEOUT
+from .const import CONF_SUPPORTED_LANGUAGES, CONF_VOICES
 from .entity import WebhookConversationBaseEntity
-from .models import WebhookTTSRequestPayload
+from .models import WebhookConversationConfigEntry, WebhookTTSRequestPayload
 
 _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(
     hass: HomeAssistant,
-    config_entry: ConfigEntry,
+    config_entry: WebhookConversationConfigEntry,
     async_add_entities: AddConfigEntryEntitiesCallback,
 ) -> None:
     """Set up AI Task entity for webhook conversation."""
-    for subentry in config_entry.subentries.values():
+
+    @callback
+    def async_add_subentry(subentry: ConfigSubentry) -> None:
+        """Add the entity of a subentry."""
         if subentry.subentry_type != "tts":
-            continue
+            return
 
         async_add_entities(
             [WebhookConversationTextToSpeechEntity(config_entry, subentry)],
             config_subentry_id=subentry.subentry_id,
         )
 
+    for subentry in config_entry.subentries.values():
+        async_add_subentry(subentry)
+    config_entry.runtime_data.subentry_adders[Platform.TTS] = async_add_subentry
+
 
 class WebhookConversationTextToSpeechEntity(
     WebhookConversationBaseEntity, TextToSpeechEntity
@@ -53,7 +56,9 @@ class WebhookConversationTextToSpeechEntity(
     _attr_name: str
     _voices: list[Voice] | None = None
 
-    def __init__(self, config_entry: ConfigEntry, subentry: ConfigSubentry) -> None:
+    def __init__(
+        self, config_entry: WebhookConversationConfigEntry, subentry: ConfigSubentry
+    ) -> None:
         """Initialize TTS entity."""
         super().__init__(config_entry, subentry)
         self._attr_name: str = (
@@ -84,36 +89,36 @@ class WebhookConversationTextToSpeechEntity(
             ATTR_VOICE: self._voices[0],
         }
 
-    async def async_get_tts_audio(
-        self, message: str, language: str, options: dict[str, Any]
-    ) -> TtsAudioType:
-        """Load TTS audio from webhook."""
+    def async_supports_streaming_input(self) -> bool:
+        """Return that the webhook needs the whole message at once."""
+        return False
 
-        timeout = self._config_entry.options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT)
-        session = async_get_clientsession(self.hass)
-        client_timeout = aiohttp.ClientTimeout(total=timeout)
-        headers = self._get_auth_headers()
+    async def async_stream_tts_audio(
+        self, request: TTSAudioRequest
+    ) -> TTSAudioResponse:
+        """Stream TTS audio from the webhook.
 
+        The audio is passed on in the chunks it arrives in, so the response
+        is never read into memory as a whole. The request holds its slot
+        until the audio has been consumed.
+        """
+        message = "".join([chunk async for chunk in request.message_gen])
         payload: WebhookTTSRequestPayload = {
             "text": message,
-            "language": language,
+            "language": request.language,
         }
 
-        if voice := cast(str, options.get(ATTR_VOICE)):
+        if voice := cast(str, request.options.get(ATTR_VOICE)):
             payload["voice"] = voice
 
-        async with session.post(
-            self._webhook_url,
-            json=payload,
-            headers=headers,
-            timeout=client_timeout,
-        ) as response:
+        stack = AsyncExitStack()
+        response = await stack.enter_async_context(self._async_post(payload))
+        try:
             if response.status != 200:
                 raise HomeAssistantError(
                     f"Error contacting TTS webhook: HTTP {response.status} - {response.reason}"
                 )
 
-            response_bytes = await response.read()
             content_type: str | None = response.headers.get("Content-Type")
             if not content_type or "/" not in content_type:
                 raise HomeAssistantError(
@@ -124,5 +129,13 @@ class WebhookConversationTextToSpeechEntity(
                 raise HomeAssistantError(
                     f"Unsupported audio format in TTS webhook response: {audio_format}"
                 )
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        async def data_gen() -> AsyncGenerator[bytes]:
+            async with stack:
+                while chunk := await response.content.readany():
+                    yield chunk
 
-        return audio_format, response_bytes
+        return TTSAudioResponse(audio_format, data_gen())
@@ -0,0 +1,77 @@
+"""HTTP views of the webhook conversation integration."""
+
+from __future__ import annotations
+
+from http import HTTPStatus
+
+from aiohttp import hdrs, web
+
+from homeassistant.helpers.http import KEY_HASS, HomeAssistantView
+
+from .const import (
+    CONF_EXPOSED_ENTITIES_LIMIT,
+    CONF_EXPOSED_ENTITY_ATTRIBUTES,
+    DEFAULT_EXPOSED_ENTITIES_LIMIT,
+    DOMAIN,
+    EXPOSED_ENTITIES_URL,
+)
+from .entity_index import async_get_entity_index, compile_attribute_projection
+
+
+class ExposedEntitiesView(HomeAssistantView):
+    """View to fetch the exposed entities of a conversation agent.
+
+    The query, limit, area_id and domain parameters select the entities the
+    same way they are selected when sent with a request. Responses carry an
+    ETag, so a webhook can skip fetching entities that did not change.
+    """
+
+    url = EXPOSED_ENTITIES_URL
+    name = f"api:{DOMAIN}:exposed_entities"
+    requires_auth = True
+
+    async def get(self, request: web.Request, subentry_id: str) -> web.Response:
+        """Return the selected exposed entities."""
+        hass = request.app[KEY_HASS]
+        for entry in hass.config_entries.async_loaded_entries(DOMAIN):
+            subentry = entry.subentries.get(subentry_id)
+            if subentry is not None and subentry.subentry_type == "conversation":
+                break
+        else:
+            return self.json_message("Unknown conversation agent", HTTPStatus.NOT_FOUND)
+
+        query = request.query.get("query")
+        area_id = request.query.get("area_id")
+        domains = {
+            domain
+            for value in request.query.getall("domain", [])
+            for domain in value.split(",")
+            if domain
+        }
+        try:
+            limit = int(
+                request.query.get(
+                    "limit",
+                    subentry.data.get(
+                        CONF_EXPOSED_ENTITIES_LIMIT, DEFAULT_EXPOSED_ENTITIES_LIMIT
+                    ),
+                )
+            )
+        except ValueError:
+            return self.json_message("Invalid limit", HTTPStatus.BAD_REQUEST)
+
+        attributes = subentry.data.get(CONF_EXPOSED_ENTITY_ATTRIBUTES)
+        index = async_get_entity_index(hass)
+        entity_ids = index.async_select(query, limit, area_id, domains or None)
+        etag = index.async_etag(entity_ids, attributes)
+        headers = {hdrs.ETAG: f'"{etag}"', hdrs.CACHE_CONTROL: "no-cache"}
+
+        if (if_none_match := request.if_none_match) and any(
+            tag.value in (etag, "*") for tag in if_none_match
+        ):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        projection = compile_attribute_projection(attributes)
+        return self.json(
+            index.async_get_details(entity_ids, projection), headers=headers
+        )
@@ -0,0 +1 @@
+"""Tests for the webhook conversation integration."""
@@ -0,0 +1,64 @@
+"""Tests for the setup of the webhook conversation integration."""
+
+from __future__ import annotations
+
+from types import MappingProxyType
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import ConfigSubentry, ConfigSubentryData
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import entity_registry as er
+from homeassistant.setup import async_setup_component
+
+from custom_components.webhook_conversation.const import (
+    CONF_WEBHOOK_URL,
+    DOMAIN,
+    RECOMMENDED_CONVERSATION_OPTIONS,
+    RECOMMENDED_STT_OPTIONS,
+)
+
+
+async def test_add_subentry_of_new_platform(
+    hass: HomeAssistant, entity_registry: er.EntityRegistry
+) -> None:
+    """Test a subentry of a new type gets its entity and its sensors."""
+    assert await async_setup_component(hass, "homeassistant", {})
+    config_entry = MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        subentries_data=[
+            ConfigSubentryData(
+                data={
+                    **RECOMMENDED_CONVERSATION_OPTIONS,
+                    CONF_WEBHOOK_URL: "https://example.com/conversation",
+                },
+                subentry_type="conversation",
+                title="Conversation",
+                unique_id=None,
+            )
+        ],
+    )
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    subentry = ConfigSubentry(
+        data=MappingProxyType(
+            {**RECOMMENDED_STT_OPTIONS, CONF_WEBHOOK_URL: "https://example.com/stt"}
+        ),
+        subentry_type="stt",
+        title="STT",
+        unique_id=None,
+    )
+    hass.config_entries.async_add_subentry(config_entry, subentry)
+    await hass.async_block_till_done()
+
+    domains = {
+        entry.domain
+        for entry in er.async_entries_for_config_entry(
+            entity_registry, config_entry.entry_id
+        )
+        if entry.config_subentry_id == subentry.subentry_id
+    }
+    assert domains == {"sensor", "stt"}
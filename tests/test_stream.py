@@ -0,0 +1,71 @@
+"""Tests for the parsing of streamed webhook responses."""
+
+from __future__ import annotations
+
+from custom_components.webhook_conversation.stream import (
+    EVENT_CACHE,
+    EVENT_ITEM,
+    EVENT_TOOL_CALL,
+    StreamEvent,
+    StreamFormat,
+    StreamParser,
+    parse_tool_call,
+)
+
+
+def _parse_sse(stream: str) -> list[StreamEvent]:
+    """Parse a whole Server-Sent Events stream."""
+    parser = StreamParser(StreamFormat.SSE)
+    return parser.feed(stream.encode()) + parser.close()
+
+
+def test_sse_named_tool_call() -> None:
+    """Test the fields of a named tool call event are its data."""
+    events = _parse_sse(
+        "event: tool_call\n"
+        'data: {"id": "1", "name": "HassTurnOn", "args": {"name": "Kitchen"}}\n'
+        "\n"
+    )
+
+    assert len(events) == 1
+    assert events[0].type == EVENT_TOOL_CALL
+    assert events[0].data is not None
+    tool_input = parse_tool_call(events[0].data)
+    assert tool_input is not None
+    assert tool_input.id == "1"
+    assert tool_input.tool_name == "HassTurnOn"
+    assert tool_input.tool_args == {"name": "Kitchen"}
+
+
+def test_sse_named_cache() -> None:
+    """Test the fields of a named cache event are its data."""
+    events = _parse_sse(
+        'event: cache\ndata: {"ttl": 600, "entities": ["sensor.temperature"]}\n\n'
+    )
+
+    assert events == [
+        StreamEvent(
+            EVENT_CACHE, None, {"ttl": 600, "entities": ["sensor.temperature"]}
+        )
+    ]
+
+
+def test_sse_plain_item() -> None:
+    """Test plain text and item objects are the content of item events."""
+    events = _parse_sse(
+        "data: Hello\n"
+        "\n"
+        'event: item\ndata: {"content": " world"}\n'
+        "\n"
+        'data: {"type": "item", "content": "!"}\n'
+        "\n"
+        "data: [DONE]\n"
+        "\n"
+    )
+
+    assert [(event.type, event.content) for event in events] == [
+        (EVENT_ITEM, "Hello"),
+        (EVENT_ITEM, " world"),
+        (EVENT_ITEM, "!"),
+        ("end", None),
+    ]
@@ -0,0 +1,55 @@
+"""Tests for the WebSocket transport to the webhook backend."""
+
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from custom_components.webhook_conversation.transport import WebSocketTransport
+
+URL = "wss://example.com/webhook"
+
+
+def _transport(entry: MagicMock | None = None) -> WebSocketTransport:
+    """Return a transport with mocked Home Assistant and config entry."""
+    return WebSocketTransport(MagicMock(), entry or MagicMock(), URL, {})
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        '{"id": ["1"], "type": "response"}',
+        '{"id": "1", "type": {"name": "response"}}',
+    ],
+)
+def test_reject_non_string_fields(data: str, caplog: pytest.LogCaptureFixture) -> None:
+    """Test messages with an ID or type that is not a string are rejected."""
+    transport = _transport()
+
+    transport._handle_text(data)
+
+    assert "Invalid WebSocket message" in caplog.text
+
+
+async def test_reconnect_after_unexpected_error(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    """Test the connection is reopened after an unexpected error."""
+    entry = MagicMock()
+    ws_connect = entry.runtime_data.session.ws_connect
+    ws_connect.side_effect = [RuntimeError("boom"), asyncio.CancelledError]
+    transport = _transport(entry)
+
+    with (
+        patch(
+            "custom_components.webhook_conversation.transport.asyncio.sleep",
+            AsyncMock(),
+        ),
+        pytest.raises(asyncio.CancelledError),
+    ):
+        await transport._async_run()
+
+    assert ws_connect.call_count == 2
+    assert "Unexpected error on WebSocket" in caplog.text